@@ -1,266 +1,182 @@
 """
-Analytics module - Generate interactive visualizations using Plotly
+Analytics module - summary numbers and chart series for the analytics pages
+Everything is computed from the rollups (see rollups.py) plus the latest
+readings; the browser draws the charts with Plotly (static/js/analytics.js).
 """
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 import pandas as pd
-from datetime import datetime, timedelta
+import rollups
 
-def generate_user_analytics(predictions):
-    """
-    Generate analytics for a specific user's predictions
-    """
-    if not predictions or len(predictions) == 0:
-        return None
-    
-    # Convert to DataFrame
-    data = []
-    for p in predictions:
-        data.append({
-            'date': p.created_at,
-            'crop_type': p.crop_type,
-            'soil_moisture': p.soil_moisture,
-            'temperature': p.temperature,
-            'humidity': p.humidity,
-            'prediction': p.prediction,
-            'confidence': p.confidence
-        })
-    
-    df = pd.DataFrame(data)
-    
-    charts = {}
-    
-    # 1. Prediction Timeline
-    df['date_only'] = df['date'].dt.date
-    timeline = df.groupby(['date_only', 'prediction']).size().reset_index(name='count')
-    
-    fig_timeline = go.Figure()
-    for pred_val in [0, 1]:
-        subset = timeline[timeline['prediction'] == pred_val]
-        fig_timeline.add_trace(go.Scatter(
-            x=subset['date_only'],
-            y=subset['count'],
-            mode='lines+markers',
-            name='Irrigation Needed' if pred_val == 1 else 'No Irrigation',
-            line=dict(color='#ff6b6b' if pred_val == 1 else '#74b9ff', width=3),
-            marker=dict(size=8)
-        ))
-    
-    fig_timeline.update_layout(
-        title='Prediction Timeline',
-        xaxis_title='Date',
-        yaxis_title='Number of Predictions',
-        hovermode='x unified',
-        template='plotly_white'
-    )
-    charts['timeline'] = fig_timeline.to_html(full_html=False, include_plotlyjs='cdn')
-    
-    # 2. Irrigation Rate by Crop
-    crop_irrigation = df.groupby('crop_type')['prediction'].agg(['sum', 'count'])
-    crop_irrigation['rate'] = (crop_irrigation['sum'] / crop_irrigation['count'] * 100).round(1)
-    
-    fig_crop = go.Figure(data=[
-        go.Bar(
-            x=crop_irrigation.index,
-            y=crop_irrigation['rate'],
-            marker_color='#00b894',
-            text=crop_irrigation['rate'].apply(lambda x: f'{x}%'),
-            textposition='outside'
-        )
-    ])
-    fig_crop.update_layout(
-        title='Irrigation Rate by Crop Type',
-        xaxis_title='Crop Type',
-        yaxis_title='Irrigation Rate (%)',
-        template='plotly_white'
-    )
-    charts['crop_rate'] = fig_crop.to_html(full_html=False, include_plotlyjs='cdn')
-    
-    # 3. Soil Moisture Distribution
-    fig_moisture = go.Figure()
-    fig_moisture.add_trace(go.Histogram(
-        x=df[df['prediction'] == 0]['soil_moisture'],
-        name='No Irrigation',
-        marker_color='#74b9ff',
-        opacity=0.7,
-        nbinsx=30
-    ))
-    fig_moisture.add_trace(go.Histogram(
-        x=df[df['prediction'] == 1]['soil_moisture'],
-        name='Irrigation Needed',
-        marker_color='#ff6b6b',
-        opacity=0.7,
-        nbinsx=30
-    ))
-    fig_moisture.update_layout(
-        title='Soil Moisture Distribution',
-        xaxis_title='Soil Moisture',
-        yaxis_title='Frequency',
-        barmode='overlay',
-        template='plotly_white'
-    )
-    charts['moisture'] = fig_moisture.to_html(full_html=False, include_plotlyjs='cdn')
-    
-    # 4. Temperature vs Humidity Scatter
-    fig_scatter = px.scatter(
-        df,
-        x='temperature',
-        y='humidity',
-        color='prediction',
-        color_discrete_map={0: '#74b9ff', 1: '#ff6b6b'},
-        labels={'prediction': 'Irrigation', 'temperature': 'Temperature (°C)', 'humidity': 'Humidity (%)'},
-        title='Temperature vs Humidity',
-        hover_data=['crop_type', 'soil_moisture']
-    )
-    fig_scatter.update_layout(template='plotly_white')
-    charts['scatter'] = fig_scatter.to_html(full_html=False, include_plotlyjs='cdn')
-    
-    # 5. Confidence Distribution
-    fig_confidence = go.Figure(data=[
-        go.Box(
-            y=df[df['prediction'] == 0]['confidence'],
-            name='No Irrigation',
-            marker_color='#74b9ff'
-        ),
-        go.Box(
-            y=df[df['prediction'] == 1]['confidence'],
-            name='Irrigation Needed',
-            marker_color='#ff6b6b'
-        )
-    ])
-    fig_confidence.update_layout(
-        title='Prediction Confidence Distribution',
-        yaxis_title='Confidence',
-        template='plotly_white'
-    )
-    charts['confidence'] = fig_confidence.to_html(full_html=False, include_plotlyjs='cdn')
-    
-    # 6. Weekly Summary
-    df['week'] = df['date'].dt.to_period('W').astype(str)
-    weekly = df.groupby(['week', 'prediction']).size().unstack(fill_value=0)
-    
-    fig_weekly = go.Figure()
-    if 0 in weekly.columns:
-        fig_weekly.add_trace(go.Bar(
-            x=weekly.index,
-            y=weekly[0],
-            name='No Irrigation',
-            marker_color='#74b9ff'
-        ))
-    if 1 in weekly.columns:
-        fig_weekly.add_trace(go.Bar(
-            x=weekly.index,
-            y=weekly[1],
-            name='Irrigation Needed',
-            marker_color='#ff6b6b'
-        ))
-    
-    fig_weekly.update_layout(
-        title='Weekly Prediction Summary',
-        xaxis_title='Week',
-        yaxis_title='Number of Predictions',
-        barmode='stack',
-        template='plotly_white'
-    )
-    charts['weekly'] = fig_weekly.to_html(full_html=False, include_plotlyjs='cdn')
-    
-    return charts
+# Charts of /api/analytics/<chart>: per user, and system-wide (admin)
+USER_CHARTS = ('timeline', 'crop_rate', 'moisture', 'scatter', 'confidence', 'weekly')
+SYSTEM_CHARTS = ('distribution', 'top_users', 'crops')
 
-def generate_system_analytics(all_predictions):
+# Columns of the individual readings used by the scatter and confidence charts
+READING_COLUMNS = ('crop_type', 'soil_moisture', 'temperature', 'humidity', 'prediction', 'confidence', 'created_at')
+
+# Summary numbers of a user without predictions
+EMPTY_STATS = {
+    'total': 0,
+    'irrigation_needed': 0,
+    'no_irrigation': 0,
+    'avg_confidence': 0,
+    'most_common_crop': 'N/A'
+}
+
+def readings_frame(predictions):
     """
-    Generate system-wide analytics (for admin)
+    Individual readings as a DataFrame: a prediction frame (see
+    prediction_data.py) is used as is, prediction objects are read
+    column by column.
     """
-    if not all_predictions or len(all_predictions) == 0:
-        return None
-    
-    data = []
-    for p in all_predictions:
-        data.append({
-            'date': p.created_at,
-            'user': p.user.username,
-            'crop_type': p.crop_type,
-            'prediction': p.prediction,
-            'confidence': p.confidence
-        })
-    
-    df = pd.DataFrame(data)
-    
-    charts = {}
-    
-    # 1. System-wide prediction distribution
-    pred_counts = df['prediction'].value_counts()
-    fig_pie = go.Figure(data=[go.Pie(
-        labels=['No Irrigation', 'Irrigation Needed'],
-        values=[pred_counts.get(0, 0), pred_counts.get(1, 0)],
-        marker_colors=['#74b9ff', '#ff6b6b'],
-        hole=0.4
-    )])
-    fig_pie.update_layout(
-        title='Overall Irrigation Distribution',
-        template='plotly_white'
-    )
-    charts['distribution'] = fig_pie.to_html(full_html=False, include_plotlyjs='cdn')
-    
-    # 2. Top users by predictions
-    user_counts = df['user'].value_counts().head(10)
-    fig_users = go.Figure(data=[
-        go.Bar(
-            x=user_counts.values,
-            y=user_counts.index,
-            orientation='h',
-            marker_color='#00b894'
-        )
-    ])
-    fig_users.update_layout(
-        title='Top 10 Active Users',
-        xaxis_title='Number of Predictions',
-        yaxis_title='User',
-        template='plotly_white'
-    )
-    charts['top_users'] = fig_users.to_html(full_html=False, include_plotlyjs='cdn')
-    
-    # 3. Crop popularity
-    crop_counts = df['crop_type'].value_counts()
-    fig_crops = go.Figure(data=[go.Pie(
-        labels=crop_counts.index,
-        values=crop_counts.values,
-        hole=0.3
-    )])
-    fig_crops.update_layout(
-        title='Crop Type Distribution',
-        template='plotly_white'
-    )
-    charts['crops'] = fig_crops.to_html(full_html=False, include_plotlyjs='cdn')
-    
-    return charts
+    if isinstance(predictions, pd.DataFrame):
+        return predictions
+    predictions = predictions or []
+    return pd.DataFrame({name: [getattr(p, name) for p in predictions] for name in READING_COLUMNS},
+                        columns=list(READING_COLUMNS))
 
-def calculate_stats(predictions):
-    """Calculate summary statistics"""
-    if not predictions or len(predictions) == 0:
-        return {
-            'total': 0,
-            'irrigation_needed': 0,
-            'no_irrigation': 0,
-            'avg_confidence': 0,
-            'most_common_crop': 'N/A'
-        }
-    
-    total = len(predictions)
-    irrigation_needed = sum(1 for p in predictions if p.prediction == 1)
-    no_irrigation = total - irrigation_needed
-    avg_confidence = sum(p.confidence for p in predictions) / total * 100
+def stats_from_rollup(rollup):
+    """Summary numbers of the analytics page from a rollup"""
+    daily = rollup.daily
+    if len(daily) == 0:
+        return dict(EMPTY_STATS)
     
-    crop_counts = {}
-    for p in predictions:
-        crop_counts[p.crop_type] = crop_counts.get(p.crop_type, 0) + 1
-    
-    most_common_crop = max(crop_counts.items(), key=lambda x: x[1])[0] if crop_counts else 'N/A'
+    total = int(daily['count'].sum())
+    irrigation_needed = int(daily.loc[daily['prediction'] == 1, 'count'].sum())
+    avg_confidence = daily['confidence_sum'].sum() / total * 100
+    crop_counts = daily.groupby('crop_type')['count'].sum()
     
     return {
         'total': total,
         'irrigation_needed': irrigation_needed,
-        'no_irrigation': no_irrigation,
+        'no_irrigation': total - irrigation_needed,
         'avg_confidence': round(avg_confidence, 1),
-        'most_common_crop': most_common_crop
+        'most_common_crop': crop_counts.idxmax()
     }
+
+def crop_rates(daily):
+    """Predictions, irrigation predictions and irrigation rate (%) per crop, from daily rollups"""
+    counts = daily.assign(irrigation=daily['count'] * daily['prediction'])
+    crop_irrigation = counts.groupby('crop_type')[['irrigation', 'count']].sum()
+    crop_irrigation.columns = ['sum', 'count']
+    crop_irrigation['rate'] = (crop_irrigation['sum'] / crop_irrigation['count'] * 100).round(1)
+    return crop_irrigation
+
+def moisture_histogram(moisture):
+    """Prediction counts per soil moisture bucket (bucket centre) and prediction"""
+    readings = moisture[moisture['moisture_bucket'] != rollups.NO_MOISTURE_BUCKET]
+    histogram = readings.groupby(['moisture_bucket', 'prediction'])['count'].sum().unstack(fill_value=0)
+    histogram.index = histogram.index * rollups.MOISTURE_BUCKET_WIDTH + rollups.MOISTURE_BUCKET_WIDTH / 2
+    return histogram
+
+def weekly_counts(daily):
+    """Prediction counts per week and prediction, from daily rollups"""
+    weeks = pd.to_datetime(daily['day']).dt.to_period('W').astype(str)
+    return daily.assign(week=weeks).groupby(['week', 'prediction'])['count'].sum().unstack(fill_value=0)
+
+# Compact chart data for /api/analytics/<chart>: the aggregated series
+# only, rendered by static/js/analytics.js
+
+def _by_prediction(frame):
+    """Series of a counts frame with prediction columns 0 and 1"""
+    return {
+        'no_irrigation': [int(value) for value in frame.get(0, pd.Series(0, index=frame.index))],
+        'irrigation_needed': [int(value) for value in frame.get(1, pd.Series(0, index=frame.index))],
+    }
+
+def _box(values):
+    """Five-number summary of a box plot (Tukey fences)"""
+    if len(values) == 0:
+        return None
+    q1, median, q3 = (float(value) for value in values.quantile([0.25, 0.5, 0.75]))
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return {'q1': round(q1, 4), 'median': round(median, 4), 'q3': round(q3, 4),
+            'lowerfence': round(float(inside.min()), 4), 'upperfence': round(float(inside.max()), 4),
+            'n': int(len(values))}
+
+def timeline_series(daily):
+    counts = daily.groupby(['day', 'prediction'])['count'].sum().unstack(fill_value=0)
+    return dict(days=[str(day) for day in counts.index], **_by_prediction(counts))
+
+def crop_rate_series(daily):
+    rates = crop_rates(daily)
+    return {'crops': list(rates.index), 'rates': [float(rate) for rate in rates['rate']],
+            'counts': [int(count) for count in rates['count']]}
+
+def moisture_series(moisture):
+    histogram = moisture_histogram(moisture)
+    return dict(bin_width=rollups.MOISTURE_BUCKET_WIDTH, centers=[float(center) for center in histogram.index],
+                **_by_prediction(histogram))
+
+def scatter_series(predictions):
+    """Recent readings binned to whole degrees and percent, with a count per bin"""
+    readings = readings_frame(predictions)[['temperature', 'humidity', 'prediction']].dropna()
+    points = (readings.round({'temperature': 0, 'humidity': 0}).astype(int)
+              .groupby(['temperature', 'humidity', 'prediction']).size())
+    return {'temperature': [int(key[0]) for key in points.index], 'humidity': [int(key[1]) for key in points.index],
+            'prediction': [int(key[2]) for key in points.index], 'count': [int(count) for count in points]}
+
+def confidence_series(predictions):
+    confidence = readings_frame(predictions)[['prediction', 'confidence']].dropna()
+    confidence = confidence.astype({'confidence': float})
+    return {
+        'no_irrigation': _box(confidence.loc[confidence['prediction'] == 0, 'confidence']),
+        'irrigation_needed': _box(confidence.loc[confidence['prediction'] == 1, 'confidence']),
+    }
+
+def weekly_series(daily):
+    weekly = weekly_counts(daily)
+    return dict(weeks=list(weekly.index), **_by_prediction(weekly))
+
+def distribution_series(daily):
+    counts = daily.groupby('prediction')['count'].sum()
+    return {'no_irrigation': int(counts.get(0, 0)), 'irrigation_needed': int(counts.get(1, 0))}
+
+def top_users_series(totals):
+    """totals: user_id, username and count of the top users, as prediction_data.user_totals() returns"""
+    return {'users': [username if isinstance(username, str) else f'User {user_id}'
+                      for user_id, username in zip(totals['user_id'], totals['username'])],
+            'counts': [int(count) for count in totals['count']]}
+
+def crops_series(daily):
+    counts = daily.groupby('crop_type')['count'].sum().sort_values(ascending=False)
+    return {'crops': list(counts.index), 'counts': [int(count) for count in counts]}
+
+CHART_SERIES = {
+    'timeline': timeline_series,
+    'crop_rate': crop_rate_series,
+    'moisture': moisture_series,
+    'scatter': scatter_series,
+    'confidence': confidence_series,
+    'weekly': weekly_series,
+    'distribution': distribution_series,
+    'top_users': top_users_series,
+    'crops': crops_series,
+}
+
+# What each chart is built from, read with one query by /api/analytics/<chart>:
+# a rollup table ('daily', 'moisture'), the latest readings, or the
+# prediction totals of the top users with their usernames
+CHART_SOURCES = {
+    'timeline': 'daily',
+    'crop_rate': 'daily',
+    'moisture': 'moisture',
+    'scatter': 'readings',
+    'confidence': 'readings',
+    'weekly': 'daily',
+    'distribution': 'daily',
+    'top_users': 'user_totals',
+    'crops': 'daily',
+}
+
+# Charts that plot individual readings and need the latest predictions
+READING_CHARTS = tuple(chart for chart, source in CHART_SOURCES.items() if source == 'readings')
+
+def chart_series(chart, data):
+    """
+    Compact data of one chart (a name in USER_CHARTS or SYSTEM_CHARTS) from
+    its source data (see CHART_SOURCES); None without data
+    """
+    if len(data) == 0:
+        return None
+    return CHART_SERIES[chart](data)
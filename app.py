@@ -1,27 +1,146 @@
 from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import insert
 from werkzeug.security import generate_password_hash, check_password_hash
-import joblib
 import numpy as np
 from model import IrrigationPredictor
+from prediction_cache import PredictionCache
+from event_scheduler import ScheduleQueue
+from prediction_log import PredictionWriter
+from chart_cache import ChartCache
+from weather import WeatherProvider, make_backend
+import rollups
+import water_requirement
+import water_balance
+import evapotranspiration
+from database import engine_options, install_sqlite_pragmas, normalize_database_uri
 import os
+import atexit
 import requests
+import threading
 from datetime import datetime, timedelta
 import json
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///farmers.db'
+# SQLite file by default; DATABASE_URL can point at a server database instead
+app.config['SQLALCHEMY_DATABASE_URI'] = normalize_database_uri(os.environ.get('DATABASE_URL', 'sqlite:///farmers.db'))
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 5))
+app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+app.config['DB_POOL_TIMEOUT'] = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+    app.config['SQLALCHEMY_DATABASE_URI'],
+    pool_size=app.config['DB_POOL_SIZE'],
+    max_overflow=app.config['DB_MAX_OVERFLOW'],
+    pool_timeout=app.config['DB_POOL_TIMEOUT']
+)
+# Applied to every new SQLite connection (see database.py); SQLITE_TUNING=0 keeps SQLite's defaults
+app.config['SQLITE_PRAGMAS'] = {
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'cache_size': -int(os.environ.get('SQLITE_CACHE_SIZE_KB', 65536)),  # negative means KiB
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+} if os.environ.get('SQLITE_TUNING', '1') == '1' else {}
+# Apply pending schema migrations at startup; when off, an outdated schema stops the app
+app.config['DB_AUTO_MIGRATE'] = os.environ.get('DB_AUTO_MIGRATE', '1') == '1'
+app.config['MODEL_PATH'] = os.environ.get('MODEL_PATH', 'irrigation_model.pkl')
+# Seconds between checks of the model file for a new version; 0 disables the watcher
+app.config['MODEL_RELOAD_INTERVAL'] = float(os.environ.get('MODEL_RELOAD_INTERVAL', 30))
+app.config['MODEL_BACKEND'] = os.environ.get('MODEL_BACKEND', 'flat')  # 'flat' or 'sklearn'
+# Memory-map the model file's arrays so gunicorn workers share them (see gunicorn.conf.py)
+app.config['MODEL_MMAP'] = os.environ.get('MODEL_MMAP', '1') == '1'
+# Run due schedules from this process (see start_schedule_queue)
+app.config['SCHEDULER_ENABLED'] = os.environ.get('SCHEDULER_ENABLED', '1') == '1'
+# Concurrent irrigation runs in the scheduler and the per-run time limit (seconds)
+app.config['SCHEDULER_MAX_WORKERS'] = int(os.environ.get('SCHEDULER_MAX_WORKERS', 8))
+app.config['SCHEDULER_TASK_TIMEOUT'] = float(os.environ.get('SCHEDULER_TASK_TIMEOUT', 300))
+app.config['PREDICT_BATCH_MAX_SIZE'] = int(os.environ.get('PREDICT_BATCH_MAX_SIZE', 5000))
+# Longest horizon of /api/schedule/plan (days)
+app.config['PLAN_MAX_DAYS'] = int(os.environ.get('PLAN_MAX_DAYS', 180))
+app.config['PREDICTION_CACHE_SIZE'] = int(os.environ.get('PREDICTION_CACHE_SIZE', 10000))  # 0 disables
+app.config['PREDICTION_CACHE_TTL'] = int(os.environ.get('PREDICTION_CACHE_TTL', 3600))  # seconds
+app.config['PREDICTION_CACHE_QUANTIZATION'] = None  # opt-in per-field key step sizes (exact keys by default), see prediction_cache.py
+# Memory for analytics chart series (0 disables) and a directory to keep them across restarts
+app.config['CHART_CACHE_SIZE_MB'] = int(os.environ.get('CHART_CACHE_SIZE_MB', 32))
+app.config['CHART_CACHE_DIR'] = os.environ.get('CHART_CACHE_DIR', '')
+# Weather: 'mock' (demo data), 'file' (JSON file at WEATHER_FILE) or 'openweather'
+app.config['WEATHER_BACKEND'] = os.environ.get('WEATHER_BACKEND', 'mock')
+app.config['WEATHER_FILE'] = os.environ.get('WEATHER_FILE', 'weather.json')
+app.config['OPENWEATHER_API_KEY'] = os.environ.get('OPENWEATHER_API_KEY', '')
+app.config['WEATHER_CACHE_TTL'] = int(os.environ.get('WEATHER_CACHE_TTL', 600))  # seconds
+app.config['WEATHER_STALE_TTL'] = int(os.environ.get('WEATHER_STALE_TTL', 3600))  # seconds, served when the service fails
+app.config['WEATHER_CACHE_SIZE'] = int(os.environ.get('WEATHER_CACHE_SIZE', 1000))  # locations kept
+app.config['WEATHER_POOL_SIZE'] = int(os.environ.get('WEATHER_POOL_SIZE', 10))  # connections kept alive
+app.config['WEATHER_TIMEOUT'] = float(os.environ.get('WEATHER_TIMEOUT', 5))  # seconds
+# Write logged predictions from a background thread in batches (see prediction_log.py)
+app.config['PREDICTION_LOG_ASYNC'] = os.environ.get('PREDICTION_LOG_ASYNC', '1') == '1'
+app.config['PREDICTION_LOG_FLUSH_ROWS'] = int(os.environ.get('PREDICTION_LOG_FLUSH_ROWS', 500))
+app.config['PREDICTION_LOG_FLUSH_MS'] = int(os.environ.get('PREDICTION_LOG_FLUSH_MS', 50))
+app.config['PREDICTION_LOG_QUEUE_SIZE'] = int(os.environ.get('PREDICTION_LOG_QUEUE_SIZE', 10000))
 
 db = SQLAlchemy(app)
+with app.app_context():
+    install_sqlite_pragmas(db.engine, app.config['SQLITE_PRAGMAS'])
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
-# Global predictor instance
+# Global predictor instance, loaded on first use by get_predictor() and
+# replaced as a whole by reload_model()
 predictor = None
+_predictor_lock = threading.Lock()
+_reload_lock = threading.Lock()
+_watcher_pid = None
+
+# Version and reload state of the served model, for /api/admin/model
+model_status = {
+    'version': None,
+    'path': app.config['MODEL_PATH'],
+    'loaded_at': None,
+    'file_signature': None,
+    'last_reload': None
+}
+
+def new_prediction_cache():
+    """Empty prediction cache built from the app config (None if disabled)"""
+    if app.config['PREDICTION_CACHE_SIZE'] <= 0:
+        return None
+    return PredictionCache(
+        max_size=app.config['PREDICTION_CACHE_SIZE'],
+        ttl=app.config['PREDICTION_CACHE_TTL'],
+        quantization=app.config['PREDICTION_CACHE_QUANTIZATION']
+    )
+
+# Prediction cache of the current model; every model gets a fresh one so
+# results of an old model are never served by its replacement
+prediction_cache = new_prediction_cache()
+
+# Analytics chart series and stats, rebuilt when the user's predictions change
+chart_cache = ChartCache(
+    max_bytes=app.config['CHART_CACHE_SIZE_MB'] * 1024 * 1024,
+    directory=app.config['CHART_CACHE_DIR'] or None
+) if app.config['CHART_CACHE_SIZE_MB'] > 0 else None
+
+def new_weather_backend():
+    """Weather backend chosen by WEATHER_BACKEND"""
+    name = app.config['WEATHER_BACKEND']
+    if name == 'file':
+        return make_backend(name, path=app.config['WEATHER_FILE'])
+    if name == 'openweather':
+        return make_backend(name, api_key=app.config['OPENWEATHER_API_KEY'],
+                            timeout=app.config['WEATHER_TIMEOUT'], pool_size=app.config['WEATHER_POOL_SIZE'])
+    return make_backend(name)
+
+# Weather shared by the pages, irrigation planning and the scheduler's rain check
+weather_provider = WeatherProvider(
+    new_weather_backend(),
+    ttl=app.config['WEATHER_CACHE_TTL'],
+    stale_ttl=app.config['WEATHER_STALE_TTL'],
+    max_locations=app.config['WEATHER_CACHE_SIZE']
+)
 
 # Database Models
 class User(UserMixin, db.Model):
@@ -56,6 +175,31 @@ class Prediction(db.Model):
     
     # Relationship
     user = db.relationship('User', backref='predictions')
+    
+    # History pages filter by user and sort by time; admin views sort and
+    # count by time alone. Existing databases get these from migrate_db.py
+    __table_args__ = (
+        db.Index('ix_prediction_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_prediction_created_at', 'created_at'),
+    )
+
+class PredictionRollup(db.Model):
+    """Daily prediction counts for analytics, maintained by rollups.add_predictions()"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    crop_type = db.Column(db.String(50), primary_key=True)
+    prediction = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    confidence_sum = db.Column(db.Float, nullable=False, default=0.0)
+
+class MoistureRollup(db.Model):
+    """Prediction counts per soil moisture bucket, maintained by rollups.add_predictions()"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    prediction = db.Column(db.Integer, primary_key=True)
+    moisture_bucket = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+ROLLUP_TABLES = rollups.RollupTables(daily=PredictionRollup.__table__, moisture=MoistureRollup.__table__)
 
 class IrrigationSchedule(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -82,19 +226,124 @@ class IrrigationSchedule(db.Model):
     # Relationships
     user = db.relationship('User', backref='schedules')
     prediction = db.relationship('Prediction', backref='schedules')
+    
+    # The scheduler looks up due schedules by status and time; schedule
+    # lists filter by user and sort by time
+    __table_args__ = (
+        db.Index('ix_irrigation_schedule_status_scheduled_time', 'status', 'scheduled_time'),
+        db.Index('ix_irrigation_schedule_user_id_scheduled_time', 'user_id', 'scheduled_time'),
+    )
 
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
 
+def _load_pending_schedules():
+    """(id, scheduled_time) of every pending schedule, to rebuild the queue at boot"""
+    with app.app_context():
+        return db.session.execute(
+            db.select(IrrigationSchedule.id, IrrigationSchedule.scheduled_time)
+            .where(IrrigationSchedule.status == 'pending')
+        ).all()
+
+def _fire_due_schedules(now):
+    """Process everything due; the database decides what is still pending"""
+    from scheduler import process_due_schedules
+    process_due_schedules(now)
+
+# Upcoming schedules; the API keeps it current and start_schedule_queue()
+# runs it. Every process may run one: bulk processing claims each schedule
+# with a status-checked UPDATE, so a schedule is executed only once.
+schedule_queue = ScheduleQueue(_fire_due_schedules, load_pending=_load_pending_schedules)
+
+def start_schedule_queue():
+    """Start firing schedules from this process, if SCHEDULER_ENABLED"""
+    if app.config['SCHEDULER_ENABLED']:
+        schedule_queue.start()
+
+def _insert_predictions(rows):
+    """Write queued predictions with one multi-row INSERT"""
+    with app.app_context():
+        db.session.execute(insert(Prediction), rows)
+        rollups.add_predictions(db.session, ROLLUP_TABLES, rows)
+        db.session.commit()
+
+# Predictions that don't need an id are logged write-behind; the request
+# returns without waiting for the database
+prediction_writer = PredictionWriter(
+    _insert_predictions,
+    flush_rows=app.config['PREDICTION_LOG_FLUSH_ROWS'],
+    flush_interval=app.config['PREDICTION_LOG_FLUSH_MS'] / 1000,
+    max_queue=app.config['PREDICTION_LOG_QUEUE_SIZE']
+)
+# Write what is still queued when the process exits normally
+atexit.register(prediction_writer.drain)
+
+def model_file_signature(path):
+    """(mtime, size, inode) of the model file, or None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+def validate_predictor(candidate, current=None):
+    """
+    Smoke-test a freshly loaded model before it serves traffic.
+    Raises ValueError if the model can't answer for every crop it knows,
+    or if it drops crop types the current model supports.
+    """
+    if len(candidate.model.classes_) != 2:
+        raise ValueError("Model must be a binary irrigation classifier")
+    crop_types = list(candidate.label_encoder.classes_)
+    if not crop_types:
+        raise ValueError("Model has no crop types")
+    if current is not None:
+        missing = set(current.label_encoder.classes_) - set(crop_types)
+        if missing:
+            raise ValueError(f"Model is missing crop types: {', '.join(sorted(missing))}")
+    
+    n_crops = len(crop_types)
+    _, probabilities = candidate.predict_batch(
+        crop_types, [30] * n_crops, [400] * n_crops, [28] * n_crops, [60] * n_crops
+    )
+    _, probability = candidate.predict(crop_types[0], 30, 400, 28, 60)
+    if (probabilities.shape != (n_crops, 2) or not np.all(np.isfinite(probabilities))
+            or not np.allclose(probabilities.sum(axis=1), 1.0) or not np.isclose(probability.sum(), 1.0)):
+        raise ValueError("Model returned invalid probabilities")
+
+def _load_validated_model(path, current=None):
+    """Load and validate a model file; returns (predictor, cache, file signature)"""
+    signature = model_file_signature(path)
+    loaded = IrrigationPredictor(backend=app.config['MODEL_BACKEND'])
+    loaded.load_model(path, mmap_mode='r' if app.config['MODEL_MMAP'] else None)
+    validate_predictor(loaded, current)
+    # Attach the cache after validation so the smoke test isn't cached
+    cache = new_prediction_cache()
+    loaded.enable_cache(cache)
+    return loaded, cache, signature
+
+def _publish_model(loaded, cache, signature):
+    """Make a loaded model the one new requests use"""
+    global predictor, prediction_cache
+    model_status.update(
+        version=loaded.model_version,
+        loaded_at=datetime.utcnow().isoformat(),
+        file_signature=signature
+    )
+    prediction_cache = cache
+    # A single reference assignment: requests that already hold the old
+    # predictor finish with it, later ones get the new one
+    predictor = loaded
+
 def load_model():
     """Load the trained model"""
-    global predictor
+    path = app.config['MODEL_PATH']
     try:
-        if os.path.exists('irrigation_model.pkl'):
-            predictor = IrrigationPredictor()
-            predictor.load_model('irrigation_model.pkl')
-            print("Model loaded successfully!")
+        if os.path.exists(path):
+            # Publish only a fully loaded model to other threads
+            _publish_model(*_load_validated_model(path))
+            print(f"Model loaded successfully! (version {model_status['version']})")
         else:
             print("Model file not found. Please train the model first.")
             return False
@@ -103,32 +352,91 @@ def load_model():
         return False
     return True
 
+def reload_model():
+    """
+    Load the model file again and swap it in if it passes validation.
+    The current model keeps serving while the new one loads and stays in
+    place if loading or validation fails. Returns (success, message).
+    """
+    if not _reload_lock.acquire(blocking=False):
+        return False, 'A reload is already in progress'
+    try:
+        path = app.config['MODEL_PATH']
+        previous_version = model_status['version']
+        started_at = datetime.utcnow().isoformat()
+        try:
+            loaded, cache, signature = _load_validated_model(path, current=predictor)
+        except Exception as e:
+            model_status['last_reload'] = {
+                'success': False, 'started_at': started_at, 'error': str(e),
+                # Don't retry the same broken file on every watcher tick
+                'file_signature': model_file_signature(path)
+            }
+            print(f"Model reload failed, keeping version {previous_version}: {e}")
+            return False, f'Reload failed: {e}'
+        
+        with _predictor_lock:
+            _publish_model(loaded, cache, signature)
+        model_status['last_reload'] = {
+            'success': True, 'started_at': started_at,
+            'previous_version': previous_version, 'version': loaded.model_version
+        }
+        print(f"Model reloaded: {previous_version} -> {loaded.model_version}")
+        return True, f'Model version {loaded.model_version} loaded'
+    finally:
+        _reload_lock.release()
+
+def start_model_reload():
+    """Run reload_model() in a background thread; False if one is already running"""
+    if _reload_lock.locked():
+        return False
+    threading.Thread(target=reload_model, name='model-reload', daemon=True).start()
+    return True
+
+def _watch_model_file(interval):
+    """Reload the model whenever its file is replaced"""
+    import time
+    path = app.config['MODEL_PATH']
+    while True:
+        time.sleep(interval)
+        signature = model_file_signature(path)
+        last_reload = model_status['last_reload'] or {}
+        if (signature is None or signature == model_status['file_signature']
+                or signature == last_reload.get('file_signature')):
+            continue
+        reload_model()
+
+def start_model_watcher():
+    """
+    Start the file watcher once per process. Under gunicorn it runs in each
+    worker (post_worker_init), never in the master before the fork.
+    """
+    global _watcher_pid
+    interval = app.config['MODEL_RELOAD_INTERVAL']
+    if interval <= 0 or _watcher_pid == os.getpid():
+        return
+    _watcher_pid = os.getpid()
+    threading.Thread(target=_watch_model_file, args=(interval,), name='model-watcher', daemon=True).start()
+
+def get_predictor(watch=True):
+    """
+    Return the predictor, loading the model on first use.
+    The lock makes concurrent first requests share a single load.
+    watch=False loads without starting the file watcher (gunicorn master).
+    """
+    if predictor is None:
+        with _predictor_lock:
+            if predictor is None:
+                load_model()
+    if predictor is not None and watch:
+        start_model_watcher()
+    return predictor
+
 # Weather API helper
 def get_weather_data(location="New Delhi"):
-    """Get weather data from OpenWeatherMap API"""
+    """Weather of a location from the shared weather provider (cached, see weather.py); None if unavailable"""
     try:
-        # Using OpenWeatherMap API (you'll need to sign up for a free API key)
-        api_key = os.environ.get('OPENWEATHER_API_KEY', 'demo')
-        
-        # Mock data for demo purposes
-        mock_weather = {
-            'current': {
-                'temp': 28.5,
-                'humidity': 65,
-                'description': 'Partly cloudy',
-                'wind_speed': 12,
-                'pressure': 1013,
-                'icon': '02d'
-            },
-            'forecast': [
-                {'day': 'Today', 'temp_max': 32, 'temp_min': 24, 'humidity': 65, 'description': 'Partly cloudy'},
-                {'day': 'Tomorrow', 'temp_max': 33, 'temp_min': 25, 'humidity': 60, 'description': 'Sunny'},
-                {'day': 'Day 3', 'temp_max': 31, 'temp_min': 23, 'humidity': 70, 'description': 'Cloudy'},
-                {'day': 'Day 4', 'temp_max': 29, 'temp_min': 22, 'humidity': 75, 'description': 'Light rain'},
-                {'day': 'Day 5', 'temp_max': 30, 'temp_min': 24, 'humidity': 68, 'description': 'Partly cloudy'},
-            ]
-        }
-        return mock_weather
+        return weather_provider.get(location or "New Delhi")
     except Exception as e:
         print(f"Error fetching weather: {e}")
         return None
@@ -229,89 +537,46 @@ def profile():
     return render_template('profile.html')
 
 # API Endpoints
-def calculate_water_requirement(crop_type, temperature, crop_days, soil_moisture):
+def calculate_water_requirement(crop_type, temperature, crop_days, soil_moisture, **weather):
     """
     Calculate water requirement using Hargreaves ETo method
+    One reading; water_requirement.water_requirements() does many at once.
+    With a latitude in weather, ETo follows FAO-56 (see evapotranspiration.py)
     """
-    # Crop coefficients (Kc) for different crops and growth stages
-    crop_kc = {
-        'Wheat': {'initial': 0.3, 'mid': 1.15, 'late': 0.4},
-        'Rice': {'initial': 1.05, 'mid': 1.2, 'late': 0.9},
-        'Cotton': {'initial': 0.35, 'mid': 1.15, 'late': 0.7},
-        'Sugarcane': {'initial': 0.4, 'mid': 1.25, 'late': 0.75},
-        'Maize': {'initial': 0.3, 'mid': 1.2, 'late': 0.6},
-        'Soybean': {'initial': 0.4, 'mid': 1.15, 'late': 0.5},
-        'default': {'initial': 0.35, 'mid': 1.0, 'late': 0.6}
-    }
-    
-    # Get Kc for crop (use default if not found)
-    kc_values = crop_kc.get(crop_type, crop_kc['default'])
-    
-    # Determine growth stage based on crop days
-    if crop_days < 30:
-        Kc = kc_values['initial']
-        stage = 'Initial'
-    elif crop_days < 90:
-        Kc = kc_values['mid']
-        stage = 'Mid-Season'
-    else:
-        Kc = kc_values['late']
-        stage = 'Late Season'
-    
-    # Hargreaves ETo calculation
-    # ETo = 0.0023 * (Tmean + 17.8) * ΔT^0.5 * Ra
-    # Simplified: Using default values for ΔT and Ra
-    Tmean = temperature
-    delta_T = 10  # Default temperature range (°C)
-    Ra = 25  # Approximate extraterrestrial radiation (MJ/m²/day) - varies by location and season
-    
-    ETo = 0.0023 * (Tmean + 17.8) * (delta_T ** 0.5) * Ra
-    
-    # Calculate crop evapotranspiration
-    ETc = Kc * ETo
-    
-    # Available Water (AW) - typical values for different soil types
-    # Assuming medium soil: 150 mm/m depth
-    AW = 150  # mm
-    
-    # Management Allowed Depletion (MAD) - typically 0.5 for most crops
-    MAD = 0.5
-    
-    # Current depletion based on soil moisture
-    # Assuming soil moisture is on scale 0-1000, where 1000 is field capacity
-    current_depletion = (1000 - soil_moisture) / 1000 * AW
-    
-    # Check if irrigation is needed
-    threshold = MAD * AW
-    
-    # Calculate irrigation amount needed
-    # f = fraction of AW to refill (typically 0.8-1.0)
-    f = 0.9
-    irrigation_needed = max(0, f * AW - (AW - current_depletion))
-    
-    # Convert to liters per square meter (1 mm = 1 L/m²)
-    irrigation_liters_per_m2 = irrigation_needed
-    
-    return {
-        'ETo': round(ETo, 2),  # mm/day
-        'Kc': round(Kc, 2),
-        'ETc': round(ETc, 2),  # mm/day
-        'growth_stage': stage,
-        'current_depletion': round(current_depletion, 2),  # mm
-        'threshold': round(threshold, 2),  # mm
-        'irrigation_amount': round(irrigation_needed, 2),  # mm
-        'irrigation_liters_per_m2': round(irrigation_liters_per_m2, 2),  # L/m²
-        'irrigation_liters_per_acre': round(irrigation_liters_per_m2 * 4046.86, 2),  # L/acre
-        'available_water': AW,
-        'MAD': MAD
-    }
+    return water_requirement.water_requirement(crop_type, temperature, crop_days, soil_moisture, **weather)
+
+# Optional request fields for FAO-56 ETo and the water_requirements() keywords they fill
+WEATHER_FIELDS = {
+    'latitude': 'latitude',
+    'temp_min': 'tmin',
+    'temp_max': 'tmax',
+    'wind_speed': 'wind_speed',  # m/s at 2 m
+    'elevation': 'elevation',  # m
+}
+
+def weather_inputs(data, humidity, rows=None):
+    """
+    Weather keywords for the water calculation from the optional request
+    fields; none without a latitude. Batch fields may be arrays, of which
+    rows selects the readings that need water.
+    """
+    if data.get('latitude') is None:
+        return {}
+    weather = {'humidity': humidity}
+    for field, keyword in WEATHER_FIELDS.items():
+        if data.get(field) is None:
+            continue
+        value = np.asarray(data[field], dtype=float)
+        weather[keyword] = value[rows] if rows is not None and value.ndim else value
+    return weather
 
 @app.route('/api/predict', methods=['POST'])
 @login_required
 def predict():
     """API endpoint for making predictions"""
     try:
-        if predictor is None:
+        current_predictor = get_predictor()
+        if current_predictor is None:
             return jsonify({'error': 'Model not loaded'}), 500
         
         data = request.get_json()
@@ -326,23 +591,30 @@ def predict():
                    temperature is not None, humidity is not None]):
             return jsonify({'error': 'All fields are required'}), 400
         
-        prediction, probability = predictor.predict(
+        prediction, probability = current_predictor.predict(
             crop_type, crop_days, soil_moisture, temperature, humidity
         )
         
         # Save prediction to database
-        pred_record = Prediction(
-            user_id=current_user.id,
-            crop_type=crop_type,
-            crop_days=crop_days,
-            soil_moisture=soil_moisture,
-            temperature=temperature,
-            humidity=humidity,
-            prediction=int(prediction),
-            confidence=float(max(probability))
-        )
-        db.session.add(pred_record)
-        db.session.commit()
+        row = {
+            'user_id': current_user.id,
+            'crop_type': crop_type,
+            'crop_days': crop_days,
+            'soil_moisture': soil_moisture,
+            'temperature': temperature,
+            'humidity': humidity,
+            'prediction': int(prediction),
+            'confidence': float(max(probability)),
+            'created_at': datetime.utcnow()
+        }
+        pred_record = None
+        # Irrigation predictions are written now: their id is returned for scheduling.
+        # The rest go to the write-behind queue, or are written here when it is full
+        if prediction == 1 or not app.config['PREDICTION_LOG_ASYNC'] or not prediction_writer.submit(row):
+            pred_record = Prediction(**row)
+            db.session.add(pred_record)
+            rollups.add_predictions(db.session, ROLLUP_TABLES, [row])
+            db.session.commit()
         
         result = {
             'prediction': int(prediction),
@@ -351,12 +623,14 @@ def predict():
             'probabilities': {
                 'no_irrigation': float(probability[0]),
                 'irrigation_needed': float(probability[1])
-            }
+            },
+            'model_version': current_predictor.model_version
         }
         
         # If irrigation is needed, calculate water requirement
         if prediction == 1:
-            water_calc = calculate_water_requirement(crop_type, temperature, crop_days, soil_moisture)
+            water_calc = calculate_water_requirement(crop_type, temperature, crop_days, soil_moisture,
+                                                     **weather_inputs(data, humidity))
             result['water_requirement'] = water_calc
             result['prediction_id'] = pred_record.id  # Include prediction ID for scheduling
         
@@ -365,14 +639,114 @@ def predict():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/predict/batch', methods=['POST'])
+@login_required
+def predict_batch():
+    """
+    API endpoint for bulk predictions.
+    Expects columnar arrays of equal length, e.g.
+    {"crop_type": [...], "crop_days": [...], "soil_moisture": [...],
+     "temperature": [...], "humidity": [...]}
+    Optional FAO-56 weather fields (WEATHER_FIELDS) are single values or
+    arrays of the same length.
+    """
+    try:
+        current_predictor = get_predictor()
+        if current_predictor is None:
+            return jsonify({'error': 'Model not loaded'}), 500
+        
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+        fields = ['crop_type', 'crop_days', 'soil_moisture', 'temperature', 'humidity']
+        columns = {field: data.get(field) for field in fields}
+        
+        if not all(isinstance(values, list) for values in columns.values()):
+            return jsonify({'error': 'All fields are required as arrays'}), 400
+        
+        n_rows = len(columns['crop_type'])
+        if n_rows == 0 or any(len(values) != n_rows for values in columns.values()):
+            return jsonify({'error': 'All arrays must be non-empty and of equal length'}), 400
+        
+        if any(isinstance(data.get(field), list) and len(data[field]) != n_rows for field in WEATHER_FIELDS):
+            return jsonify({'error': 'Weather arrays must have one value per reading'}), 400
+        
+        if n_rows > app.config['PREDICT_BATCH_MAX_SIZE']:
+            return jsonify({'error': f"Batch size exceeds {app.config['PREDICT_BATCH_MAX_SIZE']} readings"}), 400
+        
+        crop_types = columns['crop_type']
+        crop_days = np.asarray(columns['crop_days'], dtype=float)
+        soil_moisture = np.asarray(columns['soil_moisture'], dtype=float)
+        temperature = np.asarray(columns['temperature'], dtype=float)
+        humidity = np.asarray(columns['humidity'], dtype=float)
+        
+        predictions, probabilities = current_predictor.predict_batch(
+            crop_types, crop_days, soil_moisture, temperature, humidity
+        )
+        confidences = probabilities.max(axis=1)
+        
+        # Save all predictions with a single multi-row INSERT
+        created_at = datetime.utcnow()
+        rows = [{
+            'user_id': current_user.id,
+            'crop_type': crop_types[i],
+            'crop_days': float(crop_days[i]),
+            'soil_moisture': float(soil_moisture[i]),
+            'temperature': float(temperature[i]),
+            'humidity': float(humidity[i]),
+            'prediction': int(predictions[i]),
+            'confidence': float(confidences[i]),
+            'created_at': created_at
+        } for i in range(n_rows)]
+        prediction_ids = db.session.scalars(
+            insert(Prediction).returning(Prediction.id, sort_by_parameter_order=True),
+            rows
+        ).all()
+        rollups.add_predictions(db.session, ROLLUP_TABLES, rows)
+        db.session.commit()
+        
+        # Water requirements of every reading that needs irrigation, in one vectorized pass
+        needs_water = np.flatnonzero(predictions == 1)
+        water_requirements = dict(zip(needs_water.tolist(), water_requirement.to_dicts(
+            water_requirement.water_requirements(
+                np.asarray(crop_types, dtype=object)[needs_water], temperature[needs_water],
+                crop_days[needs_water], soil_moisture[needs_water],
+                **weather_inputs(data, humidity[needs_water], rows=needs_water)
+            )
+        )))
+        
+        results = []
+        for i in range(n_rows):
+            prediction = int(predictions[i])
+            result = {
+                'prediction': prediction,
+                'prediction_text': 'Irrigation Needed' if prediction == 1 else 'No Irrigation Needed',
+                'confidence': float(confidences[i]),
+                'probabilities': {
+                    'no_irrigation': float(probabilities[i, 0]),
+                    'irrigation_needed': float(probabilities[i, 1])
+                },
+                'prediction_id': prediction_ids[i]
+            }
+            if prediction == 1:
+                result['water_requirement'] = water_requirements[i]
+            results.append(result)
+        
+        return jsonify({'count': n_rows, 'model_version': current_predictor.model_version, 'results': results})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/crop_types')
 @login_required
 def get_crop_types():
     """Get available crop types"""
-    if predictor is None:
+    current_predictor = get_predictor()
+    if current_predictor is None:
         return jsonify({'error': 'Model not loaded'}), 500
     
-    crop_types = predictor.label_encoder.classes_.tolist()
+    crop_types = current_predictor.label_encoder.classes_.tolist()
     return jsonify({'crop_types': crop_types})
 
 @app.route('/api/weather')
@@ -453,7 +827,7 @@ def create_schedule():
         
         prediction_id = data.get('prediction_id')
         scheduled_time = data.get('scheduled_time')  # ISO format datetime
-        water_amount = float(data.get('water_amount'))
+        water_amount = data.get('water_amount')
         duration = float(data.get('duration', 60))  # default 60 minutes
         
         # Parse scheduled time
@@ -464,6 +838,16 @@ def create_schedule():
             tomorrow = datetime.utcnow() + timedelta(days=1)
             scheduled_dt = tomorrow.replace(hour=6, minute=0, second=0, microsecond=0)
         
+        # Default water amount: the irrigation amount of the prediction's reading
+        if water_amount is None:
+            prediction = Prediction.query.filter_by(id=prediction_id, user_id=current_user.id).first() if prediction_id else None
+            if prediction is None:
+                return jsonify({'success': False, 'message': 'water_amount is required without a prediction'}), 400
+            water_amount = calculate_water_requirement(
+                prediction.crop_type, prediction.temperature, prediction.crop_days, prediction.soil_moisture
+            )['irrigation_amount']
+        water_amount = float(water_amount)
+        
         # Create schedule
         schedule = IrrigationSchedule(
             user_id=current_user.id,
@@ -476,6 +860,7 @@ def create_schedule():
         
         db.session.add(schedule)
         db.session.commit()
+        schedule_queue.add(schedule.id, schedule.scheduled_time)
         
         return jsonify({
             'success': True,
@@ -487,6 +872,106 @@ def create_schedule():
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@app.route('/api/schedule/plan', methods=['POST'])
+@login_required
+def plan_irrigation():
+    """
+    Irrigation calendar from a soil water balance over the coming days (see
+    water_balance.py). Expects columnar arrays of fields, e.g.
+    {"crop_type": [...], "crop_days": [...], "soil_moisture": [...]}
+    and optionally "days" (horizon, default 7), "latitude" for FAO-56 ETo
+    and "create" (true adds the calendar as pending schedules at 6 AM).
+    Weather comes from the forecast of the user's location; days past the
+    forecast repeat its last temperatures with no rain. Schedules for times
+    already past are set to now.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'message': 'Expected a JSON object'}), 400
+        fields = ['crop_type', 'crop_days', 'soil_moisture']
+        columns = {field: data.get(field) for field in fields}
+        
+        if not all(isinstance(values, list) for values in columns.values()):
+            return jsonify({'success': False, 'message': 'All fields are required as arrays'}), 400
+        
+        n_fields = len(columns['crop_type'])
+        if n_fields == 0 or any(len(values) != n_fields for values in columns.values()):
+            return jsonify({'success': False, 'message': 'All arrays must be non-empty and of equal length'}), 400
+        
+        if n_fields > app.config['PREDICT_BATCH_MAX_SIZE']:
+            return jsonify({'success': False, 'message': f"At most {app.config['PREDICT_BATCH_MAX_SIZE']} fields per plan"}), 400
+        
+        try:
+            days = int(data.get('days', 7))
+            latitude = data.get('latitude')
+            latitude = None if latitude is None else float(latitude)
+            duration = float(data.get('duration', 60))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'days, latitude and duration must be numbers'}), 400
+        if not 1 <= days <= app.config['PLAN_MAX_DAYS']:
+            return jsonify({'success': False, 'message': f"days must be between 1 and {app.config['PLAN_MAX_DAYS']}"}), 400
+        
+        weather = get_weather_data(current_user.location or 'New Delhi') or {}
+        forecast = weather.get('forecast') or []
+        if not forecast:
+            return jsonify({'success': False, 'message': 'No weather forecast available'}), 503
+        daily = [forecast[min(day, len(forecast) - 1)] for day in range(days)]
+        tmax = np.array([day['temp_max'] for day in daily], dtype=float)
+        tmin = np.array([day['temp_min'] for day in daily], dtype=float)
+        # Rain isn't carried past the forecast: one wet day would hold off irrigation for the whole horizon
+        rain = np.array([(forecast[day].get('rain_mm') or 0.0) if day < len(forecast) else 0.0
+                         for day in range(days)], dtype=float)
+        
+        now = datetime.utcnow()
+        start = now.date()
+        eto = water_requirement.reference_et(
+            (tmin + tmax) / 2, latitude=latitude,
+            day_of_year=evapotranspiration.day_of_year(np.datetime64(start) + np.arange(days)),
+            tmin=tmin, tmax=tmax
+        )
+        balance = water_balance.plan_fields(
+            columns['crop_type'], np.asarray(columns['crop_days'], dtype=float),
+            np.asarray(columns['soil_moisture'], dtype=float), eto, rain=rain
+        )
+        calendar = water_balance.irrigation_calendar(balance, start)
+        
+        schedule_ids = []
+        if data.get('create'):
+            schedules = [IrrigationSchedule(
+                user_id=current_user.id,
+                # Today's 6 AM may already be past; schedule those for now rather than in the past
+                scheduled_time=max(datetime.combine(day, datetime.min.time()).replace(hour=6), now),
+                water_amount=amount,
+                duration=duration,
+                status='pending'
+            ) for field_calendar in calendar for day, amount in field_calendar]
+            db.session.add_all(schedules)
+            db.session.commit()
+            for schedule in schedules:
+                schedule_queue.add(schedule.id, schedule.scheduled_time)
+            schedule_ids = [schedule.id for schedule in schedules]
+        
+        total_irrigation = balance.irrigation.sum(axis=1).round(2).tolist()
+        final_depletion = balance.depletion[:, -1].round(2).tolist()
+        stress_days = balance.stress.sum(axis=1).tolist()
+        return jsonify({
+            'success': True,
+            'start': start.isoformat(),
+            'days': days,
+            'fields': [{
+                'irrigation': [{'date': day.isoformat(), 'amount': amount} for day, amount in calendar[i]],
+                'total_irrigation': total_irrigation[i],  # mm
+                'final_depletion': final_depletion[i],  # mm
+                'stress_days': stress_days[i]
+            } for i in range(n_fields)],
+            'schedule_ids': schedule_ids
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @app.route('/api/schedule/list')
 @login_required
 def list_schedules():
@@ -526,6 +1011,7 @@ def cancel_schedule(schedule_id):
         schedule.status = 'cancelled'
         schedule.cancellation_reason = 'Cancelled by user'
         db.session.commit()
+        schedule_queue.remove(schedule_id)
         
         return jsonify({'success': True, 'message': 'Schedule cancelled'})
         
@@ -556,37 +1042,84 @@ def execute_schedule_now(schedule_id):
 
 # ============= ANALYTICS ENDPOINTS =============
 
+def analytics_fingerprint(user=None):
+    """
+    Identifies the data behind a user's analytics (or the system-wide ones
+    without a user) for the chart cache and ETags. The account's creation
+    time tells a new user apart from a deleted one with the same id.
+    """
+    if user is None:
+        return f"{User.query.count()}:{rollups.prediction_count(db.session, ROLLUP_TABLES)}"
+    return f"{user.created_at}:{rollups.prediction_count(db.session, ROLLUP_TABLES, user.id)}"
+
+def cached_analytics(scope, names, fingerprint, build):
+    """get_or_build() on the chart cache, or build() when it is disabled"""
+    if chart_cache is None:
+        return build()
+    return chart_cache.get_or_build(scope, names, fingerprint, build)
+
 @app.route('/analytics')
 @login_required
 def analytics_page():
-    """Analytics dashboard page"""
-    from analytics import generate_user_analytics, calculate_stats
-    
-    # Get user's predictions
-    predictions = Prediction.query.filter_by(user_id=current_user.id).order_by(Prediction.created_at.desc()).limit(100).all()
+    """Analytics dashboard page; charts are loaded from /api/analytics/<chart>"""
+    from analytics import stats_from_rollup
     
-    # Generate charts
-    charts = generate_user_analytics(predictions)
-    stats = calculate_stats(predictions)
+    def build():
+        return {'stats': stats_from_rollup(rollups.read(db.session, ROLLUP_TABLES, user_id=current_user.id))}
     
-    return render_template('analytics.html', charts=charts, stats=stats)
+    stats = cached_analytics(current_user.id, ('stats',), analytics_fingerprint(current_user), build)['stats']
+    return render_template('analytics.html', stats=stats)
 
 @app.route('/admin/analytics')
 @login_required
 def admin_analytics():
-    """System-wide analytics (admin only)"""
+    """System-wide analytics (admin only); charts are loaded from /api/analytics/<chart>"""
     if not current_user.is_admin:
         return redirect(url_for('analytics_page'))
     
-    from analytics import generate_system_analytics
+    from analytics import SYSTEM_CHARTS
+    return render_template('admin_analytics.html', charts=SYSTEM_CHARTS)
+
+@app.route('/api/analytics/<chart>')
+@login_required
+def analytics_chart(chart):
+    """
+    Aggregated series of one analytics chart (bins, counts, rates), for
+    rendering in the browser. Responses carry an ETag of the underlying
+    data, so unchanged charts are answered with 304 Not Modified.
+    """
+    from analytics import CHART_SOURCES, READING_COLUMNS, SYSTEM_CHARTS, USER_CHARTS, chart_series
+    from prediction_data import prediction_frame, user_totals
+    
+    if chart in SYSTEM_CHARTS:
+        if not current_user.is_admin:
+            return jsonify({'success': False, 'message': 'Unauthorized'}), 403
+        user, scope = None, 'system'
+    elif chart in USER_CHARTS:
+        user, scope = current_user, current_user.id
+    else:
+        return jsonify({'success': False, 'message': f'Unknown chart: {chart}'}), 404
     
-    # Get all predictions
-    all_predictions = Prediction.query.order_by(Prediction.created_at.desc()).limit(500).all()
+    user_id = user.id if user is not None else None
+    fingerprint = analytics_fingerprint(user)
     
-    # Generate system-wide charts
-    charts = generate_system_analytics(all_predictions)
+    def build():
+        # Each chart reads only its own source, in one query
+        source = CHART_SOURCES[chart]
+        if source == 'readings':
+            # Charts of individual readings show the latest 100
+            data = prediction_frame(user_id, limit=100, columns=READING_COLUMNS)
+        elif source == 'user_totals':
+            data = user_totals(limit=10)
+        else:
+            data = rollups.read_table(db.session, ROLLUP_TABLES, source, user_id=user_id)
+        return {chart: chart_series(chart, data)}
     
-    return render_template('admin_analytics.html', charts=charts)
+    data = cached_analytics(scope, (chart,), fingerprint, build).get(chart)
+    response = jsonify({'success': True, 'chart': chart, 'data': data})
+    response.set_etag(f"{scope}:{chart}:{fingerprint}")
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
 
 @app.route('/admin')
 @login_required
@@ -595,21 +1128,91 @@ def admin():
     if not current_user.is_admin:
         return redirect(url_for('dashboard'))
     
-    users = User.query.all()
-    predictions = Prediction.query.order_by(Prediction.created_at.desc()).limit(50).all()
+    from stats_service import admin_stats, recent_prediction_rows, user_rows
     
-    stats = {
-        'total_users': User.query.count(),
-        'total_predictions': Prediction.query.count(),
-        'predictions_today': Prediction.query.filter(
-            Prediction.created_at >= datetime.utcnow().date()
-        ).count(),
-        'irrigation_needed': Prediction.query.filter_by(prediction=1).count(),
-        'no_irrigation': Prediction.query.filter_by(prediction=0).count()
-    }
+    # Plain rows with only the columns the tables show
+    users = user_rows()
+    predictions = recent_prediction_rows(limit=50)
+    stats = admin_stats()
     
     return render_template('admin.html', users=users, predictions=predictions, stats=stats)
 
+@app.route('/api/admin/prediction_cache')
+@login_required
+def prediction_cache_stats():
+    """Prediction cache counters (admin only)"""
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 403
+    
+    if prediction_cache is None:
+        return jsonify({'success': True, 'enabled': False})
+    return jsonify({'success': True, 'enabled': True, 'stats': prediction_cache.stats()})
+
+@app.route('/api/admin/prediction_log')
+@login_required
+def prediction_log_stats():
+    """Write-behind prediction log counters (admin only)"""
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 403
+    
+    return jsonify({'success': True, 'enabled': app.config['PREDICTION_LOG_ASYNC'],
+                    'stats': prediction_writer.stats()})
+
+@app.route('/api/admin/chart_cache')
+@login_required
+def chart_cache_stats():
+    """Analytics chart cache counters (admin only)"""
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 403
+    
+    if chart_cache is None:
+        return jsonify({'success': True, 'enabled': False})
+    return jsonify({'success': True, 'enabled': True, 'stats': chart_cache.stats()})
+
+@app.route('/api/admin/weather')
+@login_required
+def weather_stats():
+    """Weather provider cache counters (admin only)"""
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 403
+    
+    return jsonify({'success': True, 'stats': weather_provider.stats()})
+
+@app.route('/api/admin/model')
+@login_required
+def model_info():
+    """Version and reload state of the served model (admin only)"""
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 403
+    
+    status = {key: value for key, value in model_status.items() if key != 'file_signature'}
+    status['reloading'] = _reload_lock.locked()
+    return jsonify({'success': True, 'model': status})
+
+@app.route('/api/admin/model/reload', methods=['POST'])
+@login_required
+def model_reload():
+    """
+    Reload the model file without restarting (admin only).
+    Runs in the background unless {"wait": true} is posted. With several
+    gunicorn workers this only reaches one of them; the others pick up the
+    new file through their watcher (MODEL_RELOAD_INTERVAL).
+    """
+    if not current_user.is_admin:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    if _reload_lock.locked():
+        return jsonify({'success': False, 'message': 'A reload is already in progress'}), 409
+    if data.get('wait'):
+        success, message = reload_model()
+        if not success:
+            return jsonify({'success': False, 'message': message}), 500
+        return jsonify({'success': True, 'message': message, 'version': model_status['version']})
+    
+    start_model_reload()
+    return jsonify({'success': True, 'message': 'Reload started'}), 202
+
 @app.route('/api/admin/delete_user/<int:user_id>', methods=['DELETE'])
 @login_required
 def delete_user(user_id):
@@ -624,6 +1227,11 @@ def delete_user(user_id):
         
         # Delete user's predictions first
         Prediction.query.filter_by(user_id=user_id).delete()
+        PredictionRollup.query.filter_by(user_id=user_id).delete()
+        MoistureRollup.query.filter_by(user_id=user_id).delete()
+        if chart_cache is not None:
+            from analytics import USER_CHARTS
+            chart_cache.invalidate(user_id, USER_CHARTS + ('stats',))
         db.session.delete(user)
         db.session.commit()
         return jsonify({'success': True, 'message': 'User deleted successfully'})
@@ -646,20 +1254,10 @@ def toggle_admin(user_id):
         return jsonify({'success': True, 'is_admin': user.is_admin})
     return jsonify({'success': False, 'message': 'User not found'}), 404
 
-# Initialize database and load model on startup
+# Initialize database on startup: a schema version check, see migrate_db.py
 with app.app_context():
-    # Drop and recreate all tables (for development)
-    import os
-    if not os.path.exists('instance/farmers.db'):
-        db.create_all()
-    else:
-        # Check if migration is needed
-        try:
-            User.query.first()
-        except:
-            # Table structure changed, recreate
-            db.drop_all()
-            db.create_all()
+    from migrate_db import ensure_schema
+    ensure_schema(db, auto_migrate=app.config['DB_AUTO_MIGRATE'])
     
     try:
         # Create demo user if not exists
@@ -696,11 +1294,12 @@ with app.app_context():
     except Exception as e:
         print(f"Error creating users: {e}")
 
-load_model()
-
 if __name__ == '__main__':
-    if load_model():
+    if get_predictor() is not None:
         print("Starting Flask app...")
+        # The reloader runs the app in a child process; start the queue only there
+        if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            start_schedule_queue()
         import socket
         def find_free_port(start_port=5000):
             for port in range(start_port, start_port + 10):
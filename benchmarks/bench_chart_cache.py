@@ -0,0 +1,73 @@
+"""
+Chart cache benchmark - analytics latency with and without cached charts
+Seeds a throwaway database with one user's predictions, then requests
+/analytics and the series of its charts through the test client: with the cache disabled, on the first
+(cold) request, on repeated (warm) requests and from a fresh process-level
+cache backed by the disk directory.
+Run from the project root: python benchmarks/bench_chart_cache.py [predictions]
+"""
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+TMP = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TMP, 'bench.db')}"
+os.environ['CHART_CACHE_DIR'] = os.path.join(TMP, 'charts')
+os.environ['SCHEDULER_ENABLED'] = '0'
+
+import app as app_module
+from app import app, _insert_predictions, User
+from analytics import USER_CHARTS
+from chart_cache import ChartCache
+
+def seed(user_id, n):
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    for start in range(0, n, 5000):
+        _insert_predictions([{
+            'user_id': user_id, 'crop_type': rng.choice(['Wheat', 'Rice', 'Maize']), 'crop_days': 30.0,
+            'soil_moisture': rng.uniform(100, 900), 'temperature': rng.uniform(20, 40),
+            'humidity': rng.uniform(30, 90), 'prediction': rng.randint(0, 1),
+            'confidence': rng.uniform(0.5, 1.0), 'created_at': now - timedelta(minutes=rng.randrange(525600))
+        } for _ in range(min(5000, n - start))])
+
+def timed_get(client, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        responses = [client.get(url) for url in ['/analytics'] + [f'/api/analytics/{chart}' for chart in USER_CHARTS]]
+        timings.append(time.perf_counter() - start)
+        assert all(response.status_code == 200 for response in responses)
+    return statistics.median(timings) * 1000, sum(len(response.data) for response in responses)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    client = app.test_client()
+    client.post('/login', data=json.dumps({'username': 'farmer', 'password': 'farmer123'}),
+                content_type='application/json')
+    with app.app_context():
+        seed(User.query.filter_by(username='farmer').first().id, n)
+
+    cache = app_module.chart_cache
+    app_module.chart_cache = None
+    uncached_ms, page_bytes = timed_get(client, 5)
+    app_module.chart_cache = cache
+    cold_ms, _ = timed_get(client, 1)
+    warm_ms, _ = timed_get(client, 20)
+    app_module.chart_cache = ChartCache(directory=os.environ['CHART_CACHE_DIR'])
+    disk_ms, _ = timed_get(client, 1)
+
+    print(f"/analytics and {len(USER_CHARTS)} charts with {n} predictions ({page_bytes} bytes)")
+    for label, ms in (('no cache', uncached_ms), ('cold cache', cold_ms),
+                      ('warm cache', warm_ms), ('disk (restart)', disk_ms)):
+        print(f"{label:<16}{ms:>10.1f} ms")
+
+if __name__ == '__main__':
+    main()
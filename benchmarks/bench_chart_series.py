@@ -0,0 +1,57 @@
+"""
+Chart series benchmark - build time and payload of the analytics chart series
+Builds one user's chart series, as /api/analytics/<chart> returns them,
+from a rollup of synthetic predictions plus the latest 100 readings and
+reports the build time and JSON size of each chart.
+Run from the project root: python benchmarks/bench_chart_series.py [predictions]
+"""
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import rollups
+from analytics import CHART_SOURCES, USER_CHARTS, chart_series
+
+def make_predictions(n):
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    return [SimpleNamespace(
+        user_id=1, crop_type=rng.choice(['Wheat', 'Rice', 'Maize']), crop_days=30.0,
+        soil_moisture=rng.uniform(100, 900), temperature=rng.uniform(20, 40),
+        humidity=rng.uniform(30, 90), prediction=rng.randint(0, 1),
+        confidence=rng.uniform(0.5, 1.0), created_at=now - timedelta(minutes=rng.randrange(525600))
+    ) for _ in range(n)]
+
+def timed(fn, repeats=3):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    predictions = make_predictions(n)
+    rollup = rollups.from_predictions(predictions)
+    recent = sorted(predictions, key=lambda p: p.created_at, reverse=True)[:100]
+    sources = {'daily': rollup.daily, 'moisture': rollup.moisture, 'readings': recent}
+
+    print(f"{len(USER_CHARTS)} user charts from {n} predictions")
+    total_ms = total_bytes = 0
+    for chart in USER_CHARTS:
+        ms, data = timed(lambda: chart_series(chart, sources[CHART_SOURCES[chart]]))
+        size = len(json.dumps({'success': True, 'chart': chart, 'data': data}))
+        total_ms += ms
+        total_bytes += size
+        print(f"{chart:<14}{ms:>10.1f} ms{size:>12} bytes")
+    print(f"{'total':<14}{total_ms:>10.1f} ms{total_bytes:>12} bytes")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Concurrent write load test - prediction inserts from several worker processes
+Forks workers the way gunicorn does; each one saves Prediction rows one
+request at a time (add + commit, like /api/predict) for a fixed duration.
+Runs once with SQLite's defaults (SQLITE_TUNING=0) and once with the
+WAL/pragma settings, each against a fresh throwaway database.
+Run from the project root: python benchmarks/bench_concurrent_writes.py [workers] [seconds]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Executed in a fresh interpreter per mode; prints one JSON line
+PROBE = '''
+import json, multiprocessing, sys, time
+sys.path.insert(0, {root!r})
+from app import app, db, Prediction, User
+from database import dispose_after_fork, sqlite_settings
+
+with app.app_context():
+    user_id = User.query.filter_by(username='farmer').first().id
+    settings = sqlite_settings(db.engine)
+
+def worker(results):
+    dispose_after_fork(app, db)
+    written = locked = other = 0
+    latencies = []
+    deadline = time.perf_counter() + {seconds}
+    with app.app_context():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                db.session.add(Prediction(user_id=user_id, crop_type='Wheat', crop_days=30, soil_moisture=350,
+                                          temperature=28, humidity=65, prediction=1, confidence=0.9))
+                db.session.commit()
+                written += 1
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                db.session.rollback()
+                if 'locked' in str(e):
+                    locked += 1
+                else:
+                    other += 1
+    results.put((written, locked, other, latencies))
+
+context = multiprocessing.get_context('fork')
+results = context.Queue()
+processes = [context.Process(target=worker, args=(results,)) for _ in range({workers})]
+for process in processes:
+    process.start()
+collected = [results.get() for _ in processes]
+for process in processes:
+    process.join()
+
+latencies = sorted(latency for _, _, _, worker_latencies in collected for latency in worker_latencies)
+written = sum(c[0] for c in collected)
+print(json.dumps({{
+    'written': written,
+    'per_second': written / {seconds},
+    'locked_errors': sum(c[1] for c in collected),
+    'other_errors': sum(c[2] for c in collected),
+    'p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else None,
+    'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else None,
+    'journal_mode': settings['journal_mode'],
+}}))
+'''
+
+MODES = [
+    ('SQLite defaults', '0'),
+    ('WAL + pragmas', '1'),
+]
+
+def run_mode(tuning, workers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, SQLITE_TUNING=tuning, SCHEDULER_ENABLED='0',
+                   DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'load.db')}")
+        probe = PROBE.format(root=ROOT, workers=workers, seconds=seconds)
+        output = subprocess.run(
+            [sys.executable, '-c', probe], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def run_benchmark(workers=8, seconds=5):
+    print("=" * 78)
+    print(f"CONCURRENT PREDICTION WRITES ({workers} worker processes, {seconds}s, commit per row)")
+    print("=" * 78)
+    print(f"{'mode':<18}{'journal':>9}{'rows/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'locked':>10}{'other':>8}")
+    results = {}
+    for label, tuning in MODES:
+        r = results[label] = run_mode(tuning, workers, seconds)
+        p50 = f"{r['p50_ms']:.2f}" if r['p50_ms'] is not None else '-'
+        p99 = f"{r['p99_ms']:.2f}" if r['p99_ms'] is not None else '-'
+        print(f"{label:<18}{r['journal_mode']:>9}{r['per_second']:>10.0f}{p50:>10}{p99:>10}"
+              f"{r['locked_errors']:>10}{r['other_errors']:>8}")
+    print("=" * 78)
+    return results
+
+if __name__ == '__main__':
+    run_benchmark(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,47 @@
+"""
+Evapotranspiration benchmark - FAO-56 ETo for a batch of fields
+Times, for random latitudes and days of the year: Ra from the equation vs
+the precomputed RA_TABLE, then Hargreaves and Penman-Monteith ETo over the
+whole batch, and building the table itself.
+Run from the project root: python benchmarks/bench_evapotranspiration.py [fields]
+"""
+import os
+import sys
+import time
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import evapotranspiration as et
+
+def timed(fn, repeats=5):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = np.random.default_rng(0)
+    latitude = rng.uniform(-60, 60, n)
+    day = rng.integers(1, 367, n)
+    tmin = rng.uniform(5, 25, n)
+    tmax = tmin + rng.uniform(4, 15, n)
+    humidity = rng.uniform(20, 95, n)
+    wind_speed = rng.uniform(0.5, 5, n)
+
+    error = np.max(np.abs(et.RA_TABLE.lookup(latitude, day) - et.extraterrestrial_radiation(latitude, day)))
+    print(f"FAO-56 ETo of {n} fields (Ra table max error {error:.4f} MJ/m²/day)")
+    for label, fn in (
+        ('build Ra table', lambda: et.RaTable()),
+        ('Ra equation', lambda: et.extraterrestrial_radiation(latitude, day)),
+        ('Ra table', lambda: et.RA_TABLE.lookup(latitude, day)),
+        ('hargreaves', lambda: et.reference_et(tmin, tmax, latitude, day)),
+        ('penman-monteith', lambda: et.reference_et(tmin, tmax, latitude, day, humidity, wind_speed)),
+    ):
+        print(f"{label:<17}{timed(fn):>10.1f} ms")
+
+if __name__ == '__main__':
+    main()
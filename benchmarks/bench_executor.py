@@ -0,0 +1,35 @@
+"""
+Executor benchmark - irrigation throughput with a slow simulated valve
+Runs 400 schedules over 100 farms through ScheduleExecutor at several
+concurrency limits; every valve call sleeps for VALVE_SECONDS.
+Run from the project root: python benchmarks/bench_executor.py
+"""
+import os
+import sys
+import time
+from types import SimpleNamespace
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from schedule_executor import ScheduleExecutor
+
+VALVE_SECONDS = 0.02
+
+def slow_valve(schedule):
+    time.sleep(VALVE_SECONDS)
+
+def run_benchmark(n_farms=100, per_farm=4, worker_counts=(1, 4, 16, 64)):
+    schedules = [SimpleNamespace(id=farm * per_farm + i, user_id=farm)
+                 for farm in range(n_farms) for i in range(per_farm)]
+    print("=" * 70)
+    print(f"EXECUTOR ({len(schedules)} schedules, {n_farms} farms, {VALVE_SECONDS * 1000:.0f} ms per valve call)")
+    print("=" * 70)
+    print(f"{'workers':<10}{'seconds':>12}{'per second':>14}{'p50 ms':>11}{'p95 ms':>11}{'wait p95 ms':>12}")
+    for workers in worker_counts:
+        _, stats = ScheduleExecutor(slow_valve, max_workers=workers, poll_interval=0.005).run(schedules)
+        print(f"{workers:<10}{stats['seconds']:>12.2f}{stats['throughput_per_s']:>14.1f}"
+              f"{stats['latency_p50_s'] * 1000:>11.1f}{stats['latency_p95_s'] * 1000:>11.1f}"
+              f"{stats['queue_wait_p95_s'] * 1000:>12.1f}")
+    print("=" * 70)
+
+if __name__ == '__main__':
+    run_benchmark()
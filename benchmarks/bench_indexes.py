@@ -0,0 +1,119 @@
+"""
+Index benchmark - EXPLAIN plans and latency of hot queries before and after
+Seeds a throwaway SQLite database with a million predictions and 100k
+schedules, drops the composite indexes, times the app's hot queries, then
+adds the indexes back with the migration that creates them and times them again.
+Run from the project root: python benchmarks/bench_indexes.py [n_predictions]
+"""
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+N_USERS = 1000
+NOW = datetime(2025, 6, 1, 12, 0, 0)
+
+# (label, SQL, parameters) mirroring the ORM queries in app.py and scheduler.py
+QUERIES = [
+    ('user prediction history',
+     "SELECT * FROM prediction WHERE user_id = ? ORDER BY created_at DESC LIMIT 20", (42,)),
+    ('admin latest predictions',
+     "SELECT * FROM prediction ORDER BY created_at DESC LIMIT 50", ()),
+    ('admin predictions today',
+     "SELECT count(*) FROM prediction WHERE created_at >= ?", (NOW.replace(hour=0).isoformat(' '),)),
+    ('due schedules',
+     "SELECT id FROM irrigation_schedule WHERE status = 'pending' AND scheduled_time <= ?", (NOW.isoformat(' '),)),
+    ('user schedule list',
+     "SELECT * FROM irrigation_schedule WHERE user_id = ? ORDER BY scheduled_time DESC LIMIT 50", (42,)),
+]
+
+def create_schema(db_path):
+    """Tables (with indexes) exactly as the app defines them"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    from app import app, db
+    with app.app_context():
+        db.create_all()
+
+def seed(conn, n_predictions):
+    rng = random.Random(0)
+    conn.executemany(
+        "INSERT INTO user (username, email, password_hash, location) VALUES (?, ?, 'x', 'Town')",
+        [(f'bench{i}', f'bench{i}@test.com') for i in range(N_USERS)]
+    )
+    def predictions():
+        for i in range(n_predictions):
+            created = NOW - timedelta(seconds=rng.randrange(365 * 86400))
+            yield (rng.randint(1, N_USERS), 'Wheat', 30.0, rng.uniform(100, 900), 28.0, 60.0,
+                   rng.randint(0, 1), 0.9, created.isoformat(' '))
+    conn.executemany(
+        "INSERT INTO prediction (user_id, crop_type, crop_days, soil_moisture, temperature, humidity,"
+        " prediction, confidence, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", predictions()
+    )
+    def schedules():
+        for i in range(n_predictions // 10):
+            when = NOW + timedelta(seconds=rng.randrange(-180 * 86400, 30 * 86400))
+            status = 'pending' if when > NOW or rng.random() < 0.01 else rng.choice(['completed', 'postponed', 'cancelled'])
+            yield (rng.randint(1, N_USERS), when.isoformat(' '), status, 20.0, 30.0)
+    conn.executemany(
+        "INSERT INTO irrigation_schedule (user_id, scheduled_time, status, water_amount, duration)"
+        " VALUES (?, ?, ?, ?, ?)", schedules()
+    )
+    conn.commit()
+
+def measure(conn, repeats=20):
+    """Median latency and query plan of every hot query"""
+    results = {}
+    for label, sql, params in QUERIES:
+        plan = ' | '.join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            timings.append(time.perf_counter() - start)
+        results[label] = (statistics.median(timings) * 1000, plan)
+    return results
+
+def run_benchmark(n_predictions=1_000_000):
+    from sqlalchemy import create_engine
+    from migrate_db import INDEXES, add_hot_path_indexes
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        create_schema(db_path)
+        conn = sqlite3.connect(db_path)
+        for name, _, _ in INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        print(f"Seeding {n_predictions} predictions and {n_predictions // 10} schedules...")
+        seed(conn, n_predictions)
+        conn.execute("ANALYZE")
+
+        before = measure(conn)
+        conn.close()
+        engine = create_engine(f'sqlite:///{db_path}')
+        add_hot_path_indexes(engine)
+        engine.dispose()
+        # A fresh connection, so the plans see the indexes the migration added
+        conn = sqlite3.connect(db_path)
+        after = measure(conn)
+        conn.close()
+
+    print("=" * 90)
+    print(f"HOT QUERIES ({n_predictions} predictions, median of 20 runs)")
+    print("=" * 90)
+    print(f"{'query':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for label, _, _ in QUERIES:
+        print(f"{label:<28}{before[label][0]:>12.3f}{after[label][0]:>12.3f}{before[label][0] / after[label][0]:>9.0f}x")
+    print("-" * 90)
+    for label, _, _ in QUERIES:
+        print(f"{label}\n  before: {before[label][1]}\n  after:  {after[label][1]}")
+    print("=" * 90)
+    return before, after
+
+if __name__ == '__main__':
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
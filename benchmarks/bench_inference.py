@@ -0,0 +1,64 @@
+"""
+Inference micro-benchmark - per-call latency of IrrigationPredictor.predict
+Run from the project root: python benchmarks/bench_inference.py
+"""
+import os
+import sys
+import timeit
+import warnings
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from model import IrrigationPredictor
+from prediction_cache import PredictionCache
+
+MODEL_PATH = os.path.join(ROOT, 'irrigation_model.pkl')
+READING = ('Wheat', 30, 350, 28, 65)
+
+def two_pass_predict(predictor, crop_type, crop_days, soil_moisture, temperature, humidity):
+    """Old inference path: walks the forest once for the label, once for the probabilities"""
+    features = predictor._build_features([crop_type], [crop_days], [soil_moisture], [temperature], [humidity])
+    features_scaled = predictor.scaler.transform(features)
+    prediction = predictor.model.predict(features_scaled)[0]
+    probability = predictor.model.predict_proba(features_scaled)[0]
+    return prediction, probability
+
+def time_call(func, number=200, repeat=5):
+    """Best-of-repeat latency of one call, in microseconds"""
+    timings = timeit.repeat(func, number=number, repeat=repeat)
+    return min(timings) / number * 1e6
+
+def run_benchmark():
+    """Time every inference path on the same reading and print a table"""
+    warnings.simplefilter('ignore', UserWarning)
+
+    predictor = IrrigationPredictor()
+    predictor.load_model(MODEL_PATH)
+    flat = IrrigationPredictor(backend='flat')
+    flat.load_model(MODEL_PATH)
+    folded = IrrigationPredictor(backend='flat')
+    folded.load_model(MODEL_PATH)
+    folded.fold_scaler()
+    cached = IrrigationPredictor(backend='flat')
+    cached.enable_cache(PredictionCache())
+    cached.load_model(MODEL_PATH)
+
+    results = [
+        ('two-pass (predict + predict_proba)', time_call(lambda: two_pass_predict(predictor, *READING))),
+        ('single-pass (predict)', time_call(lambda: predictor.predict(*READING))),
+        ('flat engine backend (predict)', time_call(lambda: flat.predict(*READING))),
+        ('flat engine, scaler folded (predict)', time_call(lambda: folded.predict(*READING))),
+        ('prediction cache hit (predict)', time_call(lambda: cached.predict(*READING))),
+    ]
+
+    baseline = results[0][1]
+    print("=" * 70)
+    print(f"{'Inference path':<45}{'µs/call':>12}{'speedup':>12}")
+    print("=" * 70)
+    for name, micros in results:
+        print(f"{name:<45}{micros:>12.1f}{baseline / micros:>11.2f}x")
+    print("=" * 70)
+    return results
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,84 @@
+"""
+Prediction data benchmark - ORM objects vs a columnar prediction frame
+Seeds a throwaway SQLite database with predictions from 200 users, then
+loads every prediction for the admin charts both ways and times it:
+- Prediction objects copied into dicts, with p.user.username per row
+  (the lazy relationship load behind the N+1 queries)
+- prediction_data.prediction_frame(): one joined query read by pandas
+The number of SQL statements of each is reported too.
+Run from the project root: python benchmarks/bench_prediction_data.py [predictions]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+TMP = tempfile.mkdtemp()
+DB_PATH = os.path.join(TMP, 'bench.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+os.environ['SCHEDULER_ENABLED'] = '0'
+
+import pandas as pd
+from sqlalchemy import event
+from app import app, db, Prediction
+from prediction_data import prediction_frame
+
+N_USERS = 200
+CROPS = ['Wheat', 'Rice', 'Cotton', 'Sugarcane', 'Maize', 'Soybean']
+
+def seed(n):
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    conn = sqlite3.connect(DB_PATH)
+    conn.executemany(
+        "INSERT INTO user (username, email, password_hash, is_admin) VALUES (?, ?, 'x', 0)",
+        [(f'bench{i}', f'bench{i}@test.com') for i in range(N_USERS)]
+    )
+    user_ids = [row[0] for row in conn.execute("SELECT id FROM user")]
+    conn.executemany(
+        "INSERT INTO prediction (user_id, crop_type, crop_days, soil_moisture, temperature, humidity,"
+        " prediction, confidence, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(rng.choice(user_ids), rng.choice(CROPS), 30.0, rng.uniform(100, 900), rng.uniform(20, 40),
+          rng.uniform(30, 90), rng.randint(0, 1), rng.uniform(0.5, 1.0),
+          (now - timedelta(seconds=rng.randrange(365 * 86400))).isoformat(' ')) for _ in range(n)]
+    )
+    conn.commit()
+    conn.close()
+
+def orm_frame():
+    rows = []
+    for p in Prediction.query.all():
+        rows.append({
+            'user_id': p.user_id, 'username': p.user.username, 'crop_type': p.crop_type,
+            'soil_moisture': p.soil_moisture, 'temperature': p.temperature, 'humidity': p.humidity,
+            'prediction': p.prediction, 'confidence': p.confidence, 'created_at': p.created_at
+        })
+    return pd.DataFrame(rows)
+
+def measure(load):
+    statements = []
+    count = lambda *args: statements.append(1)
+    db.session.remove()
+    event.listen(db.engine, 'before_cursor_execute', count)
+    start = time.perf_counter()
+    frame = load()
+    elapsed = time.perf_counter() - start
+    event.remove(db.engine, 'before_cursor_execute', count)
+    return elapsed * 1000, len(statements), len(frame)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    with app.app_context():
+        seed(n)
+        print(f"{n} predictions from {N_USERS} users")
+        for label, load in (('orm objects', orm_frame), ('prediction frame', prediction_frame)):
+            ms, statements, rows = measure(load)
+            print(f"{label:<18}{ms:>10.1f} ms{statements:>8} queries{rows:>10} rows")
+
+if __name__ == '__main__':
+    main()
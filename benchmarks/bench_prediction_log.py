@@ -0,0 +1,78 @@
+"""
+Prediction logging benchmark - synchronous commit vs write-behind queue
+Saves N Prediction rows from several request threads, once with an add +
+commit per row (the old /api/predict path) and once through
+PredictionWriter, and reports the time a request spends logging and the
+total time until every row is in the database.
+Uses a throwaway database.
+Run from the project root: python benchmarks/bench_prediction_log.py [rows] [threads]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+TMP = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TMP, 'bench.db')}"
+os.environ['SCHEDULER_ENABLED'] = '0'
+
+from app import app, db, Prediction, User, prediction_writer
+
+def make_row(user_id, i):
+    return {'user_id': user_id, 'crop_type': 'Wheat', 'crop_days': i % 120, 'soil_moisture': 350,
+            'temperature': 28, 'humidity': 65, 'prediction': 0, 'confidence': 0.9}
+
+def log_sync(row):
+    with app.app_context():
+        db.session.add(Prediction(**row))
+        db.session.commit()
+
+def log_async(row):
+    if not prediction_writer.submit(row):
+        log_sync(row)
+
+def run(log, rows, threads, user_id):
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(offset):
+        mine = []
+        for i in range(offset, rows, threads):
+            start = time.perf_counter()
+            log(make_row(user_id, i))
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    prediction_writer.flush()
+    total = time.perf_counter() - start
+    latencies.sort()
+    return total, latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    with app.app_context():
+        user_id = User.query.filter_by(username='farmer').first().id
+
+    print(f"{rows} predictions from {threads} threads")
+    print(f"{'mode':<14}{'rows/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, log in (('sync commit', log_sync), ('write-behind', log_async)):
+        total, p50, p99 = run(log, rows, threads, user_id)
+        print(f"{name:<14}{rows / total:>10.0f}{p50:>10.3f}{p99:>10.3f}")
+
+    with app.app_context():
+        stored = db.session.query(Prediction).count()
+    print(f"rows stored: {stored} (expected {2 * rows}); writer stats: {prediction_writer.stats()}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Rollup benchmark - full-history analytics from raw rows vs daily rollups
+Seeds a throwaway SQLite database with one user's predictions spread over
+a year (through the app's own insert path, so the rollups are maintained)
+and times, per history size:
+- raw: load every prediction of the user and aggregate in pandas
+- rollup: read the user's rollup rows
+plus the summary numbers and charts built from each. Also reports the
+cost the rollup upsert adds to saving a batch of predictions.
+Run from the project root: python benchmarks/bench_rollups.py [sizes...]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+TMP = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TMP, 'bench.db')}"
+os.environ['SCHEDULER_ENABLED'] = '0'
+
+from sqlalchemy import insert
+from app import app, db, Prediction, User, ROLLUP_TABLES, _insert_predictions
+from analytics import CHART_SOURCES, READING_CHARTS, USER_CHARTS, chart_series, stats_from_rollup
+import rollups
+
+CROPS = ['Wheat', 'Rice', 'Cotton', 'Sugarcane', 'Maize', 'Soybean']
+NOW = datetime.utcnow()
+
+def make_rows(user_id, n, seed):
+    rng = random.Random(seed)
+    return [{
+        'user_id': user_id, 'crop_type': rng.choice(CROPS), 'crop_days': 30.0,
+        'soil_moisture': rng.uniform(100, 900), 'temperature': 28.0, 'humidity': 60.0,
+        'prediction': rng.randint(0, 1), 'confidence': rng.uniform(0.5, 1.0),
+        'created_at': NOW - timedelta(seconds=rng.randrange(365 * 86400))
+    } for _ in range(n)]
+
+def raw_rollup(user_id):
+    return rollups.from_predictions(Prediction.query.filter_by(user_id=user_id).all())
+
+def stored_rollup(user_id):
+    return rollups.read(db.session, ROLLUP_TABLES, user_id=user_id)
+
+def rollup_charts(rollup):
+    """Series of the charts drawn from the rollup alone"""
+    return {chart: chart_series(chart, getattr(rollup, CHART_SOURCES[chart]))
+            for chart in USER_CHARTS if chart not in READING_CHARTS}
+
+def timed(function, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with app.app_context():
+            result = function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, result
+
+def write_cost(user_id, n_batches=200, batch_size=20):
+    """ms per batch with and without the rollup upsert"""
+    def plain(rows):
+        with app.app_context():
+            db.session.execute(insert(Prediction), rows)
+            db.session.commit()
+    results = {}
+    for label, write in (('insert only', plain), ('insert + rollup', _insert_predictions)):
+        batches = [make_rows(user_id, batch_size, seed) for seed in range(n_batches)]
+        start = time.perf_counter()
+        for rows in batches:
+            write(rows)
+        results[label] = (time.perf_counter() - start) / n_batches * 1000
+    return results
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [10_000, 100_000]
+    with app.app_context():
+        user = User(username='benchuser', email='bench@test.com', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    print(f"{'predictions':>12}  {'rollup rows':>11}{'raw ms':>10}{'rollup ms':>11}{'charts raw ms':>15}{'charts rollup ms':>18}")
+    seeded = 0
+    for size in sizes:
+        for start in range(seeded, size, 5000):
+            _insert_predictions(make_rows(user_id, min(5000, size - start), start))
+        seeded = size
+        raw_ms, raw = timed(lambda: raw_rollup(user_id))
+        rollup_ms, rollup = timed(lambda: stored_rollup(user_id))
+        assert stats_from_rollup(raw) == stats_from_rollup(rollup)
+        charts_raw_ms, _ = timed(lambda: rollup_charts(raw_rollup(user_id)))
+        charts_rollup_ms, _ = timed(lambda: rollup_charts(stored_rollup(user_id)))
+        print(f"{size:>12}  {len(rollup.daily) + len(rollup.moisture):>11}{raw_ms:>10.1f}{rollup_ms:>11.1f}{charts_raw_ms:>15.1f}{charts_rollup_ms:>18.1f}")
+
+    for label, ms in write_cost(user_id).items():
+        print(f"{label:<16}{ms:>8.3f} ms per 20-row batch")
+
+if __name__ == '__main__':
+    main()
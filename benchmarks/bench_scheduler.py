@@ -0,0 +1,92 @@
+"""
+Scheduler benchmark - per-schedule vs bulk processing of due schedules
+Seeds a throwaway SQLite database with due schedules (users spread over a
+few locations, predictions with random soil moisture) and times
+check_pending_schedules in both modes, counting SQL statements and commits.
+Run from the project root: python benchmarks/bench_scheduler.py [n_schedules]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Executed in a fresh interpreter per mode, with DATABASE_URL pointing at a
+# temporary database; prints one JSON line
+PROBE = '''
+import contextlib, io, json, random, sys, time
+sys.path.insert(0, {root!r})
+from datetime import datetime, timedelta
+from sqlalchemy import event, insert
+from app import app, db, User, Prediction, IrrigationSchedule
+import scheduler
+
+n_schedules, n_users = {n_schedules}, 200
+locations = [f'Town {{i}}' for i in range(20)]
+rng = random.Random(0)
+with app.app_context():
+    db.session.execute(insert(User), [
+        {{'username': f'bench{{i}}', 'email': f'bench{{i}}@test.com', 'password_hash': 'x',
+          'location': locations[i % len(locations)]}} for i in range(n_users)
+    ])
+    user_ids = db.session.scalars(db.select(User.id).where(User.username.like('bench%'))).all()
+    prediction_ids = db.session.scalars(
+        insert(Prediction).returning(Prediction.id, sort_by_parameter_order=True),
+        [{{'user_id': user_ids[i % n_users], 'crop_type': rng.choice(['Wheat', 'Maize', 'Sugarcane']),
+           'crop_days': 30, 'soil_moisture': rng.uniform(100, 900), 'temperature': 28,
+           'humidity': 60, 'prediction': 1, 'confidence': 0.9}} for i in range(n_schedules)]
+    ).all()
+    due_time = datetime.utcnow() - timedelta(minutes=5)
+    db.session.execute(insert(IrrigationSchedule), [
+        {{'user_id': user_ids[i % n_users], 'prediction_id': prediction_ids[i], 'scheduled_time': due_time,
+          'status': 'pending', 'water_amount': 20.0, 'duration': 30}} for i in range(n_schedules)
+    ])
+    db.session.commit()
+    engine = db.engine
+
+counters = {{'statements': 0, 'commits': 0}}
+event.listen(engine, 'before_cursor_execute', lambda *args: counters.__setitem__('statements', counters['statements'] + 1))
+event.listen(engine, 'commit', lambda *args: counters.__setitem__('commits', counters['commits'] + 1))
+
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    scheduler.check_pending_schedules(bulk={bulk})
+elapsed = time.perf_counter() - start
+
+with app.app_context():
+    statuses = dict(db.session.execute(
+        db.select(IrrigationSchedule.status, db.func.count()).group_by(IrrigationSchedule.status)
+    ).all())
+print(json.dumps(dict(counters, seconds=elapsed, statuses=statuses)))
+'''
+
+def run_mode(n_schedules, bulk):
+    """Seed a fresh database and process its due schedules in one mode"""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        probe = PROBE.format(root=ROOT, n_schedules=n_schedules, bulk=bulk)
+        output = subprocess.run(
+            [sys.executable, '-c', probe], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def run_benchmark(n_schedules=10000):
+    print("=" * 70)
+    print(f"SCHEDULER ({n_schedules} due schedules)")
+    print("=" * 70)
+    print(f"{'mode':<20}{'seconds':>12}{'statements':>14}{'commits':>12}{'per schedule':>15}")
+    results = {}
+    for label, bulk in [('per schedule', False), ('bulk', True)]:
+        result = run_mode(n_schedules, bulk)
+        results[label] = result
+        print(f"{label:<20}{result['seconds']:>12.2f}{result['statements']:>14}{result['commits']:>12}"
+              f"{result['seconds'] / n_schedules * 1e6:>12.0f} us")
+    print(f"{'outcomes':<20}{json.dumps(results['bulk']['statuses'])}")
+    if results['bulk']['statuses'] != results['per schedule']['statuses']:
+        print("WARNING: the two modes reached different outcomes")
+    print("=" * 70)
+    return results
+
+if __name__ == '__main__':
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,67 @@
+"""
+Startup benchmark - cold-start import time and first-request latency
+Every measurement runs in a fresh interpreter, like a new gunicorn worker.
+Run from the project root: python benchmarks/bench_startup.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HEAVY_MODULES = ['pandas', 'matplotlib', 'seaborn', 'sklearn', 'plotly']
+
+# Executed in the child process; prints one JSON line of timings
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+loaded_after_import = sorted(m for m in {heavy!r} if m in sys.modules)
+
+client = app.app.test_client()
+client.post('/login', json={{'username': 'farmer', 'password': 'farmer123'}})
+reading = {{'crop_type': 'Wheat', 'crop_days': 30, 'soil_moisture': 350, 'temperature': 28, 'humidity': 65}}
+
+t0 = time.perf_counter()
+first = client.post('/api/predict', json=reading)
+t1 = time.perf_counter()
+client.post('/api/predict', json=reading)
+t2 = time.perf_counter()
+
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'first_request_ms': (t1 - t0) * 1000,
+    'second_request_ms': (t2 - t1) * 1000,
+    'first_status': first.status_code,
+    'heavy_after_import': loaded_after_import,
+}}))
+'''.format(heavy=HEAVY_MODULES)
+
+def run_probe():
+    """Run the probe in a fresh interpreter and return its timings"""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def run_benchmark(runs=5):
+    """Median cold-start timings over several fresh processes"""
+    results = [run_probe() for _ in range(runs)]
+
+    print("=" * 70)
+    print(f"COLD START ({runs} fresh processes, median)")
+    print("=" * 70)
+    for key, label in [('import_ms', 'import app'),
+                       ('first_request_ms', 'first /api/predict (loads model)'),
+                       ('second_request_ms', 'second /api/predict')]:
+        print(f"{label:<45}{statistics.median(r[key] for r in results):>12.1f} ms")
+    print(f"{'status of first request':<45}{results[0]['first_status']:>12}")
+    heavy = ', '.join(results[0]['heavy_after_import']) or 'none'
+    print(f"{'heavy modules loaded by import app':<45}{heavy:>12}")
+    print("=" * 70)
+    return results
+
+if __name__ == '__main__':
+    run_benchmark()
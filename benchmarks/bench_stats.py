@@ -0,0 +1,90 @@
+"""
+Stats benchmark - admin dashboard numbers from ORM queries vs grouped SQL
+Seeds a throwaway SQLite database with 100k predictions, then grows it to
+1M, and at each size times the admin dashboard numbers: five COUNT
+queries plus User.query.all() vs stats_service.admin_stats() plus
+user_rows().
+Run from the project root: python benchmarks/bench_stats.py [sizes...]
+"""
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+TMP = tempfile.mkdtemp()
+DB_PATH = os.path.join(TMP, 'bench.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+os.environ['SCHEDULER_ENABLED'] = '0'
+
+from app import app, db, User, Prediction
+from stats_service import admin_stats, user_rows
+
+N_USERS = 1000
+CROPS = ['Wheat', 'Rice', 'Cotton', 'Sugarcane', 'Maize', 'Soybean']
+NOW = datetime.utcnow()
+
+def seed(conn, start, stop):
+    rng = random.Random(start)
+    def predictions():
+        for i in range(start, stop):
+            created = NOW - timedelta(seconds=rng.randrange(365 * 86400))
+            yield (rng.randint(1, N_USERS), rng.choice(CROPS), 30.0, rng.uniform(100, 900), 28.0, 60.0,
+                   rng.randint(0, 1), rng.uniform(0.5, 1.0), created.isoformat(' '))
+    conn.executemany(
+        "INSERT INTO prediction (user_id, crop_type, crop_days, soil_moisture, temperature, humidity,"
+        " prediction, confidence, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", predictions()
+    )
+    conn.commit()
+
+def python_admin():
+    users = User.query.all()
+    stats = {
+        'total_users': User.query.count(),
+        'total_predictions': Prediction.query.count(),
+        'predictions_today': Prediction.query.filter(Prediction.created_at >= datetime.utcnow().date()).count(),
+        'irrigation_needed': Prediction.query.filter_by(prediction=1).count(),
+        'no_irrigation': Prediction.query.filter_by(prediction=0).count()
+    }
+    return users, stats
+
+def sql_admin():
+    return user_rows(), admin_stats()
+
+def timed(function, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with app.app_context():
+            result = function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, result
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [100_000, 1_000_000]
+    conn = sqlite3.connect(DB_PATH)
+    conn.executemany(
+        "INSERT INTO user (username, email, password_hash, location) VALUES (?, ?, 'x', 'Town')",
+        [(f'bench{i}', f'bench{i}@test.com') for i in range(N_USERS)]
+    )
+    conn.commit()
+
+    print(f"{'rows':>10}  {'workload':<16}{'python ms':>12}{'sql ms':>10}{'speedup':>9}")
+    seeded = 0
+    for size in sizes:
+        seed(conn, seeded, size)
+        seeded = size
+        conn.execute("ANALYZE")
+        python_ms, python_result = timed(python_admin, 5)
+        sql_ms, sql_result = timed(sql_admin, 5)
+        assert python_result[1] == sql_result[1]
+        print(f"{size:>10}  {'admin dashboard':<16}{python_ms:>12.1f}{sql_ms:>10.1f}{python_ms / sql_ms:>8.0f}x")
+    conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Water balance benchmark - a season of daily soil water balance for many fields
+Simulates every field one day at a time in plain Python (the per-field
+loop a scheduler would otherwise run) and with water_balance.simulate(),
+which steps all fields at once, then builds the irrigation calendars.
+Run from the project root: python benchmarks/bench_water_balance.py [fields] [days]
+"""
+import os
+import sys
+import time
+from datetime import date
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import water_balance
+from water_requirement import AVAILABLE_WATER, MAD, REFILL_FRACTION
+
+CROPS = np.array(['Wheat', 'Rice', 'Cotton', 'Sugarcane', 'Maize', 'Soybean'], dtype=object)
+
+def python_season(depletion, etc, rain):
+    """Per-field, per-day loop with the same rules as simulate()"""
+    allowed = MAD * AVAILABLE_WATER
+    refill_to = (1 - REFILL_FRACTION) * AVAILABLE_WATER
+    irrigation = []
+    for field in range(len(depletion)):
+        d = depletion[field]
+        days = []
+        for day in range(etc.shape[1]):
+            d = d - water_balance.EFFECTIVE_RAIN_FRACTION * rain[field, day] + etc[field, day]
+            amount = d - refill_to if d > allowed else 0.0
+            d = min(max(d - amount, 0.0), AVAILABLE_WATER)
+            days.append(amount)
+        irrigation.append(days)
+    return irrigation
+
+def main():
+    n_fields = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    n_days = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+    rng = np.random.default_rng(0)
+    crop_types = CROPS[rng.integers(0, len(CROPS), n_fields)]
+    crop_days = rng.uniform(0, 30, n_fields)
+    eto = rng.uniform(3, 7, (n_fields, n_days))
+    rain = rng.gamma(0.3, 10, (n_fields, n_days))
+    soil_moisture = rng.uniform(300, 900, n_fields)
+    depletion = water_balance.initial_depletion(soil_moisture)
+    etc = water_balance.crop_etc(crop_types, crop_days, eto)
+
+    start = time.perf_counter()
+    python_season(depletion.tolist(), etc, rain)
+    python_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    balance = water_balance.plan_fields(crop_types, crop_days, soil_moisture, eto, rain=rain)
+    numpy_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    calendar = water_balance.irrigation_calendar(balance, date.today())
+    calendar_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{n_days}-day season for {n_fields} fields ({sum(map(len, calendar))} irrigations)")
+    for label, ms in (('python loop', python_ms), ('vectorized', numpy_ms), ('calendars', calendar_ms)):
+        print(f"{label:<14}{ms:>10.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Water requirement benchmark - scalar calculation vs the vectorized engine
+Computes the water requirement of a district of random fields with
+calculate_water_requirement() in a loop and with
+water_requirement.water_requirements() on whole arrays, and times both
+(plus converting the array result to API dicts).
+Run from the project root: python benchmarks/bench_water_requirement.py [fields]
+"""
+import os
+import sys
+import time
+import numpy as np
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+os.environ['SCHEDULER_ENABLED'] = '0'
+
+from app import calculate_water_requirement
+import water_requirement
+
+CROPS = np.array(['Wheat', 'Rice', 'Cotton', 'Sugarcane', 'Maize', 'Soybean'], dtype=object)
+
+def timed(fn, repeats=3):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = np.random.default_rng(0)
+    crop_types = CROPS[rng.integers(0, len(CROPS), n)]
+    temperature = rng.uniform(15, 45, n)
+    crop_days = rng.uniform(0, 180, n)
+    soil_moisture = rng.uniform(0, 1000, n)
+
+    scalar_ms = timed(lambda: [
+        calculate_water_requirement(crop, t, days, moisture)
+        for crop, t, days, moisture in zip(crop_types, temperature.tolist(), crop_days.tolist(), soil_moisture.tolist())
+    ], repeats=1)
+    vector_ms = timed(lambda: water_requirement.water_requirements(crop_types, temperature, crop_days, soil_moisture))
+    requirements = water_requirement.water_requirements(crop_types, temperature, crop_days, soil_moisture)
+    dicts_ms = timed(lambda: water_requirement.to_dicts(requirements), repeats=1)
+
+    print(f"Water requirement of {n} fields")
+    for label, ms in (('scalar loop', scalar_ms), ('vectorized', vector_ms), ('as api dicts', dicts_ms)):
+        print(f"{label:<14}{ms:>10.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Weather provider benchmark - many concurrent weather lookups for a few locations
+Runs a local OpenWeatherMap lookalike with a fixed latency and times
+concurrent lookups (the dashboard, plans and the scheduler asking at once)
+three ways: a new connection per call (requests.get), the pooled session
+of OpenWeatherBackend, and WeatherProvider (TTL cache and single flight)
+in front of it.
+Run from the project root: python benchmarks/bench_weather.py [lookups] [locations] [latency_ms]
+"""
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from weather import OpenWeatherBackend, WeatherProvider
+
+LATENCY = 0.02
+CURRENT = {'main': {'temp': 30.0, 'humidity': 50, 'pressure': 1008},
+           'weather': [{'description': 'clear sky', 'icon': '01d'}], 'wind': {'speed': 5}}
+FORECAST = {'city': {'timezone': 0}, 'list': [
+    {'dt': 1728000000 + 3 * 3600 * i, 'main': {'temp_min': 20, 'temp_max': 30, 'humidity': 50},
+     'weather': [{'description': 'clear sky'}], 'pop': 0.1} for i in range(40)
+]}
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    requests = 0
+    connections = set()
+
+    def do_GET(self):
+        type(self).requests += 1
+        type(self).connections.add(self.client_address)
+        time.sleep(LATENCY)
+        payload = json.dumps(CURRENT if self.path.startswith('/weather') else FORECAST).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+class UnpooledBackend(OpenWeatherBackend):
+    """OpenWeatherBackend opening a new connection for every request"""
+
+    def _get(self, endpoint, location):
+        response = requests.get(f'{self.base_url}/{endpoint}', timeout=self.timeout,
+                                params={'q': location, 'appid': self.api_key, 'units': 'metric'})
+        response.raise_for_status()
+        return response.json()
+
+def run(label, lookup, locations, n_lookups, workers=16):
+    Handler.requests = 0
+    Handler.connections = set()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(lookup, (locations[i % len(locations)] for i in range(n_lookups))))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:8.0f} ms  {Handler.requests:5d} requests  "
+          f"{len(Handler.connections):4d} connections")
+
+def main():
+    global LATENCY
+    n_lookups = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    n_locations = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    LATENCY = (float(sys.argv[3]) if len(sys.argv) > 3 else 20) / 1000
+    locations = [f'Town {i}' for i in range(n_locations)]
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+    print(f"{n_lookups} lookups, {n_locations} locations, {LATENCY * 1000:.0f} ms per request, 16 threads")
+    try:
+        run('new connection per call', UnpooledBackend('key', base_url=base_url).fetch, locations, n_lookups)
+        pooled = OpenWeatherBackend('key', base_url=base_url, pool_size=16)
+        run('pooled session', pooled.fetch, locations, n_lookups)
+        run('provider (cache, 1 flight)', WeatherProvider(pooled, ttl=600).get, locations, n_lookups)
+        pooled.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Worker memory benchmark - per-worker RSS/PSS/USS with and without preloading
+Forks several workers the way gunicorn does and reads each worker's memory
+from /proc/self/smaps_rollup after it has served predictions. Compares:
+  - load per worker: every worker loads the model after the fork
+  - preload: the master loads the model, then gc.freeze() and fork
+  - preload + mmap: as above, with the model's arrays memory-mapped
+PSS splits shared pages between the processes using them; USS is what a
+worker alone would free on exit.
+Linux only. Run from the project root: python benchmarks/bench_worker_memory.py
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+WORKERS = 4
+
+# Executed in a fresh interpreter per mode; prints one JSON line per worker
+PROBE = '''
+import gc, json, os, sys
+sys.path.insert(0, {root!r})
+import app
+
+def smaps_kb():
+    fields = {{}}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return fields
+
+def serve():
+    predictor = app.get_predictor()
+    for crop in predictor.label_encoder.classes_:
+        for moisture in range(0, 1000, 37):
+            predictor.predict(crop, 30, moisture, 28.5, 61)
+    predictor.predict_batch(['Wheat'] * 500, [40] * 500, range(500), [30] * 500, [55] * 500)
+
+if {preload}:
+    app.get_predictor()
+    gc.freeze()
+
+pipes = []
+for _ in range({workers}):
+    read_fd, write_fd = os.pipe()
+    if os.fork() == 0:
+        os.close(read_fd)
+        serve()
+        fields = smaps_kb()
+        os.write(write_fd, json.dumps({{
+            'rss': fields['Rss'],
+            'pss': fields['Pss'],
+            'uss': fields['Private_Clean'] + fields['Private_Dirty'],
+        }}).encode())
+        os._exit(0)
+    os.close(write_fd)
+    pipes.append(read_fd)
+
+for read_fd in pipes:
+    with os.fdopen(read_fd) as f:
+        print(f.read())
+    os.wait()
+'''
+
+MODES = [
+    ('load per worker', False, '0'),
+    ('preload', True, '0'),
+    ('preload + mmap', True, '1'),
+]
+
+def prepare_model(workdir):
+    """Copy of the model saved with its flat engine arrays, as the app would serve it"""
+    from model import IrrigationPredictor
+    predictor = IrrigationPredictor(backend='flat')
+    predictor.load_model(os.path.join(ROOT, 'irrigation_model.pkl'))
+    predictor.save_model(os.path.join(workdir, 'irrigation_model.pkl'))
+
+def run_mode(workdir, preload, mmap):
+    """Memory of each forked worker for one mode"""
+    env = dict(os.environ, MODEL_MMAP=mmap, MODEL_BACKEND='flat')
+    probe = PROBE.format(root=ROOT, preload=preload, workers=WORKERS)
+    output = subprocess.run(
+        [sys.executable, '-c', probe], cwd=workdir, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return [json.loads(line) for line in output.splitlines() if line.startswith('{')]
+
+def run_benchmark():
+    sys.path.insert(0, ROOT)
+    workdir = tempfile.mkdtemp()
+    try:
+        prepare_model(workdir)
+        print("=" * 70)
+        print(f"PER-WORKER MEMORY ({WORKERS} forked workers, mean, MB)")
+        print("=" * 70)
+        print(f"{'mode':<25}{'RSS':>15}{'PSS':>15}{'USS':>15}")
+        results = {}
+        for label, preload, mmap in MODES:
+            workers = run_mode(workdir, preload, mmap)
+            results[label] = workers
+            means = [sum(w[key] for w in workers) / len(workers) / 1024 for key in ('rss', 'pss', 'uss')]
+            print(f"{label:<25}{means[0]:>15.1f}{means[1]:>15.1f}{means[2]:>15.1f}")
+        print("=" * 70)
+        return results
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == '__main__':
+    run_benchmark()
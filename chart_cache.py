@@ -0,0 +1,170 @@
+"""
+Chart cache - keeps analytics chart series until their data changes
+Reading a chart's data and building its JSON series is most of the cost
+of an analytics request, and the result only changes when predictions
+are added; the browser draws the charts from the series.
+Entries are keyed by (scope, chart name, fingerprint): scope is a user id
+(or 'system'), and the fingerprint identifies the data the chart was built
+from, so new data misses the cache instead of serving stale charts.
+- Memory is bounded by the total size of the cached values (LRU eviction)
+- Storing an entry with a new fingerprint drops the superseded one
+- With a directory, the latest entry of every (scope, chart) is also
+  written to disk as JSON, so it survives restarts and is shared by every
+  worker process; one file per chart keeps the directory bounded
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+class ChartCache:
+    """
+    Thread-safe LRU cache of JSON-serializable chart values (the series
+    dicts of analytics.chart_series). max_bytes bounds the serialized size kept in memory.
+    Fingerprints must be JSON values too (numbers or strings).
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, directory=None):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.max_bytes = max_bytes
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._entries = OrderedDict()  # (scope, chart, fingerprint) -> (size, value)
+        self._current = {}  # (scope, chart) -> fingerprint of the latest entry
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, scope, chart):
+        digest = hashlib.sha256(repr((scope, chart)).encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _store(self, key, value, size):
+        """Add an entry to memory in place of older ones for the chart; caller holds the lock"""
+        scope, chart, fingerprint = key
+        previous = self._current.get((scope, chart))
+        self._current[(scope, chart)] = fingerprint
+        for stale in {key, (scope, chart, previous)}:
+            if stale in self._entries:
+                self._size -= self._entries.pop(stale)[0]
+        self._entries[key] = (size, value)
+        self._size += size
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            _, (evicted_size, _) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+            self.evictions += 1
+
+    def _read_disk(self, scope, chart, fingerprint):
+        """(value, size) of the chart on disk if it was built for fingerprint"""
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(scope, chart), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('fingerprint') != fingerprint:
+            return None
+        return entry['value'], entry['size']
+
+    def get(self, scope, chart, fingerprint):
+        """Cached value or None, counting a hit or a miss"""
+        key = (scope, chart, fingerprint)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        on_disk = self._read_disk(scope, chart, fingerprint)
+        with self._lock:
+            if on_disk is None:
+                self.misses += 1
+                return None
+            value, size = on_disk
+            self._store(key, value, size)
+            self.disk_hits += 1
+            return value
+
+    def put(self, scope, chart, fingerprint, value):
+        """Store a value, replacing the entry built from older data"""
+        key = (scope, chart, fingerprint)
+        serialized = json.dumps(value)
+        with self._lock:
+            self._store(key, value, len(serialized))
+        if self.directory:
+            path = self._path(scope, chart)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'scope': scope, 'chart': chart, 'fingerprint': fingerprint,
+                               'size': len(serialized), 'value': value}, f)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Error writing chart cache file: {e}")
+
+    def get_or_build(self, scope, names, fingerprint, build):
+        """
+        The values named in names, from the cache if all of them are there;
+        otherwise build() is called and every value it returns is cached.
+        """
+        values = {}
+        for name in names:
+            value = self.get(scope, name, fingerprint)
+            if value is None:
+                break
+            values[name] = value
+        else:
+            return values
+        values = build()
+        for name, value in values.items():
+            if value is not None:
+                self.put(scope, name, fingerprint, value)
+        return values
+
+    def invalidate(self, scope, names):
+        """Drop the named charts of a scope, in memory and on disk"""
+        with self._lock:
+            for name in names:
+                fingerprint = self._current.pop((scope, name), None)
+                entry = self._entries.pop((scope, name, fingerprint), None)
+                if entry is not None:
+                    self._size -= entry[0]
+        if self.directory:
+            for name in names:
+                try:
+                    os.remove(self._path(scope, name))
+                except OSError:
+                    pass
+
+    def clear(self):
+        """Drop every entry held in memory"""
+        with self._lock:
+            self._entries.clear()
+            self._current.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'directory': self.directory,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
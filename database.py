@@ -0,0 +1,68 @@
+"""
+Database engine settings - connection pragmas and pool sizing
+SQLite's defaults (rollback journal, synchronous=FULL, no busy timeout)
+make concurrent gunicorn workers serialize on every write and fail with
+"database is locked". Every new SQLite connection is therefore switched to
+WAL with the pragmas from app.config['SQLITE_PRAGMAS'], and the pool is
+sized from the app config. DATABASE_URL can point at a server database
+instead, in which case only the pool settings apply.
+"""
+from sqlalchemy import event
+
+# Applied in this order on every new connection; busy_timeout goes first so
+# switching the journal mode waits for other connections instead of failing
+PRAGMA_ORDER = ('busy_timeout', 'journal_mode', 'synchronous', 'cache_size', 'mmap_size')
+
+def normalize_database_uri(uri):
+    """Accept the postgres:// scheme that hosting providers hand out"""
+    if uri.startswith('postgres://'):
+        return 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+def is_sqlite_memory(uri):
+    return uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri
+
+def engine_options(uri, pool_size=5, max_overflow=10, pool_timeout=30, pool_recycle=1800):
+    """SQLALCHEMY_ENGINE_OPTIONS for a database URI"""
+    if uri.startswith('sqlite'):
+        if is_sqlite_memory(uri):
+            # In-memory databases use a single shared connection
+            return {}
+        return {'pool_size': pool_size, 'max_overflow': max_overflow, 'pool_timeout': pool_timeout}
+    return {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout,
+        # Server connections can be closed underneath the pool
+        'pool_recycle': pool_recycle,
+        'pool_pre_ping': True,
+    }
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Run the PRAGMAs on every new connection of a SQLite engine"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+    statements = [f"PRAGMA {name} = {pragmas[name]}" for name in PRAGMA_ORDER if pragmas.get(name) is not None]
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+def sqlite_settings(engine):
+    """Current values of the tuned pragmas, for checks and monitoring"""
+    with engine.connect() as conn:
+        return {name: conn.exec_driver_sql(f"PRAGMA {name}").scalar() for name in PRAGMA_ORDER}
+
+def dispose_after_fork(app, db):
+    """
+    Drop pooled connections inherited from a parent process (gunicorn
+    preload) without closing them, so the parent's connections stay valid
+    and this process opens its own.
+    """
+    with app.app_context():
+        db.engine.dispose(close=False)
@@ -0,0 +1,148 @@
+"""
+Evapotranspiration - FAO-56 reference evapotranspiration (ETo)
+The water calculation used a fixed temperature range (10 °C) and
+extraterrestrial radiation (25 MJ/m²/day), so ETo was the same at every
+latitude and in every season. This module follows FAO Irrigation and
+Drainage Paper 56 (Allen et al., 1998):
+- Ra from latitude and day of year (eq. 21), precomputed once for a grid
+  of latitudes and every day of the year (RA_TABLE) so a lookup costs the
+  same however many readings are in the batch
+- Hargreaves (eq. 52) from daily minimum and maximum temperature
+- Penman-Monteith (eq. 6) where humidity and wind speed are known, with
+  solar radiation estimated from the temperature range (eq. 50) when it
+  is not measured
+Every function takes numpy arrays (or scalars, broadcast).
+"""
+from datetime import date, datetime
+import numpy as np
+
+SOLAR_CONSTANT = 0.0820  # MJ/m²/min
+STEFAN_BOLTZMANN = 4.903e-9  # MJ/K⁴/m²/day
+MJ_TO_MM = 0.408  # mm/day of evaporation per MJ/m²/day
+ALBEDO = 0.23  # reference grass
+KRS = 0.16  # Hargreaves radiation adjustment coefficient (interior locations; 0.19 coastal)
+
+# Ra table resolution; linear interpolation between latitudes keeps the
+# error far below the other uncertainties of ETo
+LATITUDE_STEP = 0.25  # degrees
+DAYS_IN_YEAR = 366
+
+def day_of_year(when):
+    """Day of the year (1-366) of a date, datetime or array of datetime64"""
+    if isinstance(when, (date, datetime)):
+        return when.timetuple().tm_yday
+    when = np.asarray(when, dtype='datetime64[D]')
+    return (when - when.astype('datetime64[Y]')).astype(int) + 1
+
+def extraterrestrial_radiation(latitude, day_of_year):
+    """Daily extraterrestrial radiation Ra (MJ/m²/day), FAO-56 eq. 21-25"""
+    phi = np.radians(np.asarray(latitude, dtype=float))
+    angle = 2 * np.pi * np.asarray(day_of_year, dtype=float) / 365
+    inverse_distance = 1 + 0.033 * np.cos(angle)
+    declination = 0.409 * np.sin(angle - 1.39)
+    # Polar day and night: the sunset hour angle is clipped to [0, pi]
+    sunset_angle = np.arccos(np.clip(-np.tan(phi) * np.tan(declination), -1, 1))
+    ra = (24 * 60 / np.pi) * SOLAR_CONSTANT * inverse_distance * (
+        sunset_angle * np.sin(phi) * np.sin(declination)
+        + np.cos(phi) * np.cos(declination) * np.sin(sunset_angle)
+    )
+    return np.maximum(ra, 0.0)
+
+class RaTable:
+    """
+    Ra precomputed for latitudes -90..90 every latitude_step degrees and
+    days 1-366 (float32, about 0.5 MB at the default step). lookup()
+    interpolates linearly between the two nearest latitudes.
+    """
+
+    def __init__(self, latitude_step=LATITUDE_STEP):
+        self.latitude_step = latitude_step
+        self.latitudes = np.linspace(-90, 90, int(round(180 / latitude_step)) + 1)
+        days = np.arange(1, DAYS_IN_YEAR + 1)
+        self.table = extraterrestrial_radiation(self.latitudes[:, None], days[None, :]).astype(np.float32)
+
+    def lookup(self, latitude, day_of_year):
+        """Ra (MJ/m²/day) of every (latitude, day of year) pair"""
+        position = (np.clip(np.asarray(latitude, dtype=float), -90, 90) + 90) / self.latitude_step
+        lower = np.minimum(position.astype(np.intp), len(self.latitudes) - 2)
+        weight = position - lower
+        day = np.clip(np.asarray(day_of_year, dtype=np.intp), 1, DAYS_IN_YEAR) - 1
+        return (1 - weight) * self.table[lower, day] + weight * self.table[lower + 1, day]
+
+# Built once at import
+RA_TABLE = RaTable()
+
+def hargreaves(tmin, tmax, ra, tmean=None):
+    """Reference ETo (mm/day) from daily temperatures and Ra, FAO-56 eq. 52"""
+    tmin = np.asarray(tmin, dtype=float)
+    tmax = np.asarray(tmax, dtype=float)
+    tmean = (tmin + tmax) / 2 if tmean is None else np.asarray(tmean, dtype=float)
+    return np.maximum(0.0023 * (tmean + 17.8) * np.sqrt(np.maximum(tmax - tmin, 0)) * MJ_TO_MM * ra, 0)
+
+def saturation_vapour_pressure(temperature):
+    """e°(T) in kPa, FAO-56 eq. 11"""
+    return 0.6108 * np.exp(17.27 * temperature / (temperature + 237.3))
+
+def wind_speed_2m(wind_speed, height=2.0):
+    """Wind speed at 2 m (m/s) from a measurement at height metres, FAO-56 eq. 47"""
+    wind_speed = np.asarray(wind_speed, dtype=float)
+    if np.all(np.asarray(height) == 2.0):
+        return wind_speed
+    return wind_speed * 4.87 / np.log(67.8 * np.asarray(height, dtype=float) - 5.42)
+
+def penman_monteith(tmin, tmax, ra, humidity, wind_speed, elevation=0.0, solar_radiation=None, tmean=None):
+    """
+    Reference ETo (mm/day), FAO-56 eq. 6 for daily steps (soil heat flux
+    neglected). humidity is the mean relative humidity (%), wind_speed is
+    measured at 2 m (m/s); solar_radiation (MJ/m²/day) is estimated from
+    the temperature range when not given.
+    """
+    tmin = np.asarray(tmin, dtype=float)
+    tmax = np.asarray(tmax, dtype=float)
+    tmean = (tmin + tmax) / 2 if tmean is None else np.asarray(tmean, dtype=float)
+    elevation = np.asarray(elevation, dtype=float)
+    wind_speed = np.asarray(wind_speed, dtype=float)
+
+    # Slope of the vapour pressure curve and psychrometric constant (eq. 13, 7, 8)
+    slope = 4098 * saturation_vapour_pressure(tmean) / (tmean + 237.3) ** 2
+    pressure = 101.3 * ((293 - 0.0065 * elevation) / 293) ** 5.26
+    psychrometric = 0.000665 * pressure
+
+    # Vapour pressure deficit (eq. 12, 19)
+    es = (saturation_vapour_pressure(tmax) + saturation_vapour_pressure(tmin)) / 2
+    ea = np.clip(np.asarray(humidity, dtype=float), 0, 100) / 100 * es
+
+    # Net radiation (eq. 50, 37, 38, 39, 40)
+    if solar_radiation is None:
+        solar_radiation = KRS * np.sqrt(np.maximum(tmax - tmin, 0)) * ra
+    clear_sky = (0.75 + 2e-5 * elevation) * ra
+    relative_shortwave = np.where(clear_sky > 0, solar_radiation / np.where(clear_sky > 0, clear_sky, 1), 1.0)
+    net_shortwave = (1 - ALBEDO) * solar_radiation
+    net_longwave = (STEFAN_BOLTZMANN * ((tmax + 273.16) ** 4 + (tmin + 273.16) ** 4) / 2
+                    * (0.34 - 0.14 * np.sqrt(ea))
+                    * (1.35 * np.minimum(relative_shortwave, 1.0) - 0.35))
+    net_radiation = net_shortwave - net_longwave
+
+    eto = ((MJ_TO_MM * slope * net_radiation
+            + psychrometric * 900 / (tmean + 273) * wind_speed * (es - ea))
+           / (slope + psychrometric * (1 + 0.34 * wind_speed)))
+    return np.maximum(eto, 0)
+
+def reference_et(tmin, tmax, latitude, day_of_year, humidity=None, wind_speed=None, elevation=0.0, tmean=None):
+    """
+    Reference ETo (mm/day) of every reading: Penman-Monteith where humidity
+    and wind speed (at 2 m) are known (not None or NaN), Hargreaves
+    elsewhere. Ra comes from RA_TABLE.
+    """
+    ra = RA_TABLE.lookup(latitude, day_of_year)
+    eto = hargreaves(tmin, tmax, ra, tmean)
+    if humidity is None or wind_speed is None:
+        return eto
+    humidity = np.asarray(humidity, dtype=float)
+    wind_speed = np.asarray(wind_speed, dtype=float)
+    known = np.isfinite(humidity) & np.isfinite(wind_speed)
+    if not np.any(known):
+        return eto
+    combination = penman_monteith(tmin, tmax, ra, np.where(known, humidity, 0), np.where(known, wind_speed, 0),
+                                  elevation=elevation, tmean=tmean)
+    return np.where(known, combination, eto)
@@ -0,0 +1,140 @@
+"""
+Event scheduler - wakes up exactly when the next irrigation schedule is due
+Upcoming schedule times are kept in an in-memory min-heap. A single thread
+sleeps until the earliest one (or until an earlier schedule is added) and
+then fires the due batch, so nothing polls the database while idle.
+The heap is only an index: the database stays the source of truth, it is
+rebuilt from pending schedules at boot and whatever fires re-checks each
+schedule's status, so nothing is lost if the process dies.
+"""
+import heapq
+import threading
+from datetime import datetime, timedelta
+
+# Delay before schedules are retried after the fire callback failed
+RETRY_DELAY = timedelta(seconds=30)
+
+class ScheduleQueue:
+    """
+    Min-heap of (scheduled_time, schedule_id) with a wake-up thread.
+    fire(now) is called from the thread whenever schedules are due;
+    load_pending() returns (schedule_id, scheduled_time) pairs at start().
+    Times are naive UTC datetimes, like the database columns.
+    """
+
+    def __init__(self, fire, load_pending=None, clock=datetime.utcnow):
+        self.fire = fire
+        self.load_pending = load_pending
+        self._clock = clock
+        self._heap = []
+        self._entries = {}  # schedule_id -> scheduled_time; heap items not matching are stale
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self.fired_batches = 0
+        self.fired_schedules = 0
+        self.last_fire_lag = None  # seconds between the earliest due time and firing
+
+    def add(self, schedule_id, scheduled_time):
+        """Track a schedule, or move it to a new time"""
+        with self._condition:
+            self._entries[schedule_id] = scheduled_time
+            heapq.heappush(self._heap, (scheduled_time, schedule_id))
+            # Wake the thread only if this became the earliest entry
+            if self._heap[0] == (scheduled_time, schedule_id):
+                self._condition.notify()
+
+    def remove(self, schedule_id):
+        """Stop tracking a schedule; its heap item is dropped lazily"""
+        with self._condition:
+            self._entries.pop(schedule_id, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, schedule_id):
+        return schedule_id in self._entries
+
+    def next_due(self):
+        """Earliest tracked schedule time, or None"""
+        with self._condition:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_stale(self):
+        while self._heap and self._entries.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now):
+        """Remove and return the entries due at now"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            scheduled_time, schedule_id = heapq.heappop(self._heap)
+            if self._entries.get(schedule_id) == scheduled_time:
+                del self._entries[schedule_id]
+                due.append((scheduled_time, schedule_id))
+            self._drop_stale()
+        return due
+
+    def start(self):
+        """Load pending schedules and start the wake-up thread (once)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if self.load_pending is not None:
+            for schedule_id, scheduled_time in self.load_pending():
+                self.add(schedule_id, scheduled_time)
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='schedule-queue', daemon=True)
+        self._thread.start()
+        print(f"Schedule queue started with {len(self)} pending schedules")
+
+    def stop(self, timeout=None):
+        """Stop the thread after the batch in progress"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopping:
+                        return
+                    self._drop_stale()
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    delay = (self._heap[0][0] - self._clock()).total_seconds()
+                    if delay > 0:
+                        self._condition.wait(delay)
+                        continue
+                    now = self._clock()
+                    due = self._pop_due(now)
+                    break
+
+            if due:
+                self.last_fire_lag = (now - due[0][0]).total_seconds()
+            try:
+                self.fire(now)
+                self.fired_batches += 1
+                self.fired_schedules += len(due)
+            except Exception as e:
+                print(f"Error firing {len(due)} due schedules, retrying in {RETRY_DELAY}: {e}")
+                retry_at = self._clock() + RETRY_DELAY
+                for _, schedule_id in due:
+                    if schedule_id not in self:
+                        self.add(schedule_id, retry_at)
+
+    def stats(self):
+        """Counters for monitoring"""
+        next_due = self.next_due()
+        return {
+            'pending': len(self),
+            'next_due': next_due.isoformat() if next_due else None,
+            'running': self._thread is not None and self._thread.is_alive(),
+            'fired_batches': self.fired_batches,
+            'fired_schedules': self.fired_schedules,
+            'last_fire_lag_s': self.last_fire_lag,
+        }
@@ -0,0 +1,53 @@
+"""
+Gunicorn settings - load the model once and share it between workers
+With preload_app the master imports the app and loads the model before
+forking, so every worker starts with the model already in memory and the
+pages stay shared (copy-on-write) until a worker writes to them.
+gc.freeze() moves the preloaded objects out of the garbage collector's
+generations so collections in the workers don't touch, and copy, them.
+
+Usage: gunicorn -c gunicorn.conf.py app:app
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+def when_ready(server):
+    """Runs in the master before the first fork"""
+    if not preload_app:
+        return
+    import app
+    # No watcher thread in the master: its reloads would never reach the
+    # workers, and a fork while it holds a lock leaves that lock held forever
+    if app.get_predictor(watch=False) is None:
+        server.log.warning("Model could not be preloaded; workers will load it on first use")
+    gc.freeze()
+    server.log.info("Model preloaded in the master, shared with workers")
+
+def post_fork(server, worker):
+    """Runs in each worker right after the fork"""
+    import sys
+    if 'app' in sys.modules:
+        # Preloaded: don't share the master's pooled database connections
+        from app import app, db
+        from database import dispose_after_fork
+        dispose_after_fork(app, db)
+
+def post_worker_init(worker):
+    """Runs in each worker once the app is loaded"""
+    import app
+    # Every worker fires due schedules; each one is claimed by a single worker
+    app.start_schedule_queue()
+    # Each worker watches the model file and reloads its own copy
+    app.start_model_watcher()
+
+def worker_exit(server, worker):
+    """Runs in each worker as it exits"""
+    import app
+    # Write predictions still waiting in the write-behind queue
+    app.prediction_writer.drain()
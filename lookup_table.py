@@ -0,0 +1,193 @@
+"""
+Decision lookup table - model output precomputed over a discrete input grid
+The inputs are small and discrete (crop type, crop days, moisture units,
+whole degrees and percent), so the forest can be evaluated once for every
+point of a quantized grid. The result is stored next to the model file as
+a memory-mapped numpy array and answers on-grid readings in O(1).
+
+Usage: python lookup_table.py [model.pkl]
+"""
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+
+# (start, stop, step) per numeric input, stop inclusive. Readings that fall
+# exactly on the grid are answered from the table; the rest go to the forest.
+DEFAULT_GRID = {
+    'crop_days': (0, 200, 10),
+    'soil_moisture': (0, 1000, 10),
+    'temperature': (10, 45, 1),
+    'humidity': (10, 90, 5),
+}
+
+AXES = ('crop_days', 'soil_moisture', 'temperature', 'humidity')
+
+def table_paths(model_path):
+    """Paths of the table array and its metadata for a model file"""
+    base, _ = os.path.splitext(model_path)
+    return base + '.lut.npy', base + '.lut.json'
+
+def file_sha256(path):
+    """Fingerprint of the model file the table was built from"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class DecisionTable:
+    """
+    Probability of the positive class for every (crop, grid point).
+    When every leaf of the forest is pure, the table stores the number of
+    trees voting for irrigation (uint8/uint16), which reproduces the forest's
+    probabilities exactly; otherwise it stores float32 probabilities.
+    """
+
+    def __init__(self, table, grid, crop_types, n_trees, kind):
+        self.table = table
+        self.grid = {axis: tuple(grid[axis]) for axis in AXES}
+        self.crop_types = list(crop_types)
+        self.n_trees = int(n_trees)
+        self.kind = kind  # 'votes' or 'proba'
+        self._starts = np.array([self.grid[axis][0] for axis in AXES], dtype=np.float64)
+        self._steps = np.array([self.grid[axis][2] for axis in AXES], dtype=np.float64)
+        self._sizes = np.array(table.shape[1:], dtype=np.int64)
+
+    @staticmethod
+    def axis_values(start, stop, step):
+        return np.arange(int(round((stop - start) / step)) + 1) * step + start
+
+    @classmethod
+    def build(cls, predictor, grid=None, chunk_size=200000):
+        """Evaluate the predictor's model on every grid point"""
+        grid = dict(DEFAULT_GRID, **(grid or {}))
+        if len(predictor.model.classes_) != 2:
+            raise ValueError("Lookup tables support binary classifiers only")
+
+        axes = [cls.axis_values(*grid[axis]) for axis in AXES]
+        shape = tuple(len(values) for values in axes)
+        crop_types = predictor.label_encoder.classes_
+        n_trees = len(predictor.model.estimators_)
+
+        leaf_values = np.concatenate([
+            e.tree_.value[e.tree_.children_left == -1, 0, :].ravel() for e in predictor.model.estimators_
+        ])
+        pure = np.all((leaf_values == 0) | (leaf_values == 1))
+        if pure:
+            kind = 'votes'
+            dtype = np.uint8 if n_trees <= np.iinfo(np.uint8).max else np.uint16
+        else:
+            kind = 'proba'
+            dtype = np.float32
+
+        table = np.empty((len(crop_types),) + shape, dtype=dtype)
+        mesh = [values.ravel() for values in np.meshgrid(*axes, indexing='ij')]
+        n_points = len(mesh[0])
+
+        for crop_index, crop_type in enumerate(crop_types):
+            out = table[crop_index].reshape(-1)
+            for start in range(0, n_points, chunk_size):
+                stop = min(start + chunk_size, n_points)
+                features = predictor._build_features(
+                    np.full(stop - start, crop_type),
+                    *(values[start:stop] for values in mesh)
+                )
+                positive = predictor._predict_proba(features)[:, 1]
+                if kind == 'votes':
+                    out[start:stop] = np.rint(positive * n_trees)
+                else:
+                    out[start:stop] = positive
+            print(f"  {crop_type}: {n_points} grid points")
+
+        return cls(table, grid, crop_types, n_trees, kind)
+
+    def save(self, model_path):
+        """Write the table next to the model file, fingerprinted against it"""
+        table_path, meta_path = table_paths(model_path)
+        np.save(table_path, np.ascontiguousarray(self.table))
+        meta = {
+            'model_sha256': file_sha256(model_path),
+            'grid': self.grid,
+            'crop_types': self.crop_types,
+            'n_trees': self.n_trees,
+            'kind': self.kind,
+        }
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+        print(f"Lookup table saved to {table_path} ({self.table.nbytes / 1e6:.1f} MB)")
+
+    @classmethod
+    def load(cls, model_path):
+        """Memory-map the table for a model file; None if missing or built for another model"""
+        table_path, meta_path = table_paths(model_path)
+        if not (os.path.exists(table_path) and os.path.exists(meta_path)):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('model_sha256') != file_sha256(model_path):
+            print(f"Lookup table {table_path} is stale, ignoring it")
+            return None
+        table = np.load(table_path, mmap_mode='r')
+        return cls(table, meta['grid'], meta['crop_types'], meta['n_trees'], meta['kind'])
+
+    def _probability(self, value):
+        """Class probabilities [p0, p1] from one stored cell"""
+        if self.kind == 'votes':
+            votes = int(value)
+            return np.array([(self.n_trees - votes) / self.n_trees, votes / self.n_trees])
+        positive = float(value)
+        return np.array([1.0 - positive, positive])
+
+    def lookup(self, crop_code, crop_days, soil_moisture, temperature, humidity):
+        """Probabilities for one reading, or None if it is not on the grid"""
+        index = [crop_code]
+        for position, value in enumerate((crop_days, soil_moisture, temperature, humidity)):
+            offset = (value - self._starts[position]) / self._steps[position]
+            if not 0 <= offset < self._sizes[position]:
+                return None
+            cell = int(offset)
+            if cell != offset:
+                return None
+            index.append(cell)
+        return self._probability(self.table[tuple(index)])
+
+    def lookup_batch(self, features):
+        """
+        Vectorized lookup on a feature matrix from IrrigationPredictor._build_features.
+        Returns (on_grid mask, probabilities for the on-grid rows).
+        """
+        values = features[:, [0, 1, 2, 3]]
+        offsets = (values - self._starts) / self._steps
+        cells = np.floor(offsets)
+        on_grid = np.all((cells == offsets) & (cells >= 0) & (cells < self._sizes), axis=1)
+
+        cells = cells[on_grid].astype(np.int64)
+        crop_codes = features[on_grid, 4].astype(np.int64)
+        stored = self.table[(crop_codes,) + tuple(cells.T)]
+        if self.kind == 'votes':
+            votes = stored.astype(np.float64)
+            probabilities = np.column_stack([(self.n_trees - votes) / self.n_trees, votes / self.n_trees])
+        else:
+            positive = stored.astype(np.float64)
+            probabilities = np.column_stack([1.0 - positive, positive])
+        return on_grid, probabilities
+
+def build_lookup_table(model_path='irrigation_model.pkl', grid=None):
+    """Build and save the lookup table for a model file"""
+    from model import IrrigationPredictor
+
+    predictor = IrrigationPredictor(backend='flat')
+    predictor.load_model(model_path)
+    predictor.lookup_table = None
+    if not predictor.scaler_folded:
+        # Large chunks go to sklearn; let it use every core
+        predictor.model.n_jobs = -1
+    print("Evaluating the model over the input grid...")
+    table = DecisionTable.build(predictor, grid)
+    table.save(model_path)
+    return table
+
+if __name__ == '__main__':
+    build_lookup_table(sys.argv[1] if len(sys.argv) > 1 else 'irrigation_model.pkl')
@@ -1,36 +1,275 @@
 """
-Database migration script to add preferred_language column
+Versioned database migrations
+Each migration has a version number and an upgrade function. Applied
+versions are recorded in the schema_version table, so startup only reads
+one number and a migration never runs twice.
+- New databases are created from the models and stamped with the latest
+  version; migrations only upgrade databases that already hold data.
+- Databases created before versioning are stamped at version 1 (the
+  original create_all schema) and upgraded from there.
+- Transactional migrations run in one transaction together with their
+  version record. Migrations marked transactional=False (online index
+  builds, batched backfills) commit as they go and must be idempotent.
+
+Usage: python migrate_db.py [database path]   (default instance/farmers.db)
 """
-import sqlite3
 import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, inspect, select, text
+
+# Kept out of the models' metadata so db.drop_all()/create_all() never touch it
+schema_metadata = MetaData()
+schema_version = Table(
+    'schema_version', schema_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('description', String(200)),
+    Column('applied_at', DateTime),
+)
+
+class SchemaVersionError(RuntimeError):
+    """The database needs migrations that are not allowed to run here"""
+
+class Migration:
+    def __init__(self, version, description, upgrade, transactional=True):
+        self.version = version
+        self.description = description
+        self.upgrade = upgrade
+        self.transactional = transactional
+
+# (name, table, columns); must match __table_args__ of the models in app.py
+INDEXES = [
+    ('ix_prediction_user_id_created_at', 'prediction', ('user_id', 'created_at')),
+    ('ix_prediction_created_at', 'prediction', ('created_at',)),
+    ('ix_irrigation_schedule_status_scheduled_time', 'irrigation_schedule', ('status', 'scheduled_time')),
+    ('ix_irrigation_schedule_user_id_scheduled_time', 'irrigation_schedule', ('user_id', 'scheduled_time')),
+]
+
+# Helpers for migrations
+
+def create_index(engine, name, table, columns):
+    """
+    Build an index without holding up writers longer than needed.
+    PostgreSQL builds it CONCURRENTLY (outside a transaction); SQLite has
+    no online builds, so the index is created in its own short transaction.
+    """
+    column_list = ', '.join(columns)
+    if engine.dialect.name == 'postgresql':
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({column_list})"))
+    else:
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column_list})"))
+
+def backfill(engine, table, assignments, where, batch_size=5000):
+    """
+    UPDATE table SET assignments WHERE where, batch_size rows per
+    transaction, so long backfills don't lock the table. where must stop
+    matching a row once it is updated. Returns the number of rows updated.
+    """
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            updated = conn.execute(text(
+                f"UPDATE {table} SET {assignments} WHERE id IN "
+                f"(SELECT id FROM {table} WHERE {where} LIMIT {int(batch_size)})"
+            )).rowcount
+        total += updated
+        if updated < batch_size:
+            return total
+
+def column_names(conn, table):
+    return {column['name'] for column in inspect(conn).get_columns(table)}
+
+# Migrations, oldest first. Never edit an applied migration; add a new one.
+
+def baseline(conn):
+    """Tables as create_all() made them before migrations were versioned"""
+
+def add_preferred_language(conn):
+    if 'preferred_language' not in column_names(conn, 'user'):
+        conn.execute(text("ALTER TABLE \"user\" ADD COLUMN preferred_language VARCHAR(10) DEFAULT 'en'"))
+
+def backfill_preferred_language(engine):
+    backfill(engine, '"user"', "preferred_language = 'en'", "preferred_language IS NULL")
+
+def add_hot_path_indexes(engine):
+    tables = set(inspect(engine).get_table_names())
+    for name, table, columns in INDEXES:
+        if table in tables:
+            create_index(engine, name, table, columns)
+    with engine.begin() as conn:
+        if engine.dialect.name == 'sqlite':
+            # Refresh the planner's statistics for the new indexes
+            conn.execute(text("ANALYZE"))
+
+def add_prediction_rollups(conn):
+    """Rollup tables for analytics, filled from the existing predictions"""
+    import rollups
+    # Must match the PredictionRollup and MoistureRollup models in app.py
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS prediction_rollup ("
+        "user_id INTEGER NOT NULL, "
+        "day DATE NOT NULL, "
+        "crop_type VARCHAR(50) NOT NULL, "
+        "prediction INTEGER NOT NULL, "
+        "count INTEGER NOT NULL, "
+        "confidence_sum FLOAT NOT NULL, "
+        "PRIMARY KEY (user_id, day, crop_type, prediction), "
+        "FOREIGN KEY(user_id) REFERENCES \"user\" (id))"
+    ))
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS moisture_rollup ("
+        "user_id INTEGER NOT NULL, "
+        "prediction INTEGER NOT NULL, "
+        "moisture_bucket INTEGER NOT NULL, "
+        "count INTEGER NOT NULL, "
+        "PRIMARY KEY (user_id, prediction, moisture_bucket), "
+        "FOREIGN KEY(user_id) REFERENCES \"user\" (id))"
+    ))
+    # In the same transaction as the tables, so no prediction is counted twice or missed
+    if inspect(conn).has_table('prediction'):
+        rollups.rebuild(conn, conn.dialect.name)
 
-def migrate_database():
-    db_path = 'instance/farmers.db'
-    
+MIGRATIONS = [
+    Migration(1, 'Baseline schema', baseline),
+    Migration(2, 'Add user.preferred_language', add_preferred_language),
+    Migration(3, 'Backfill user.preferred_language', backfill_preferred_language, transactional=False),
+    Migration(4, 'Indexes on prediction and schedule hot paths', add_hot_path_indexes, transactional=False),
+    Migration(5, 'Add prediction_rollup and moisture_rollup', add_prediction_rollups),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+# Runner
+
+@contextmanager
+def migration_transaction(engine):
+    """
+    One transaction for a migration and its version record.
+    The sqlite3 driver doesn't open a transaction before DDL on its own, so
+    it is opened explicitly; IMMEDIATE also takes the write lock up front,
+    so processes migrating at the same time run one after the other.
+    """
+    with engine.begin() as conn:
+        if engine.dialect.name == 'sqlite':
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+        yield conn
+
+def current_version(engine):
+    """Applied schema version; 0 for a database without a version table"""
+    if not inspect(engine).has_table('schema_version'):
+        return 0
+    with engine.connect() as conn:
+        return conn.execute(select(schema_version.c.version).order_by(schema_version.c.version.desc())).scalar() or 0
+
+def _record(conn, migration):
+    conn.execute(schema_version.insert().values(
+        version=migration.version, description=migration.description, applied_at=datetime.utcnow()
+    ))
+
+def _stamp(conn, version):
+    schema_metadata.create_all(conn)
+    applied = set(conn.execute(select(schema_version.c.version)).scalars())
+    for migration in MIGRATIONS:
+        if migration.version <= version and migration.version not in applied:
+            _record(conn, migration)
+
+def stamp(engine, version=LATEST_VERSION):
+    """Mark migrations up to version as applied without running them"""
+    # Under the write lock, so processes stamping at once don't record a version twice
+    with migration_transaction(engine) as conn:
+        _stamp(conn, version)
+
+def create_schema(db):
+    """
+    Create a new database from the models and stamp it, in one transaction
+    under the write lock. Returns False if the database wasn't empty once
+    the lock was held (another process created it first).
+    """
+    with migration_transaction(db.engine) as conn:
+        if inspect(conn).get_table_names():
+            return False
+        db.metadata.create_all(conn)
+        _stamp(conn, LATEST_VERSION)
+    return True
+
+def upgrade(engine, target=LATEST_VERSION):
+    """Apply every migration above the current version; returns the versions applied"""
+    version = current_version(engine)
+    if version == 0:
+        if not inspect(engine).get_table_names():
+            raise SchemaVersionError("Database is empty; create it from the models and stamp it")
+        # Created by create_all() before versioning
+        stamp(engine, 1)
+        version = 1
+
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version <= version or migration.version > target:
+            continue
+        print(f"Applying migration {migration.version}: {migration.description}...")
+        if migration.transactional:
+            with migration_transaction(engine) as conn:
+                # Another process may have applied it meanwhile
+                if conn.execute(select(schema_version.c.version)
+                                .where(schema_version.c.version == migration.version)).first():
+                    continue
+                migration.upgrade(conn)
+                _record(conn, migration)
+        else:
+            migration.upgrade(engine)
+            stamp(engine, migration.version)
+        applied.append(migration.version)
+    return applied
+
+def ensure_schema(db, auto_migrate=True):
+    """
+    Startup check: one version read when the schema is current.
+    A new database is created from the models and stamped; an older one
+    is upgraded, or SchemaVersionError is raised if auto_migrate is off.
+    """
+    engine = db.engine
+    version = current_version(engine)
+    if version == LATEST_VERSION:
+        return version
+    if version == 0 and not inspect(engine).get_table_names():
+        # Workers starting on a new database all get here; one creates it
+        if create_schema(db):
+            print(f"Database created at schema version {LATEST_VERSION}")
+            return LATEST_VERSION
+        version = current_version(engine)
+        if version == LATEST_VERSION:
+            return version
+    if version > LATEST_VERSION:
+        raise SchemaVersionError(f"Database schema version {version} is newer than this code ({LATEST_VERSION})")
+    if not auto_migrate:
+        raise SchemaVersionError(
+            f"Database schema version {version} is behind {LATEST_VERSION}; run python migrate_db.py"
+        )
+    upgrade(engine)
+    print(f"Database migrated from schema version {version} to {LATEST_VERSION}")
+    return LATEST_VERSION
+
+def migrate_database(db_path='instance/farmers.db'):
     if not os.path.exists(db_path):
         print("Database doesn't exist yet. Will be created on first run.")
         return
-    
+
+    engine = create_engine(f'sqlite:///{db_path}')
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Check if column exists
-        cursor.execute("PRAGMA table_info(user)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        if 'preferred_language' not in columns:
-            print("Adding preferred_language column...")
-            cursor.execute("ALTER TABLE user ADD COLUMN preferred_language VARCHAR(10) DEFAULT 'en'")
-            conn.commit()
-            print("✓ Migration successful!")
+        version = current_version(engine)
+        applied = upgrade(engine)
+        if applied:
+            print(f"✓ Migration successful! Schema version {version} -> {LATEST_VERSION}")
         else:
-            print("Column already exists. No migration needed.")
-        
-        conn.close()
+            print(f"Schema is at version {LATEST_VERSION}. No migration needed.")
     except Exception as e:
         print(f"Migration error: {e}")
-        print("Recommendation: Delete instance/farmers.db and restart the app")
+        print("Applied migrations are recorded one by one; fix the cause and run this script again")
+    finally:
+        engine.dispose()
 
 if __name__ == '__main__':
-    migrate_database()
+    migrate_database(sys.argv[1] if len(sys.argv) > 1 else 'instance/farmers.db')
@@ -1,23 +1,39 @@
-import pandas as pd
+import os
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import joblib
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.preprocessing import StandardScaler
+from tree_engine import FlatForest, scaler_affine, raw_thresholds
+from lookup_table import DecisionTable, file_sha256
+
+# Inference backends: 'sklearn' calls RandomForestClassifier.predict_proba,
+# 'flat' evaluates the same trees with tree_engine.FlatForest
+BACKENDS = ('sklearn', 'flat')
+
+# The flat engine wins for small batches; beyond this many rows sklearn's
+# compiled tree traversal is faster, so larger batches are routed there
+FLAT_ENGINE_MAX_ROWS = 1000
 
 class IrrigationPredictor:
-    def __init__(self):
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.label_encoder = LabelEncoder()
-        self.scaler = StandardScaler()
+    def __init__(self, backend='sklearn'):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        # The estimators are created by the training methods or restored by
+        # load_model, so serving never imports pandas or sklearn's training code
+        self.model = None
+        self.label_encoder = None
+        self.scaler = None
         self.is_trained = False
+        self.scaler_folded = False
+        self.backend = backend
+        self.engine = None
+        self.crop_codes = {}
+        self.cache = None
+        self.lookup_table = None
+        self.model_version = None
         
     def load_data(self, file_path):
         """Load and preprocess the dataset"""
+        import pandas as pd
+        
         self.data = pd.read_csv(file_path)
         print(f"Dataset loaded: {self.data.shape}")
         print(f"Columns: {self.data.columns.tolist()}")
@@ -26,7 +42,10 @@ class IrrigationPredictor:
     
     def preprocess_data(self):
         """Preprocess the data for training"""
+        from sklearn.preprocessing import LabelEncoder
+        
         # Encode categorical variables
+        self.label_encoder = LabelEncoder()
         self.data['CropType_encoded'] = self.label_encoder.fit_transform(self.data['CropType'])
         
         # Feature engineering
@@ -48,6 +67,15 @@ class IrrigationPredictor:
     
     def train_model(self):
         """Train the irrigation prediction model"""
+        import pandas as pd
+        from sklearn.model_selection import train_test_split
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.metrics import accuracy_score, classification_report
+        
+        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
+        self.scaler = StandardScaler()
+        
         # Split the data
         X_train, X_test, y_train, y_test = train_test_split(
             self.X, self.y, test_size=0.2, random_state=42, stratify=self.y
@@ -80,7 +108,10 @@ class IrrigationPredictor:
         print(importance_df)
         
         self.is_trained = True
+        self.scaler_folded = False
+        self.lookup_table = None
         self.feature_names = feature_names
+        self._prepare_inference()
         
         return accuracy, importance_df
     
@@ -89,8 +120,30 @@ class IrrigationPredictor:
         if not self.is_trained:
             raise ValueError("Model must be trained before making predictions")
         
+        if self.cache is None:
+            return self._predict_one(crop_type, crop_days, soil_moisture, temperature, humidity)
+        
+        # The model always sees the reading itself; the (possibly quantized) key only finds it again
+        key = self.cache.make_key(crop_type, crop_days, soil_moisture, temperature, humidity)
+        cached = self.cache.get(key)
+        if cached is None:
+            cached = self._predict_one(crop_type, crop_days, soil_moisture, temperature, humidity)
+            self.cache.put(key, cached)
+        prediction, probability = cached
+        return prediction, probability.copy()
+    
+    def _predict_one(self, crop_type, crop_days, soil_moisture, temperature, humidity):
+        """Run the model on a single reading"""
         # Encode crop type
-        crop_type_encoded = self.label_encoder.transform([crop_type])[0]
+        crop_type_encoded = self._encode_crop(crop_type)
+        
+        # On-grid readings are answered from the precomputed table
+        if self.lookup_table is not None:
+            probability = self.lookup_table.lookup(
+                crop_type_encoded, crop_days, soil_moisture, temperature, humidity
+            )
+            if probability is not None:
+                return self.model.classes_[np.argmax(probability)], probability
         
         # Calculate derived features
         moisture_temp_ratio = soil_moisture / (temperature + 1)
@@ -103,34 +156,178 @@ class IrrigationPredictor:
             moisture_temp_ratio, humidity_temp_ratio, moisture_deficit
         ]])
         
-        # Scale features
-        features_scaled = self.scaler.transform(features)
-        
-        # Make prediction
-        prediction = self.model.predict(features_scaled)[0]
-        probability = self.model.predict_proba(features_scaled)[0]
+        # Make prediction: one forest pass, label is the argmax of the
+        # probabilities (exactly what RandomForestClassifier.predict does)
+        probability = self._predict_proba(features)[0]
+        prediction = self.model.classes_[np.argmax(probability)]
         
         return prediction, probability
     
+    def _build_features(self, crop_types, crop_days, soil_moisture, temperature, humidity):
+        """Build the feature matrix for N readings given as columnar arrays"""
+        crop_types = np.asarray(crop_types)
+        crop_days = np.asarray(crop_days, dtype=np.float64)
+        soil_moisture = np.asarray(soil_moisture, dtype=np.float64)
+        temperature = np.asarray(temperature, dtype=np.float64)
+        humidity = np.asarray(humidity, dtype=np.float64)
+        
+        n_rows = len(crop_types)
+        if any(len(col) != n_rows for col in (crop_days, soil_moisture, temperature, humidity)):
+            raise ValueError("All input columns must have the same length")
+        
+        # Encode crop types in one call
+        crop_type_encoded = self.label_encoder.transform(crop_types)
+        
+        # Derived features, same formulas as preprocess_data
+        features = np.empty((n_rows, 8), dtype=np.float64)
+        features[:, 0] = crop_days
+        features[:, 1] = soil_moisture
+        features[:, 2] = temperature
+        features[:, 3] = humidity
+        features[:, 4] = crop_type_encoded
+        features[:, 5] = soil_moisture / (temperature + 1)
+        features[:, 6] = humidity / (temperature + 1)
+        features[:, 7] = 1000 - soil_moisture
+        return features
+    
+    def _encode_crop(self, crop_type):
+        """Encode one crop type with a dict lookup instead of label_encoder.transform"""
+        try:
+            return self.crop_codes[crop_type]
+        except KeyError:
+            raise ValueError(f"Unknown crop type: {crop_type}") from None
+    
+    def _predict_proba(self, features):
+        """Class probabilities for an unscaled feature matrix, using the selected backend"""
+        if self.scaler_folded:
+            # Folded thresholds are exact only for float64 comparisons, which
+            # sklearn's float32 trees can't do, so the engine handles every batch
+            return self.engine.predict_proba(features)
+        if self.engine is not None and len(features) <= FLAT_ENGINE_MAX_ROWS:
+            return self.engine.predict_proba(features)
+        return self.model.predict_proba(self.scaler.transform(features))
+    
+    def _prepare_inference(self, saved_engine=None):
+        """
+        Build the lookup structures used at prediction time.
+        saved_engine is the engine state stored in a model file; it is used
+        as-is (memory-mapped arrays included) when it fits the current mode.
+        """
+        # Cached results belong to the previous model
+        if self.cache is not None:
+            self.cache.clear()
+        self.crop_codes = {crop: code for code, crop in enumerate(self.label_encoder.classes_)}
+        if not self.scaler_folded and self.backend != 'flat':
+            self.engine = None
+        elif saved_engine is not None and saved_engine['float32_inputs'] != self.scaler_folded:
+            self.engine = FlatForest.from_dict(saved_engine)
+        elif self.scaler_folded:
+            self.engine = FlatForest.from_sklearn(self.model, float32_inputs=False)
+        else:
+            self.engine = FlatForest.from_sklearn(self.model, self.scaler)
+    
+    def fold_scaler(self):
+        """
+        Rewrite the forest's split thresholds into raw feature space.
+        Trees only compare features against thresholds, so the StandardScaler
+        can be inverted into the thresholds and skipped at prediction time.
+        Predictions stay bit-identical; a folded model is always evaluated by
+        the flat engine because it needs float64 comparisons. The scaler is
+        dropped (saved as None), so code that still scales the inputs before
+        model.predict fails instead of comparing scaled inputs to raw thresholds.
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before it can be optimized")
+        if self.scaler_folded:
+            return
+        
+        offset, scale = scaler_affine(self.scaler)
+        for estimator in self.model.estimators_:
+            tree = estimator.tree_
+            internal = tree.children_left != -1
+            features = tree.feature[internal]
+            tree.threshold[internal] = raw_thresholds(
+                tree.threshold[internal], offset[features], scale[features]
+            )
+        
+        self.scaler = None
+        self.scaler_folded = True
+        self._prepare_inference()
+    
+    def enable_cache(self, cache):
+        """Memoize predict() with a prediction_cache.PredictionCache (None disables)"""
+        self.cache = cache
+    
+    def set_backend(self, backend):
+        """Switch the inference backend ('sklearn' or 'flat')"""
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        self.backend = backend
+        if self.is_trained:
+            self._prepare_inference()
+    
+    def predict_batch(self, crop_types, crop_days, soil_moisture, temperature, humidity):
+        """
+        Make predictions for N readings at once.
+        Takes columnar arrays and returns (predictions, probabilities) with
+        shapes (N,) and (N, n_classes), using a single predict_proba call.
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before making predictions")
+        
+        features = self._build_features(crop_types, crop_days, soil_moisture, temperature, humidity)
+        
+        if self.lookup_table is None:
+            probabilities = self._predict_proba(features)
+        else:
+            on_grid, table_probabilities = self.lookup_table.lookup_batch(features)
+            probabilities = np.empty((len(features), len(self.model.classes_)))
+            probabilities[on_grid] = table_probabilities
+            if not on_grid.all():
+                probabilities[~on_grid] = self._predict_proba(features[~on_grid])
+        predictions = self.model.classes_[np.argmax(probabilities, axis=1)]
+        
+        return predictions, probabilities
+    
     def save_model(self, filepath):
         """Save the trained model"""
         model_data = {
             'model': self.model,
             'label_encoder': self.label_encoder,
             'scaler': self.scaler,
-            'feature_names': self.feature_names
+            'feature_names': list(self.feature_names),
+            'scaler_folded': self.scaler_folded
         }
-        joblib.dump(model_data, filepath)
+        if self.engine is not None:
+            # Flat arrays that workers can memory-map instead of rebuilding
+            model_data['engine'] = self.engine.to_dict()
+        # Write a new file and rename it over the old one, so processes that
+        # have the old file memory-mapped keep reading a consistent copy
+        tmp_path = f"{filepath}.tmp"
+        joblib.dump(model_data, tmp_path)
+        os.replace(tmp_path, filepath)
         print(f"Model saved to {filepath}")
     
-    def load_model(self, filepath):
-        """Load a pre-trained model"""
-        model_data = joblib.load(filepath)
+    def load_model(self, filepath, mmap_mode=None):
+        """
+        Load a pre-trained model.
+        With mmap_mode='r' the numpy arrays in the file (scaler and flat
+        engine) are memory-mapped read-only, so every process serving the
+        same file shares one copy through the page cache.
+        """
+        model_data = joblib.load(filepath, mmap_mode=mmap_mode)
         self.model = model_data['model']
         self.label_encoder = model_data['label_encoder']
         self.scaler = model_data['scaler']
         self.feature_names = model_data['feature_names']
+        # Models saved before the optimize step have no 'scaler_folded' key
+        self.scaler_folded = model_data.get('scaler_folded', False)
         self.is_trained = True
+        # Content hash of the file, reported with predictions
+        self.model_version = file_sha256(filepath)[:12]
+        self._prepare_inference(model_data.get('engine'))
+        # Precomputed lookup table next to the model file, if one matches it
+        self.lookup_table = DecisionTable.load(filepath)
         print(f"Model loaded from {filepath}")
 
 def main():
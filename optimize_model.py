@@ -0,0 +1,67 @@
+"""
+Model optimization script - prepares a trained model for serving
+Folds the StandardScaler into the forest's split thresholds, checks that
+predictions are bit-identical to the original model, then saves it.
+
+Usage: python optimize_model.py [input.pkl] [output.pkl]
+"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+from model import IrrigationPredictor
+
+DEFAULT_MODEL_PATH = 'irrigation_model.pkl'
+DEFAULT_DATASET_PATH = 'datasets - datasets.csv'
+
+def verification_features(predictor, dataset_path=DEFAULT_DATASET_PATH, n_random=50000, seed=42):
+    """Feature matrix of the training rows plus random readings over the sensor ranges"""
+    rng = np.random.default_rng(seed)
+    crop_types = rng.choice(predictor.label_encoder.classes_, n_random)
+    crop_days = rng.integers(0, 220, n_random)
+    soil_moisture = rng.integers(0, 1001, n_random)
+    temperature = rng.integers(0, 50, n_random)
+    humidity = rng.integers(0, 101, n_random)
+
+    if os.path.exists(dataset_path):
+        data = pd.read_csv(dataset_path)
+        crop_types = np.concatenate([data['CropType'], crop_types])
+        crop_days = np.concatenate([data['CropDays'], crop_days])
+        soil_moisture = np.concatenate([data['SoilMoisture'], soil_moisture])
+        temperature = np.concatenate([data['temperature'], temperature])
+        humidity = np.concatenate([data['Humidity'], humidity])
+
+    return predictor._build_features(crop_types, crop_days, soil_moisture, temperature, humidity)
+
+def optimize_model(input_path=DEFAULT_MODEL_PATH, output_path=None):
+    """Fold the scaler into the model at input_path and write the result"""
+    output_path = output_path or input_path
+
+    original = IrrigationPredictor()
+    original.load_model(input_path)
+    if original.scaler_folded:
+        print("Model is already optimized. Nothing to do.")
+        return False
+
+    optimized = IrrigationPredictor()
+    optimized.load_model(input_path)
+    optimized.fold_scaler()
+
+    # Refuse to write a model whose predictions differ in any bit
+    features = verification_features(original)
+    expected = original._predict_proba(features)
+    actual = optimized._predict_proba(features)
+    mismatches = int(np.sum(np.any(expected != actual, axis=1)))
+    if mismatches:
+        print(f"✗ Optimized model disagrees on {mismatches} of {len(features)} readings. Not saved.")
+        return False
+
+    print(f"✓ Predictions identical on {len(features)} readings")
+    optimized.save_model(output_path)
+    return True
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    input_path = args[0] if len(args) > 0 else DEFAULT_MODEL_PATH
+    output_path = args[1] if len(args) > 1 else None
+    sys.exit(0 if optimize_model(input_path, output_path) else 1)
@@ -0,0 +1,110 @@
+"""
+Prediction cache - memoizes model predictions on sensor inputs
+Sensor readings repeat heavily (integer moisture units, whole degrees and
+percent), so an LRU cache with a TTL in front of the forest skips most
+model evaluations. Keys are exact by default, so a cached answer is the
+one the model gives for that reading; quantization steps are opt-in and
+let nearby readings share the answer of the first one seen.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+# Step size per numeric input; readings are rounded to the nearest multiple
+# in the key. None (or 0) keeps the exact value, the default for every input.
+DEFAULT_QUANTIZATION = {
+    'crop_days': None,
+    'soil_moisture': None,
+    'temperature': None,
+    'humidity': None,
+}
+
+def quantize_value(value, step):
+    """Round value to the nearest multiple of step (halves round up)"""
+    if not step:
+        return float(value)
+    return math.floor(value / step + 0.5) * step
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with per-entry expiry.
+    Keys are (crop_type, crop_days, soil_moisture, temperature, humidity)
+    after quantization; values are whatever the predictor stores.
+    """
+
+    FIELDS = ('crop_days', 'soil_moisture', 'temperature', 'humidity')
+
+    def __init__(self, max_size=10000, ttl=3600, quantization=None, clock=time.monotonic):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.quantization = dict(DEFAULT_QUANTIZATION)
+        if quantization:
+            self.quantization.update(quantization)
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def make_key(self, crop_type, crop_days, soil_moisture, temperature, humidity):
+        """Cache key of a reading (quantized where a step is set); the model still sees the reading"""
+        values = (crop_days, soil_moisture, temperature, humidity)
+        return (crop_type,) + tuple(
+            quantize_value(value, self.quantization.get(field))
+            for field, value in zip(self.FIELDS, values)
+        )
+
+    def get(self, key):
+        """Return the cached value or None, counting a hit or a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if self.ttl is not None and self._clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries if full"""
+        expires_at = self._clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry, e.g. when a new model is loaded"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
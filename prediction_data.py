@@ -0,0 +1,51 @@
+"""
+Prediction data access - prediction columns read in one joined query
+Analytics used to load Prediction objects and copy them into DataFrames
+one dict per row, and the system charts read p.user.username, which lazy
+loads one User per prediction (N+1 queries). These functions select only
+the columns a chart or table needs, join the username in the same query
+and build no ORM objects; pandas builds DataFrames from the result
+columns. /api/analytics/<chart> and the admin prediction table read
+through them.
+"""
+from sqlalchemy import func, select
+from app import db, Prediction, User, ROLLUP_TABLES
+
+# Columns of a prediction frame; username comes from the joined user
+PREDICTION_COLUMNS = ('user_id', 'username', 'crop_type', 'crop_days', 'soil_moisture', 'temperature',
+                      'humidity', 'prediction', 'confidence', 'created_at')
+
+def prediction_query(user_id=None, limit=None, columns=PREDICTION_COLUMNS):
+    """SELECT of the given columns of a user's (or everyone's) predictions, optionally only the latest limit"""
+    selected = [User.username if name == 'username' else getattr(Prediction, name) for name in columns]
+    query = select(*selected).select_from(Prediction)
+    if 'username' in columns:
+        query = query.outerjoin(User, User.id == Prediction.user_id)
+    if user_id is not None:
+        query = query.where(Prediction.user_id == user_id)
+    if limit is not None:
+        query = query.order_by(Prediction.created_at.desc()).limit(limit)
+    return query
+
+def prediction_frame(user_id=None, limit=None, columns=PREDICTION_COLUMNS):
+    """Predictions as a DataFrame with one column per field, read with a single query"""
+    import pandas as pd
+    parse_dates = ['created_at'] if 'created_at' in columns else None
+    return pd.read_sql(prediction_query(user_id, limit, columns), db.session.connection(), parse_dates=parse_dates)
+
+def user_totals(limit=10):
+    """
+    The limit users with the most predictions (from the daily rollup), most
+    first, as a DataFrame of user_id, username and count: one grouped query
+    with the username joined.
+    """
+    import pandas as pd
+    daily = ROLLUP_TABLES.daily
+    count = func.sum(daily.c['count']).label('count')
+    query = (select(daily.c.user_id, User.username, count)
+             .select_from(daily)
+             .outerjoin(User, User.id == daily.c.user_id)
+             .group_by(daily.c.user_id, User.username)
+             .order_by(count.desc(), daily.c.user_id)
+             .limit(limit))
+    return pd.DataFrame(db.session.execute(query).all(), columns=['user_id', 'username', 'count'])
@@ -0,0 +1,152 @@
+"""
+Prediction log writer - write-behind buffer for Prediction rows
+Saving a prediction used to cost a commit (and an fsync) inside every
+request. Rows are put on a bounded queue instead and a background thread
+writes them with one multi-row INSERT per batch, every flush_rows rows or
+every flush_interval seconds, whichever comes first.
+- Backpressure: when the queue is full, submit() waits up to put_timeout
+  and then returns False so the caller writes the row itself.
+- drain() stops the thread after writing everything still queued; the
+  app calls it at exit. If the queue stays full it writes the rows itself.
+"""
+import os
+import queue
+import threading
+import time
+
+class PredictionWriter:
+    """
+    Batches rows for insert_rows(rows), which receives a list of dicts and
+    must write them in one statement and commit.
+    """
+
+    def __init__(self, insert_rows, flush_rows=500, flush_interval=0.05, max_queue=10000,
+                 put_timeout=0.1, max_retries=3):
+        self.insert_rows = insert_rows
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+        self._start_lock = threading.Lock()
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.rejected = 0  # queue full, written by the caller instead
+        self.dropped = 0   # batches that kept failing
+
+    def _ensure_thread(self):
+        """Start the flush thread once per process (gunicorn workers fork)"""
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='prediction-writer', daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def submit(self, row):
+        """Queue a row for writing; False if the queue stayed full (write it yourself)"""
+        if self._stopping:
+            return False
+        self._ensure_thread()
+        try:
+            self._queue.put(row, timeout=self.put_timeout)
+        except queue.Full:
+            self.rejected += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                row = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                row = None
+            if row is not None:
+                if row is _STOP:
+                    self._flush(batch)
+                    self._queue.task_done()
+                    return
+                batch.append(row)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            if batch and (len(batch) >= self.flush_rows or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+                deadline = None
+
+    def _flush(self, batch):
+        """Write one batch, retrying with backoff before giving up on it"""
+        if not batch:
+            return
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.insert_rows(batch)
+                self.written += len(batch)
+                self.batches += 1
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.dropped += len(batch)
+                    print(f"Error writing {len(batch)} predictions, dropping them: {e}")
+                else:
+                    time.sleep(0.05 * 2 ** attempt)
+        for _ in batch:
+            self._queue.task_done()
+
+    def flush(self):
+        """Block until every row submitted so far is written"""
+        if self._queue is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def drain(self, timeout=10):
+        """Stop accepting rows, write what is queued and stop the thread"""
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        self._stopping = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            # The thread is stuck (e.g. on a locked database): write the
+            # queued rows from here rather than block the exit forever
+            print(f"Warning: prediction log queue still full after {timeout}s, writing "
+                  f"{self._queue.qsize()} queued predictions directly")
+            rows = []
+            while True:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._flush(rows)
+            try:
+                self._queue.put_nowait(_STOP)
+            except queue.Full:
+                pass
+        self._thread.join(timeout)
+
+    def stats(self):
+        """Counters for monitoring"""
+        return {
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'max_queue': self.max_queue,
+            'submitted': self.submitted,
+            'written': self.written,
+            'batches': self.batches,
+            'rejected': self.rejected,
+            'dropped': self.dropped,
+        }
+
+# Queued after the last row by drain()
+_STOP = object()
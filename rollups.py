@@ -0,0 +1,147 @@
+"""
+Prediction rollups - pre-aggregated prediction counts for analytics
+Analytics used to rebuild every chart from raw prediction rows on each
+page view, so it only ever looked at the latest few hundred. Two rollup
+tables keep the numbers the charts need instead:
+- prediction_rollup: per (user, day, crop, prediction) the number of
+  predictions and the sum of their confidence
+- moisture_rollup: per (user, prediction, soil moisture bucket) the
+  number of predictions, for the moisture histogram
+Every code path that saves predictions adds them here in the same
+transaction, so charts and summary numbers cover the full history and
+their cost grows with days and crops, not with predictions.
+"""
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from sqlalchemy import func, select, text
+
+# Soil moisture histogram bucket width (moisture units 0-1000)
+MOISTURE_BUCKET_WIDTH = 50
+# Stored for predictions without a crop or soil moisture reading
+UNKNOWN_CROP = 'Unknown'
+NO_MOISTURE_BUCKET = -1
+
+DAILY_KEY = ('user_id', 'day', 'crop_type', 'prediction')
+DAILY_COLUMNS = DAILY_KEY + ('count', 'confidence_sum')
+MOISTURE_KEY = ('user_id', 'prediction', 'moisture_bucket')
+MOISTURE_COLUMNS = MOISTURE_KEY + ('count',)
+
+# The two rollup tables (app.py passes its models' tables) and their contents as
+# DataFrames. pandas is imported where rollups are read, not when app.py
+# imports this module, so serving predictions doesn't load it.
+RollupTables = namedtuple('RollupTables', ['daily', 'moisture'])
+Rollup = namedtuple('Rollup', ['daily', 'moisture'])
+
+def moisture_bucket(soil_moisture):
+    """Histogram bucket of a soil moisture reading (truncated like SQL's CAST)"""
+    if soil_moisture is None:
+        return NO_MOISTURE_BUCKET
+    return int(soil_moisture / MOISTURE_BUCKET_WIDTH)
+
+def aggregate(rows):
+    """Rollup rows (dicts of DAILY_COLUMNS and MOISTURE_COLUMNS) for predictions given as dicts or objects"""
+    daily = defaultdict(lambda: [0, 0.0])
+    moisture = defaultdict(int)
+    for row in rows:
+        get = row.get if isinstance(row, dict) else lambda name: getattr(row, name, None)
+        if get('prediction') is None:
+            continue
+        prediction = int(get('prediction'))
+        created_at = get('created_at') or datetime.utcnow()
+        totals = daily[(get('user_id'), created_at.date(), get('crop_type') or UNKNOWN_CROP, prediction)]
+        totals[0] += 1
+        totals[1] += get('confidence') or 0.0
+        moisture[(get('user_id'), prediction, moisture_bucket(get('soil_moisture')))] += 1
+    return (
+        [dict(zip(DAILY_COLUMNS, key + tuple(totals))) for key, totals in daily.items()],
+        [dict(zip(MOISTURE_COLUMNS, key + (count,))) for key, count in moisture.items()],
+    )
+
+def upsert_statement(table, key, dialect_name):
+    """INSERT ... ON CONFLICT that adds to the non-key columns of existing rollup rows"""
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    statement = insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=list(key),
+        set_={column.name: column + statement.excluded[column.name]
+              for column in table.columns if column.name not in key}
+    )
+
+def add_predictions(session, tables, rows):
+    """Add saved predictions to the rollups; runs in the caller's transaction"""
+    daily_rows, moisture_rows = aggregate(rows)
+    dialect_name = session.get_bind().dialect.name
+    if daily_rows:
+        session.execute(upsert_statement(tables.daily, DAILY_KEY, dialect_name), daily_rows)
+    if moisture_rows:
+        session.execute(upsert_statement(tables.moisture, MOISTURE_KEY, dialect_name), moisture_rows)
+
+def backfill_sql(dialect_name):
+    """INSERT ... SELECT statements that build both rollups from existing predictions"""
+    if dialect_name == 'postgresql':
+        day = "CAST(created_at AS DATE)"
+        bucket = f"COALESCE(CAST(FLOOR(soil_moisture / {MOISTURE_BUCKET_WIDTH}) AS INTEGER), {NO_MOISTURE_BUCKET})"
+    else:
+        day = "date(created_at)"
+        bucket = f"COALESCE(CAST(soil_moisture / {MOISTURE_BUCKET_WIDTH} AS INTEGER), {NO_MOISTURE_BUCKET})"
+    crop = f"COALESCE(crop_type, '{UNKNOWN_CROP}')"
+    return [
+        "INSERT INTO prediction_rollup (user_id, day, crop_type, prediction, count, confidence_sum) "
+        f"SELECT user_id, {day}, {crop}, prediction, COUNT(*), SUM(COALESCE(confidence, 0)) FROM prediction "
+        "WHERE prediction IS NOT NULL AND created_at IS NOT NULL "
+        f"GROUP BY user_id, {day}, {crop}, prediction",
+        "INSERT INTO moisture_rollup (user_id, prediction, moisture_bucket, count) "
+        f"SELECT user_id, prediction, {bucket}, COUNT(*) FROM prediction "
+        "WHERE prediction IS NOT NULL AND created_at IS NOT NULL "
+        f"GROUP BY user_id, prediction, {bucket}",
+    ]
+
+def rebuild(connection, dialect_name):
+    """Replace the rollups with totals recomputed from the prediction table"""
+    connection.execute(text("DELETE FROM prediction_rollup"))
+    connection.execute(text("DELETE FROM moisture_rollup"))
+    for statement in backfill_sql(dialect_name):
+        connection.execute(text(statement))
+
+# Columns of each rollup table, by its name in RollupTables
+TABLE_COLUMNS = {'daily': DAILY_COLUMNS, 'moisture': MOISTURE_COLUMNS}
+
+def read_table(session, tables, name, user_id=None):
+    """One rollup table ('daily' or 'moisture') of one user, or of everyone, as a DataFrame"""
+    import pandas as pd
+    table, columns = getattr(tables, name), TABLE_COLUMNS[name]
+    query = select(*(table.c[column] for column in columns))
+    if user_id is not None:
+        query = query.where(table.c.user_id == user_id)
+    return pd.DataFrame(session.execute(query).all(), columns=list(columns))
+
+def read(session, tables, user_id=None):
+    """Rollup of one user, or of everyone"""
+    return Rollup(
+        daily=read_table(session, tables, 'daily', user_id),
+        moisture=read_table(session, tables, 'moisture', user_id),
+    )
+
+def prediction_count(session, tables, user_id=None):
+    """
+    Number of predictions in the rollups of one user (or everyone). It
+    changes with every saved prediction, so caches use it as a fingerprint
+    of the data; unlike the newest id or created_at it also changes when
+    the write-behind log commits older predictions late.
+    """
+    query = select(func.coalesce(func.sum(tables.moisture.c['count']), 0))
+    if user_id is not None:
+        query = query.where(tables.moisture.c.user_id == user_id)
+    return int(session.execute(query).scalar())
+
+def from_predictions(predictions):
+    """Rollup built in memory from prediction objects or dicts"""
+    import pandas as pd
+    daily_rows, moisture_rows = aggregate(predictions)
+    return Rollup(
+        daily=pd.DataFrame(daily_rows, columns=list(DAILY_COLUMNS)),
+        moisture=pd.DataFrame(moisture_rows, columns=list(MOISTURE_COLUMNS)),
+    )
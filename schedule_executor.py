@@ -0,0 +1,132 @@
+"""
+Schedule executor - runs irrigation for many schedules concurrently
+Talking to a valve can be slow, so schedules run on a thread pool instead
+of one after another. Schedules of the same farm (user) never overlap:
+each farm's schedules run in order, one at a time, under a process-wide
+farm lock that process_schedule() takes as well.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+_farm_locks = {}
+_farm_locks_guard = threading.Lock()
+
+def farm_lock(user_id):
+    """The lock held while irrigation runs on a user's farm"""
+    with _farm_locks_guard:
+        lock = _farm_locks.get(user_id)
+        if lock is None:
+            lock = _farm_locks[user_id] = threading.Lock()
+        return lock
+
+class FarmBusyError(RuntimeError):
+    """Another irrigation on the same farm did not finish in time"""
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class ScheduleExecutor:
+    """
+    Runs execute(schedule) for a set of schedules with at most max_workers
+    at once. Schedules need id and user_id attributes.
+    A schedule still running after timeout seconds is reported as failed;
+    Python threads can't be killed, so its farm stays locked until the call
+    returns and the farm's remaining schedules in the run fail right away.
+    """
+
+    def __init__(self, execute, max_workers=8, timeout=300, poll_interval=0.05, clock=time.monotonic):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.execute = execute
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._clock = clock
+
+    def _run_one(self, schedule, started):
+        """Pool task: run one schedule while holding its farm's lock"""
+        lock = farm_lock(schedule.user_id)
+        if not lock.acquire(timeout=self.timeout):
+            raise FarmBusyError(f"Farm busy with another irrigation for over {self.timeout}s")
+        try:
+            started[schedule.id] = self._clock()
+            self.execute(schedule)
+        finally:
+            lock.release()
+
+    def run(self, schedules):
+        """
+        Execute every schedule. Returns (outcomes, stats): outcomes maps
+        schedule id -> None on success or the failure reason.
+        """
+        queues = OrderedDict()
+        for schedule in schedules:
+            queues.setdefault(schedule.user_id, deque()).append(schedule)
+
+        outcomes = {}
+        started, submitted, durations, waits = {}, {}, [], []
+        active = {}
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='irrigation')
+        run_started = self._clock()
+
+        def submit_next(user_id):
+            queue = queues[user_id]
+            if queue:
+                schedule = queue.popleft()
+                submitted[schedule.id] = self._clock()
+                active[pool.submit(self._run_one, schedule, started)] = schedule
+
+        def fail_farm(user_id, reason):
+            for schedule in queues[user_id]:
+                outcomes[schedule.id] = reason
+            queues[user_id].clear()
+
+        try:
+            for user_id in queues:
+                submit_next(user_id)
+
+            while active:
+                done, _ = wait(list(active), timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                now = self._clock()
+                for future in done:
+                    schedule = active.pop(future)
+                    error = future.exception()
+                    outcomes[schedule.id] = None if error is None else str(error) or type(error).__name__
+                    if schedule.id in started:
+                        waits.append(started[schedule.id] - submitted[schedule.id])
+                        durations.append(now - started[schedule.id])
+                    submit_next(schedule.user_id)
+
+                for future, schedule in list(active.items()):
+                    start = started.get(schedule.id)
+                    if start is not None and now - start > self.timeout:
+                        del active[future]
+                        outcomes[schedule.id] = f"Timed out after {self.timeout}s"
+                        durations.append(now - start)
+                        fail_farm(schedule.user_id, "Skipped: an earlier irrigation on this farm timed out")
+        finally:
+            # Don't wait for timed-out calls; they release their farm when they return
+            pool.shutdown(wait=False)
+
+        elapsed = self._clock() - run_started
+        failed = sum(1 for reason in outcomes.values() if reason is not None)
+        stats = {
+            'schedules': len(outcomes),
+            'completed': len(outcomes) - failed,
+            'failed': failed,
+            'farms': len(queues),
+            'max_workers': self.max_workers,
+            'seconds': round(elapsed, 4),
+            'throughput_per_s': round(len(outcomes) / elapsed, 2) if elapsed > 0 else 0.0,
+            'latency_p50_s': round(percentile(durations, 0.50), 4),
+            'latency_p95_s': round(percentile(durations, 0.95), 4),
+            'latency_max_s': round(max(durations, default=0.0), 4),
+            'queue_wait_p95_s': round(percentile(waits, 0.95), 4),
+        }
+        return outcomes, stats
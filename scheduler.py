@@ -3,18 +3,42 @@ Irrigation Scheduler - Background task processor
 Implements the decision logic from the diagram
 """
 from datetime import datetime, timedelta
-from app import app, db, IrrigationSchedule, User
+from sqlalchemy import select, update
+from app import app, db, IrrigationSchedule, User, Prediction, weather_provider
+from schedule_executor import ScheduleExecutor, farm_lock
+import numpy as np
 import requests
+import water_requirement
+
+# Soil moisture below which a crop needs irrigation (moisture units 0-1000)
+SOIL_MOISTURE_THRESHOLDS = {
+    'Wheat': 400,
+    'Rice': 600,
+    'Cotton': 350,
+    'Sugarcane': 500,
+    'Maize': 380,
+    'Soybean': 370,
+    'default': 400
+}
+
+# SOIL_MOISTURE_THRESHOLDS indexed by water_requirement.crop_index(), for plan_schedules()
+THRESHOLD_LOOKUP = water_requirement.crop_lookup(SOIL_MOISTURE_THRESHOLDS, SOIL_MOISTURE_THRESHOLDS['default'])
+
+POSTPONE_DELAY = timedelta(hours=12)
+DEFAULT_LOCATION = "New Delhi"
+
+# Ids per UPDATE ... WHERE id IN (...), below SQLite's bound-parameter limit
+BULK_UPDATE_CHUNK_SIZE = 900
 
 def check_rain_forecast(location, hours=24):
     """
     Step 2.0: Check if rain is expected in next 24h
     Returns: (bool, probability)
+    Reads the forecast shared with the dashboard (weather_provider), so a
+    location is fetched once per cache period however many schedules it has.
     """
     try:
-        # Mock implementation - in production, use real weather API
-        # For now, return False (no rain) to allow testing
-        return False, 0.0
+        return weather_provider.rain_forecast(location, hours)
     except Exception as e:
         print(f"Error checking rain: {e}")
         return False, 0.0
@@ -24,18 +48,7 @@ def check_soil_moisture_threshold(soil_moisture, crop_type):
     Step 4.0: Check if soil moisture is below threshold
     Returns: bool (True if below threshold, needs irrigation)
     """
-    # Threshold values for different crops (in moisture units 0-1000)
-    thresholds = {
-        'Wheat': 400,
-        'Rice': 600,
-        'Cotton': 350,
-        'Sugarcane': 500,
-        'Maize': 380,
-        'Soybean': 370,
-        'default': 400
-    }
-    
-    threshold = thresholds.get(crop_type, thresholds['default'])
+    threshold = SOIL_MOISTURE_THRESHOLDS.get(crop_type, SOIL_MOISTURE_THRESHOLDS['default'])
     return soil_moisture < threshold
 
 def process_schedule(schedule_id):
@@ -54,7 +67,7 @@ def process_schedule(schedule_id):
         print(f"Processing schedule {schedule_id} for user {user.username}")
         
         # Step 1.0: Fetch & Process Data
-        location = user.location or "New Delhi"
+        location = user.location or DEFAULT_LOCATION
         
         # Step 2.0: Is Rain Expected (next 24h)?
         rain_expected, rain_prob = check_rain_forecast(location)
@@ -79,7 +92,7 @@ def process_schedule(schedule_id):
         if soil_ok:
             # Step 5.0: POSTPONE Schedule
             schedule.status = 'postponed'
-            schedule.scheduled_time = datetime.utcnow() + timedelta(hours=12)
+            schedule.scheduled_time = datetime.utcnow() + POSTPONE_DELAY
             schedule.cancellation_reason = 'Soil moisture adequate'
             schedule.notification_sent = True
             db.session.commit()
@@ -97,8 +110,9 @@ def process_schedule(schedule_id):
         
         print(f"▶ Schedule {schedule_id} EXECUTING - {schedule.water_amount}mm for {schedule.duration} minutes")
         
-        # Simulate irrigation execution
-        execute_irrigation(schedule)
+        # Simulate irrigation execution; never alongside the executor on the same farm
+        with farm_lock(schedule.user_id):
+            execute_irrigation(schedule)
         
         # Mark as completed
         schedule.status = 'completed'
@@ -141,11 +155,154 @@ def send_notification(user, message):
     # - Send SMS via Twilio
     # - Send push notification
 
-def check_pending_schedules():
+def plan_schedules(due, rain_by_location):
+    """
+    Evaluate the decision diagram for many due schedules at once, in memory.
+    due: rows with id, location, soil_moisture and crop_type (the last two
+    None when the schedule has no prediction).
+    rain_by_location: location -> (rain_expected, probability).
+    Returns {'cancel': {reason: [ids]}, 'postpone': [ids], 'execute': [rows]}.
+    """
+    plan = {'cancel': {}, 'postpone': [], 'execute': []}
+    # Step 4.0 for every schedule at once: thresholds come from a crop lookup
+    # array; schedules without a reading (NaN) are never adequate
+    moisture = np.array([np.nan if row.soil_moisture is None else row.soil_moisture for row in due], dtype=float)
+    thresholds = THRESHOLD_LOOKUP[water_requirement.crop_index([row.crop_type for row in due])]
+    adequate = moisture >= thresholds
+    for row, moisture_adequate in zip(due, adequate.tolist()):
+        # Step 2.0: Is Rain Expected (next 24h)?
+        rain_expected, rain_prob = rain_by_location[row.location or DEFAULT_LOCATION]
+        if rain_expected:
+            reason = f'Rain expected (probability: {rain_prob}%)'
+            plan['cancel'].setdefault(reason, []).append(row.id)
+        # Step 4.0: Is Soil Moisture < Threshold?
+        elif moisture_adequate:
+            plan['postpone'].append(row.id)
+        else:
+            plan['execute'].append(row)
+    return plan
+
+def _bulk_update(ids, from_status, **values):
+    """
+    Move many schedules from one status to another with chunked
+    UPDATE ... WHERE id IN (...) statements. Rows no longer in from_status
+    (e.g. cancelled by the farmer meanwhile) are left alone.
+    Returns the ids that were updated.
+    """
+    updated = []
+    for start in range(0, len(ids), BULK_UPDATE_CHUNK_SIZE):
+        result = db.session.execute(
+            update(IrrigationSchedule)
+            .where(IrrigationSchedule.id.in_(ids[start:start + BULK_UPDATE_CHUNK_SIZE]),
+                   IrrigationSchedule.status == from_status)
+            .values(**values)
+            .returning(IrrigationSchedule.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated.extend(result.scalars())
+    return updated
+
+def process_due_schedules(now=None):
+    """
+    Bulk mode of the scheduler - processes every due schedule as a set.
+    One joined SELECT loads the due schedules with their users and
+    predictions, rain is checked once per location, the decisions are made
+    in memory and the status changes are written with a few bulk UPDATEs
+    in two commits. Irrigation runs concurrently on a ScheduleExecutor
+    (SCHEDULER_MAX_WORKERS, SCHEDULER_TASK_TIMEOUT), one schedule per farm
+    at a time. Returns the number of schedules per outcome and, under
+    'execution', the executor's throughput and latency stats.
+    """
+    with app.app_context():
+        now = now or datetime.utcnow()
+        
+        due = db.session.execute(
+            select(IrrigationSchedule.id, IrrigationSchedule.user_id, IrrigationSchedule.water_amount,
+                   IrrigationSchedule.duration, User.username, User.location, Prediction.soil_moisture, Prediction.crop_type)
+            .join(User, IrrigationSchedule.user_id == User.id)
+            .outerjoin(Prediction, IrrigationSchedule.prediction_id == Prediction.id)
+            .where(IrrigationSchedule.status == 'pending', IrrigationSchedule.scheduled_time <= now)
+            .order_by(IrrigationSchedule.id)
+        ).all()
+        
+        print(f"\n⏰ Checking schedules at {now}")
+        print(f"Found {len(due)} due schedules")
+        counts = {'cancelled': 0, 'postponed': 0, 'completed': 0, 'failed': 0, 'execution': None}
+        if not due:
+            return counts
+        
+        rain_by_location = {
+            location: check_rain_forecast(location)
+            for location in {row.location or DEFAULT_LOCATION for row in due}
+        }
+        plan = plan_schedules(due, rain_by_location)
+        rows_by_id = {row.id: row for row in due}
+        
+        # Step 3.0 / 5.0: CANCEL or POSTPONE; Step 7.0: claim the rest for execution
+        cancelled = {}
+        for reason, ids in plan['cancel'].items():
+            cancelled[reason] = _bulk_update(
+                ids, 'pending', status='cancelled', cancellation_reason=reason, notification_sent=True
+            )
+        postponed = _bulk_update(
+            plan['postpone'], 'pending', status='postponed', scheduled_time=now + POSTPONE_DELAY,
+            cancellation_reason='Soil moisture adequate', notification_sent=True
+        )
+        executing = _bulk_update([row.id for row in plan['execute']], 'pending', status='executing')
+        db.session.commit()
+        
+        # Step 7.0: EXECUTE IRRIGATION
+        executor = ScheduleExecutor(
+            execute_irrigation,
+            max_workers=app.config['SCHEDULER_MAX_WORKERS'],
+            timeout=app.config['SCHEDULER_TASK_TIMEOUT']
+        )
+        outcomes, execution_stats = executor.run([rows_by_id[schedule_id] for schedule_id in executing])
+        completed, failed = [], {}
+        for schedule_id, error in outcomes.items():
+            if error is None:
+                completed.append(schedule_id)
+            else:
+                print(f"Error processing schedule {schedule_id}: {error}")
+                failed.setdefault(error[:200], []).append(schedule_id)
+        
+        _bulk_update(completed, 'executing', status='completed',
+                     executed_at=datetime.utcnow(), notification_sent=True)
+        for reason, ids in failed.items():
+            _bulk_update(ids, 'executing', status='failed', cancellation_reason=reason)
+        db.session.commit()
+        
+        # Rows carry the username, which is all send_notification needs
+        for reason, ids in cancelled.items():
+            for schedule_id in ids:
+                send_notification(rows_by_id[schedule_id], f"Irrigation cancelled - {reason}")
+        for schedule_id in postponed:
+            send_notification(rows_by_id[schedule_id],
+                              "Irrigation postponed - Soil moisture adequate. Rescheduled for 12h later.")
+        for schedule_id in completed:
+            send_notification(rows_by_id[schedule_id],
+                              f"Irrigation completed! Applied {rows_by_id[schedule_id].water_amount}mm of water.")
+        
+        counts.update(
+            cancelled=sum(len(ids) for ids in cancelled.values()),
+            postponed=len(postponed),
+            completed=len(completed),
+            failed=sum(len(ids) for ids in failed.values()),
+            execution=execution_stats
+        )
+        print(f"✓ Processed {len(due)} schedules: {counts}")
+        return counts
+
+def check_pending_schedules(bulk=True):
     """
-    Background task that runs every hour
-    Checks all pending schedules that are due
+    Checks all pending schedules that are due, as one set (bulk=True)
+    or one schedule at a time with process_schedule (bulk=False).
+    The app fires due schedules from app.schedule_queue as they come due;
+    this entry point is for manual and one-off runs.
     """
+    if bulk:
+        return process_due_schedules()
+    
     with app.app_context():
         now = datetime.utcnow()
         
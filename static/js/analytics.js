@@ -0,0 +1,130 @@
+// Smart Irrigation Scheduler - Analytics charts
+// Fetches the aggregated series of each chart from /api/analytics/<chart>
+// and draws it with Plotly in the browser.
+
+const NO_IRRIGATION_COLOR = '#74b9ff';
+const IRRIGATION_COLOR = '#ff6b6b';
+const NEUTRAL_COLOR = '#00b894';
+
+const CHARTS = {
+    timeline(data) {
+        return {
+            traces: [
+                {x: data.days, y: data.no_irrigation, name: 'No Irrigation', type: 'scatter', mode: 'lines+markers',
+                 line: {color: NO_IRRIGATION_COLOR, width: 3}},
+                {x: data.days, y: data.irrigation_needed, name: 'Irrigation Needed', type: 'scatter', mode: 'lines+markers',
+                 line: {color: IRRIGATION_COLOR, width: 3}}
+            ],
+            layout: {title: 'Prediction Timeline', xaxis: {title: 'Date'}, yaxis: {title: 'Number of Predictions'}}
+        };
+    },
+
+    crop_rate(data) {
+        return {
+            traces: [{x: data.crops, y: data.rates, type: 'bar', marker: {color: NEUTRAL_COLOR},
+                      text: data.rates.map(rate => `${rate}%`), textposition: 'auto',
+                      customdata: data.counts, hovertemplate: '%{x}: %{y}% of %{customdata}<extra></extra>'}],
+            layout: {title: 'Irrigation Rate by Crop Type', xaxis: {title: 'Crop Type'},
+                     yaxis: {title: 'Irrigation Rate (%)'}}
+        };
+    },
+
+    moisture(data) {
+        return {
+            traces: [
+                {x: data.centers, y: data.no_irrigation, width: data.bin_width, name: 'No Irrigation', type: 'bar',
+                 opacity: 0.7, marker: {color: NO_IRRIGATION_COLOR}},
+                {x: data.centers, y: data.irrigation_needed, width: data.bin_width, name: 'Irrigation Needed', type: 'bar',
+                 opacity: 0.7, marker: {color: IRRIGATION_COLOR}}
+            ],
+            layout: {title: 'Soil Moisture Distribution', barmode: 'overlay', xaxis: {title: 'Soil Moisture'},
+                     yaxis: {title: 'Frequency'}}
+        };
+    },
+
+    scatter(data) {
+        const traces = [[0, 'No Irrigation', NO_IRRIGATION_COLOR], [1, 'Irrigation Needed', IRRIGATION_COLOR]]
+            .map(([prediction, name, color]) => {
+                const index = data.prediction.map((value, i) => value === prediction ? i : -1).filter(i => i >= 0);
+                return {
+                    x: index.map(i => data.temperature[i]), y: index.map(i => data.humidity[i]),
+                    customdata: index.map(i => data.count[i]), name: name, type: 'scatter', mode: 'markers',
+                    marker: {color: color, size: index.map(i => 6 + 3 * Math.sqrt(data.count[i]))},
+                    hovertemplate: '%{x}°C, %{y}%: %{customdata} readings<extra></extra>'
+                };
+            });
+        return {
+            traces: traces,
+            layout: {title: 'Temperature vs Humidity', xaxis: {title: 'Temperature (°C)'}, yaxis: {title: 'Humidity (%)'}}
+        };
+    },
+
+    confidence(data) {
+        const box = (summary, name, color) => ({
+            type: 'box', name: name, marker: {color: color}, x: [name],
+            q1: [summary.q1], median: [summary.median], q3: [summary.q3],
+            lowerfence: [summary.lowerfence], upperfence: [summary.upperfence]
+        });
+        const traces = [];
+        if (data.no_irrigation) traces.push(box(data.no_irrigation, 'No Irrigation', NO_IRRIGATION_COLOR));
+        if (data.irrigation_needed) traces.push(box(data.irrigation_needed, 'Irrigation Needed', IRRIGATION_COLOR));
+        return {traces: traces, layout: {title: 'Prediction Confidence Distribution', yaxis: {title: 'Confidence'}}};
+    },
+
+    weekly(data) {
+        return {
+            traces: [
+                {x: data.weeks, y: data.no_irrigation, name: 'No Irrigation', type: 'bar', marker: {color: NO_IRRIGATION_COLOR}},
+                {x: data.weeks, y: data.irrigation_needed, name: 'Irrigation Needed', type: 'bar', marker: {color: IRRIGATION_COLOR}}
+            ],
+            layout: {title: 'Weekly Prediction Summary', barmode: 'group', xaxis: {title: 'Week'},
+                     yaxis: {title: 'Number of Predictions'}}
+        };
+    },
+
+    distribution(data) {
+        return {
+            traces: [{labels: ['No Irrigation', 'Irrigation Needed'], values: [data.no_irrigation, data.irrigation_needed],
+                      type: 'pie', hole: 0.3, marker: {colors: [NO_IRRIGATION_COLOR, IRRIGATION_COLOR]}}],
+            layout: {title: 'Overall Irrigation Distribution'}
+        };
+    },
+
+    top_users(data) {
+        return {
+            traces: [{x: data.counts, y: data.users, type: 'bar', orientation: 'h', marker: {color: NEUTRAL_COLOR}}],
+            layout: {title: 'Top 10 Active Users', xaxis: {title: 'Number of Predictions'}, yaxis: {title: 'User'}}
+        };
+    },
+
+    crops(data) {
+        return {
+            traces: [{labels: data.crops, values: data.counts, type: 'pie'}],
+            layout: {title: 'Crop Type Distribution'}
+        };
+    }
+};
+
+async function loadChart(element) {
+    const chart = element.dataset.chart;
+    try {
+        const response = await fetch(`/api/analytics/${chart}`);
+        const result = await response.json();
+        if (!result.success) {
+            throw new Error(result.message);
+        }
+        if (!result.data) {
+            element.innerHTML = '<p class="text-muted text-center my-4">No data yet</p>';
+            return;
+        }
+        const figure = CHARTS[chart](result.data);
+        Plotly.newPlot(element, figure.traces, Object.assign({height: 400}, figure.layout), {responsive: true});
+    } catch (error) {
+        console.error(`Error loading ${chart} chart:`, error);
+        element.innerHTML = '<p class="text-danger text-center my-4">Failed to load chart</p>';
+    }
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('[data-chart]').forEach(loadChart);
+});
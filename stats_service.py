@@ -0,0 +1,55 @@
+"""
+Stats service - admin dashboard numbers and tables computed by the database
+The admin page used to load prediction and user objects and count them in
+Python (or run one COUNT query per number). These functions ask for the
+aggregates in one grouped query and get plain rows back, so no ORM
+objects are built. (Analytics summary numbers come from the rollup
+tables, see rollups.py.)
+"""
+from datetime import datetime
+from sqlalchemy import case, func, select
+from app import db, Prediction, User
+from prediction_data import prediction_query
+
+# Columns of the admin prediction table
+RECENT_PREDICTION_COLUMNS = ('id', 'username', 'crop_type', 'crop_days', 'soil_moisture', 'temperature',
+                             'humidity', 'prediction', 'confidence', 'created_at')
+
+def admin_stats(now=None):
+    """
+    Counters for the admin dashboard in one query: a single pass over the
+    prediction table, with today's count taken from the created_at index.
+    """
+    today = (now or datetime.utcnow()).date()
+    today_start = datetime(today.year, today.month, today.day)
+    total_users = select(func.count()).select_from(User).scalar_subquery()
+    predictions_today = (select(func.count()).select_from(Prediction)
+                         .where(Prediction.created_at >= today_start).scalar_subquery())
+    row = db.session.execute(select(
+        total_users,
+        predictions_today,
+        func.count(),
+        func.sum(case((Prediction.prediction == 1, 1), else_=0)),
+        func.count(Prediction.prediction)
+    ).select_from(Prediction)).one()
+    total_users, predictions_today, total_predictions, irrigation_needed, with_prediction = row
+    irrigation_needed = int(irrigation_needed or 0)
+    return {
+        'total_users': total_users,
+        'total_predictions': total_predictions,
+        'predictions_today': predictions_today,
+        'irrigation_needed': irrigation_needed,
+        # Predictions are 0 or 1
+        'no_irrigation': with_prediction - irrigation_needed
+    }
+
+def user_rows():
+    """Columns of every user shown in the admin user table"""
+    return db.session.execute(select(
+        User.id, User.username, User.email, User.farm_name, User.location,
+        User.farm_size, User.is_admin, User.created_at
+    ).order_by(User.id)).all()
+
+def recent_prediction_rows(limit=50):
+    """Latest predictions with their username, for the admin table (one joined query)"""
+    return db.session.execute(prediction_query(limit=limit, columns=RECENT_PREDICTION_COLUMNS)).all()
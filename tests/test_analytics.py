@@ -1,15 +1,18 @@
 """
 Unit Tests for Module 5 - Analytics/Visualization Module (analytics.py)
-Tests data visualization and analytics generation
+Tests summary numbers and chart series
 """
 import unittest
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from analytics import calculate_stats, generate_user_analytics
+from analytics import CHART_SOURCES, chart_series, stats_from_rollup, SYSTEM_CHARTS, USER_CHARTS
 from app import app, db, User, Prediction
 from datetime import datetime
+import json
+import pandas as pd
+import rollups
 
 class TestAnalyticsModule(unittest.TestCase):
     """Test cases for Analytics Module"""
@@ -57,63 +60,70 @@ class TestAnalyticsModule(unittest.TestCase):
             db.session.remove()
             db.drop_all()
     
-    def test_calculate_stats_with_data(self):
-        """Test 5.1: Calculate stats with predictions"""
+    def test_stats_with_data(self):
+        """Test 5.1: Summary stats of a user's predictions"""
         with app.app_context():
             predictions = Prediction.query.filter_by(user_id=self.test_user_id).all()
-            stats = calculate_stats(predictions)
+            stats = stats_from_rollup(rollups.from_predictions(predictions))
             
             self.assertEqual(stats['total'], 10, "Should have 10 predictions")
             self.assertGreater(stats['avg_confidence'], 0, "Should have average confidence")
             self.assertIn(stats['most_common_crop'], ['Wheat', 'Rice'], "Should identify common crop")
     
-    def test_calculate_stats_empty(self):
-        """Test 5.2: Calculate stats with no data"""
-        stats = calculate_stats([])
+    def test_stats_empty(self):
+        """Test 5.2: Summary stats with no data"""
+        stats = stats_from_rollup(rollups.from_predictions([]))
         
         self.assertEqual(stats['total'], 0, "Total should be 0")
         self.assertEqual(stats['irrigation_needed'], 0, "Irrigation needed should be 0")
         self.assertEqual(stats['avg_confidence'], 0, "Avg confidence should be 0")
     
-    def test_generate_user_analytics(self):
-        """Test 5.3: Generate user analytics charts"""
-        with app.app_context():
-            predictions = Prediction.query.filter_by(user_id=self.test_user_id).all()
-            charts = generate_user_analytics(predictions)
-            
-            self.assertIsNotNone(charts, "Should generate charts")
-            self.assertIn('timeline', charts, "Should have timeline chart")
-            self.assertIn('crop_rate', charts, "Should have crop rate chart")
-            self.assertIn('moisture', charts, "Should have moisture chart")
-    
-    def test_analytics_with_no_data(self):
-        """Test 5.4: Analytics with no predictions"""
-        charts = generate_user_analytics([])
-        self.assertIsNone(charts, "Should return None for empty data")
-    
-    def test_chart_html_format(self):
-        """Test 5.5: Charts should be in HTML format"""
-        with app.app_context():
-            predictions = Prediction.query.filter_by(user_id=self.test_user_id).all()
-            charts = generate_user_analytics(predictions)
-            
-            if charts:
-                for chart_name, chart_html in charts.items():
-                    self.assertIsInstance(chart_html, str, f"{chart_name} should be string")
-                    self.assertIn('plotly', chart_html.lower(), f"{chart_name} should contain plotly")
-    
     def test_stats_accuracy(self):
-        """Test 5.6: Verify stats calculation accuracy"""
+        """Test 5.3: Verify stats calculation accuracy"""
         with app.app_context():
             predictions = Prediction.query.filter_by(user_id=self.test_user_id).all()
-            stats = calculate_stats(predictions)
+            stats = stats_from_rollup(rollups.from_predictions(predictions))
             
             # Manual count
             irrigation_count = sum(1 for p in predictions if p.prediction == 1)
+            avg_confidence = sum(p.confidence for p in predictions) / len(predictions) * 100
             
             self.assertEqual(stats['irrigation_needed'], irrigation_count,
                            "Irrigation count should match")
             self.assertEqual(stats['total'], len(predictions), "Total should match")
+            self.assertEqual(stats['avg_confidence'], round(avg_confidence, 1))
+    
+    def test_chart_series(self):
+        """Test 5.4: Chart series are compact JSON that add up to the predictions"""
+        with app.app_context():
+            predictions = Prediction.query.filter_by(user_id=self.test_user_id).all()
+            rollup = rollups.from_predictions(predictions)
+            sources = {
+                'daily': rollup.daily,
+                'moisture': rollup.moisture,
+                'readings': predictions,
+                'user_totals': pd.DataFrame({'user_id': [self.test_user_id, 999], 'username': ['analyticstest', None],
+                                             'count': [10, 2]}),
+            }
+            series = {chart: chart_series(chart, sources[CHART_SOURCES[chart]]) for chart in USER_CHARTS + SYSTEM_CHARTS}
+            
+            self.assertLess(len(json.dumps(series)), 3000)
+            self.assertEqual(sum(series['timeline']['irrigation_needed']), 5)
+            self.assertEqual(sum(series['moisture']['no_irrigation']) + sum(series['moisture']['irrigation_needed']), 10)
+            self.assertEqual(sum(series['scatter']['count']), 10)
+            self.assertEqual(series['confidence']['irrigation_needed']['n'], 5)
+            self.assertEqual(series['distribution'], {'no_irrigation': 5, 'irrigation_needed': 5})
+            self.assertEqual(series['top_users'], {'users': ['analyticstest', 'User 999'], 'counts': [10, 2]})
+            self.assertEqual(dict(zip(series['crop_rate']['crops'], series['crop_rate']['rates'])),
+                             {'Rice': 100.0, 'Wheat': 0.0})
+    
+    def test_chart_series_no_data(self):
+        """Test 5.5: Chart series are None without predictions"""
+        rollup = rollups.from_predictions([])
+        sources = {'daily': rollup.daily, 'moisture': rollup.moisture, 'readings': [],
+                   'user_totals': pd.DataFrame(columns=['user_id', 'username', 'count'])}
+        for chart in USER_CHARTS + SYSTEM_CHARTS:
+            self.assertIsNone(chart_series(chart, sources[CHART_SOURCES[chart]]))
 
 if __name__ == '__main__':
     unittest.main()
@@ -140,6 +140,49 @@ class TestBackendAPI(unittest.TestCase):
         )
         data = json.loads(response.data)
         self.assertTrue(data['success'], "Profile update should succeed")
+    
+    def test_model_loaded_once_lazily(self):
+        """Test 2.11: Concurrent first calls share a single model load"""
+        import threading
+        import app as app_module
+        
+        original_load_model = app_module.load_model
+        calls = []
+        def counting_load_model():
+            calls.append(1)
+            return original_load_model()
+        
+        app_module.predictor = None
+        app_module.load_model = counting_load_model
+        try:
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(app_module.get_predictor()))
+                       for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            app_module.load_model = original_load_model
+        
+        self.assertEqual(len(calls), 1, "Model should be loaded exactly once")
+        self.assertIsNotNone(results[0])
+        self.assertTrue(all(result is results[0] for result in results))
+    
+    def test_preload_without_watcher(self):
+        """Test 2.12: get_predictor(watch=False) loads the model without starting the file watcher"""
+        import threading
+        from unittest import mock
+        import app as app_module
+        
+        app_module.predictor = None
+        with mock.patch.object(app_module, '_watcher_pid', None), \
+                mock.patch.dict(app_module.app.config, {'MODEL_RELOAD_INTERVAL': 30}), \
+                mock.patch.object(threading.Thread, 'start') as start:
+            self.assertIsNotNone(app_module.get_predictor(watch=False))
+            start.assert_not_called()
+            app_module.start_model_watcher()
+            start.assert_called_once()
 
 if __name__ == '__main__':
     unittest.main()
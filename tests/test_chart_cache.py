@@ -0,0 +1,89 @@
+"""
+Unit Tests for the analytics chart cache (chart_cache.py)
+Tests fingerprinted keys, size-bounded eviction and disk persistence
+"""
+import unittest
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from chart_cache import ChartCache
+
+class Builder:
+    """build() stand-in that counts its calls"""
+    def __init__(self, names=('timeline', 'weekly')):
+        self.names = names
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {name: f"<div>{name} {self.calls}</div>" for name in self.names}
+
+class TestChartCache(unittest.TestCase):
+    """Test cases for the chart cache"""
+
+    def test_builds_once_per_fingerprint(self):
+        """Test 16.1: Charts are built on the first request and then served from the cache"""
+        cache = ChartCache()
+        build = Builder()
+        first = cache.get_or_build(1, build.names, 10, build)
+        second = cache.get_or_build(1, build.names, 10, build)
+        self.assertEqual(build.calls, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(cache.stats()['hits'], 2)
+
+    def test_new_fingerprint_replaces_entry(self):
+        """Test 16.2: New data rebuilds the charts and drops the superseded ones"""
+        cache = ChartCache()
+        build = Builder()
+        cache.get_or_build(1, build.names, 10, build)
+        charts = cache.get_or_build(1, build.names, 11, build)
+        self.assertEqual(build.calls, 2)
+        self.assertEqual(charts['timeline'], '<div>timeline 2</div>')
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(1, 'timeline', 10))
+        cache.get_or_build(2, build.names, 10, build)
+        self.assertEqual(len(cache), 4)
+
+    def test_size_bounded_eviction(self):
+        """Test 16.3: The least recently used charts are evicted beyond max_bytes"""
+        cache = ChartCache(max_bytes=100)
+        for scope in range(5):
+            cache.put(scope, 'timeline', 1, 'x' * 30)
+        cache.get(2, 'timeline', 1)
+        cache.put(5, 'timeline', 1, 'x' * 30)
+        stats = cache.stats()
+        self.assertLessEqual(stats['bytes'], 100)
+        self.assertGreater(stats['evictions'], 0)
+        self.assertIsNotNone(cache.get(2, 'timeline', 1))
+        self.assertIsNone(cache.get(0, 'timeline', 1))
+
+    def test_disk_persistence(self):
+        """Test 16.4: Charts on disk survive a restart and are matched by fingerprint"""
+        with tempfile.TemporaryDirectory() as tmp:
+            build = Builder()
+            ChartCache(directory=tmp).get_or_build(1, build.names, 10, build)
+            ChartCache(directory=tmp).get_or_build(1, build.names, 11, build)
+            self.assertEqual(len(os.listdir(tmp)), len(build.names))
+
+            restarted = ChartCache(directory=tmp)
+            charts = restarted.get_or_build(1, build.names, 11, build)
+            self.assertEqual(build.calls, 2)
+            self.assertEqual(charts['timeline'], '<div>timeline 2</div>')
+            self.assertEqual(restarted.stats()['disk_hits'], 2)
+            self.assertIsNone(restarted.get(1, 'timeline', 10))
+
+    def test_invalidate(self):
+        """Test 16.5: invalidate() drops a scope's charts in memory and on disk"""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ChartCache(directory=tmp)
+            build = Builder()
+            cache.get_or_build(1, build.names, 10, build)
+            cache.invalidate(1, build.names)
+            self.assertEqual(len(cache), 0)
+            self.assertEqual(os.listdir(tmp), [])
+            self.assertEqual(cache.stats()['bytes'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Unit Tests for the database engine settings (database.py)
+Tests pool options per database type and the SQLite pragmas
+"""
+import unittest
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from database import engine_options, install_sqlite_pragmas, normalize_database_uri, sqlite_settings
+
+PRAGMAS = {'busy_timeout': 2500, 'journal_mode': 'WAL', 'synchronous': 'NORMAL',
+           'cache_size': -16384, 'mmap_size': 1048576}
+
+class TestDatabase(unittest.TestCase):
+    """Test cases for the database engine layer"""
+
+    def test_engine_options(self):
+        """Test 12.1: Pool options fit the database type"""
+        self.assertEqual(engine_options('sqlite://'), {})
+        self.assertEqual(engine_options('sqlite:///:memory:'), {})
+        file_options = engine_options('sqlite:///farmers.db', pool_size=3, max_overflow=2)
+        self.assertEqual(file_options['pool_size'], 3)
+        self.assertEqual(file_options['max_overflow'], 2)
+        self.assertNotIn('pool_pre_ping', file_options)
+        server_options = engine_options('postgresql://user:pw@db/irrigation')
+        self.assertTrue(server_options['pool_pre_ping'])
+        self.assertIn('pool_recycle', server_options)
+
+    def test_normalize_database_uri(self):
+        """Test 12.2: postgres:// URIs are accepted"""
+        self.assertEqual(normalize_database_uri('postgres://u:p@host/db'), 'postgresql://u:p@host/db')
+        self.assertEqual(normalize_database_uri('sqlite:///farmers.db'), 'sqlite:///farmers.db')
+
+    def test_pragmas_applied_on_connect(self):
+        """Test 12.3: Every new SQLite connection gets WAL and the pragmas"""
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'test.db')}", **engine_options('sqlite:///test.db'))
+            install_sqlite_pragmas(engine, PRAGMAS)
+            settings = sqlite_settings(engine)
+            engine.dispose()
+        self.assertEqual(settings['journal_mode'], 'wal')
+        self.assertEqual(settings['synchronous'], 1)  # NORMAL
+        self.assertEqual(settings['busy_timeout'], 2500)
+        self.assertEqual(settings['cache_size'], -16384)
+        self.assertEqual(settings['mmap_size'], 1048576)
+
+    def test_app_engine_is_tuned(self):
+        """Test 12.4: The app's SQLite engine runs in WAL mode"""
+        from app import app, db
+        with app.app_context():
+            if db.engine.dialect.name != 'sqlite' or not app.config['SQLITE_PRAGMAS']:
+                self.skipTest("App is not using a tuned SQLite database")
+            self.assertEqual(sqlite_settings(db.engine)['journal_mode'], 'wal')
+
+if __name__ == '__main__':
+    unittest.main()
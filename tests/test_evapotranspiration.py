@@ -0,0 +1,69 @@
+"""
+Unit Tests for FAO-56 reference evapotranspiration (evapotranspiration.py)
+Tests Ra, the precomputed Ra table, Hargreaves and Penman-Monteith against
+the worked examples of FAO Irrigation and Drainage Paper 56
+"""
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import date
+import numpy as np
+import evapotranspiration as et
+import water_requirement
+
+class TestEvapotranspiration(unittest.TestCase):
+    """Test cases for reference evapotranspiration"""
+
+    def test_extraterrestrial_radiation(self):
+        """Test 18.1: Ra matches FAO-56 Example 8 (20°S, 3 September) and is 0 in polar night"""
+        self.assertAlmostEqual(float(et.extraterrestrial_radiation(-20, 246)), 32.2, places=1)
+        self.assertEqual(float(et.extraterrestrial_radiation(80, 1)), 0.0)
+        self.assertEqual(et.day_of_year(date(2023, 9, 3)), 246)
+
+    def test_ra_table(self):
+        """Test 18.2: The precomputed Ra table matches the equation at any latitude and day"""
+        rng = np.random.default_rng(0)
+        latitude = rng.uniform(-90, 90, 10000)
+        day = rng.integers(1, 367, 10000)
+        exact = et.extraterrestrial_radiation(latitude, day)
+        self.assertLess(np.max(np.abs(et.RA_TABLE.lookup(latitude, day) - exact)), 0.05)
+        self.assertEqual(et.RA_TABLE.table.shape, (721, 366))
+
+    def test_penman_monteith(self):
+        """Test 18.3: Penman-Monteith matches FAO-56 Example 18 (Brussels, 6 July)"""
+        ra = et.extraterrestrial_radiation(50.8, 187)
+        self.assertAlmostEqual(float(ra), 41.09, places=1)
+        es = (et.saturation_vapour_pressure(21.5) + et.saturation_vapour_pressure(12.3)) / 2
+        humidity = 1.409 / es * 100  # actual vapour pressure of the example
+        eto = et.penman_monteith(12.3, 21.5, ra, humidity, et.wind_speed_2m(2.78, 10), elevation=100,
+                                 solar_radiation=22.07)
+        self.assertAlmostEqual(float(eto), 3.9, places=1)
+
+    def test_hargreaves(self):
+        """Test 18.4: Hargreaves grows with the temperature range and Ra"""
+        eto = et.hargreaves([25.6, 25.6, 20], [34.8, 30, 20], 38.06)
+        self.assertAlmostEqual(float(eto[0]), 5.2, places=1)
+        self.assertGreater(eto[0], eto[1])
+        self.assertEqual(float(eto[2]), 0.0)
+
+    def test_reference_et_methods(self):
+        """Test 18.5: reference_et uses Penman-Monteith where humidity and wind are known"""
+        eto = et.reference_et(20, 32, 28.6, 120, humidity=[60, np.nan, 60], wind_speed=[2, 2, np.nan])
+        ra = et.RA_TABLE.lookup(28.6, 120)
+        self.assertAlmostEqual(float(eto[0]), float(et.penman_monteith(20, 32, ra, 60, 2)), places=6)
+        self.assertAlmostEqual(float(eto[1]), float(et.hargreaves(20, 32, ra)), places=6)
+        self.assertAlmostEqual(float(eto[2]), float(eto[1]), places=6)
+
+    def test_water_requirement_by_season(self):
+        """Test 18.6: With a latitude, crop water use follows the season"""
+        requirements = water_requirement.water_requirements(
+            'Wheat', 28, 60, 400, latitude=28.6, day_of_year=[15, 172], tmin=22, tmax=34
+        )
+        winter, summer = requirements['ETo']
+        self.assertGreater(summer, winter * 1.5)
+        np.testing.assert_allclose(requirements['ETc'], requirements['ETo'] * 1.15)
+
+if __name__ == '__main__':
+    unittest.main()
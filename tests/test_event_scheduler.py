@@ -0,0 +1,109 @@
+"""
+Unit Tests for the event scheduler (event_scheduler.py)
+Tests wake-up precision, queue updates, hydration and retries
+"""
+import unittest
+import sys
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from event_scheduler import ScheduleQueue
+import event_scheduler
+
+class FireRecorder:
+    """fire() stand-in that records when it was called"""
+    def __init__(self, fail_times=0):
+        self.calls = []
+        self.fail_times = fail_times
+        self.called = threading.Event()
+
+    def __call__(self, now):
+        self.calls.append(datetime.utcnow())
+        self.called.set()
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("Database unavailable")
+
+class TestEventScheduler(unittest.TestCase):
+    """Test cases for the schedule queue"""
+
+    def setUp(self):
+        self.queues = []
+
+    def tearDown(self):
+        for queue in self.queues:
+            queue.stop(timeout=1)
+
+    def make_queue(self, fire, load_pending=None):
+        queue = ScheduleQueue(fire, load_pending=load_pending)
+        self.queues.append(queue)
+        return queue
+
+    def test_fires_at_due_time(self):
+        """Test 10.1: A schedule fires within a fraction of a second of its time"""
+        fire = FireRecorder()
+        queue = self.make_queue(fire)
+        queue.start()
+        due = datetime.utcnow() + timedelta(seconds=0.3)
+        queue.add(1, due)
+        self.assertTrue(fire.called.wait(2))
+        lag = (fire.calls[0] - due).total_seconds()
+        self.assertGreaterEqual(lag, 0)
+        self.assertLess(lag, 0.1)
+        self.assertEqual(len(queue), 0)
+        self.assertEqual(queue.stats()['fired_schedules'], 1)
+
+    def test_earlier_schedule_wakes_thread(self):
+        """Test 10.2: Adding an earlier schedule cuts the current wait short"""
+        fire = FireRecorder()
+        queue = self.make_queue(fire)
+        queue.add(1, datetime.utcnow() + timedelta(hours=1))
+        queue.start()
+        time.sleep(0.05)
+        queue.add(2, datetime.utcnow() + timedelta(seconds=0.1))
+        self.assertTrue(fire.called.wait(2))
+        self.assertIn(1, queue)
+        self.assertNotIn(2, queue)
+
+    def test_removed_schedule_does_not_fire(self):
+        """Test 10.3: Cancelled schedules are dropped from the heap"""
+        fire = FireRecorder()
+        queue = self.make_queue(fire)
+        queue.start()
+        queue.add(1, datetime.utcnow() + timedelta(seconds=0.1))
+        queue.remove(1)
+        self.assertFalse(fire.called.wait(0.4))
+        self.assertIsNone(queue.next_due())
+
+    def test_hydrates_pending_and_fires_overdue(self):
+        """Test 10.4: Pending schedules are loaded at start; overdue ones fire at once"""
+        now = datetime.utcnow()
+        fire = FireRecorder()
+        queue = self.make_queue(fire, load_pending=lambda: [(1, now - timedelta(hours=2)),
+                                                            (2, now + timedelta(days=1))])
+        queue.start()
+        self.assertTrue(fire.called.wait(1))
+        self.assertEqual(len(queue), 1)
+        self.assertEqual(queue.next_due(), now + timedelta(days=1))
+
+    def test_failed_fire_is_retried(self):
+        """Test 10.5: Schedules go back on the heap when firing fails"""
+        original_delay = event_scheduler.RETRY_DELAY
+        event_scheduler.RETRY_DELAY = timedelta(seconds=0.1)
+        try:
+            fire = FireRecorder(fail_times=1)
+            queue = self.make_queue(fire)
+            queue.add(1, datetime.utcnow())
+            queue.start()
+            deadline = time.monotonic() + 2
+            while len(fire.calls) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(len(fire.calls), 2)
+        finally:
+            event_scheduler.RETRY_DELAY = original_delay
+
+if __name__ == '__main__':
+    unittest.main()
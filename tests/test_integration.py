@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from app import app, db, User, Prediction, IrrigationSchedule
 import json
 from datetime import datetime, timedelta
+from unittest import mock
 
 class TestIntegration(unittest.TestCase):
     """Integration test cases"""
@@ -163,6 +164,388 @@ class TestIntegration(unittest.TestCase):
         # Access analytics
         response = self.client.get('/analytics')
         self.assertEqual(response.status_code, 200)
+    
+    def test_batch_prediction_workflow(self):
+        """INT-4: Bulk prediction stores one Prediction row per reading"""
+        self.client.post('/register',
+            data=json.dumps({
+                'username': 'batchuser',
+                'email': 'batch@test.com',
+                'password': 'test',
+                'language': 'en',
+                'farm_name': 'Farm',
+                'location': 'City',
+                'farm_size': 5.0
+            }),
+            content_type='application/json'
+        )
+        
+        self.client.post('/login',
+            data=json.dumps({'username': 'batchuser', 'password': 'test'}),
+            content_type='application/json'
+        )
+        
+        response = self.client.post('/api/predict/batch',
+            data=json.dumps({
+                'crop_type': ['Wheat', 'Maize', 'Potato'],
+                'crop_days': [30, 45, 10],
+                'soil_moisture': [200, 500, 800],
+                'temperature': [35, 25, 20],
+                'humidity': [40, 60, 70]
+            }),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(len(data['results']), 3)
+        
+        with app.app_context():
+            ids = [r['prediction_id'] for r in data['results']]
+            stored = Prediction.query.filter(Prediction.id.in_(ids)).all()
+            self.assertEqual(len(stored), 3)
+        
+        for result in data['results']:
+            if result['prediction'] == 1:
+                self.assertIn('water_requirement', result)
+        
+        # Mismatched column lengths are rejected
+        response = self.client.post('/api/predict/batch',
+            data=json.dumps({
+                'crop_type': ['Wheat', 'Maize'],
+                'crop_days': [30],
+                'soil_moisture': [200, 500],
+                'temperature': [35, 25],
+                'humidity': [40, 60]
+            }),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        
+        # Bodies that aren't a JSON object are rejected, not answered with a 500
+        response = self.client.post('/api/predict/batch', data='crop_type=Wheat',
+                                    content_type='application/x-www-form-urlencoded')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/predict/batch', data=json.dumps([1, 2]),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_hot_model_reload(self):
+        """INT-5: Admin reload swaps in a new model version and rejects a broken file"""
+        import shutil
+        import tempfile
+        import app as app_module
+        from model import IrrigationPredictor
+        
+        with app.app_context():
+            if not User.query.filter_by(username='reloadadmin').first():
+                admin = User(username='reloadadmin', email='reload@test.com', farm_name='Farm',
+                             location='City', farm_size=5.0, is_admin=True)
+                admin.set_password('test')
+                db.session.add(admin)
+                db.session.commit()
+        self.client.get('/logout')
+        self.client.post('/login',
+            data=json.dumps({'username': 'reloadadmin', 'password': 'test'}),
+            content_type='application/json'
+        )
+        reading = {'crop_type': 'Wheat', 'crop_days': 30, 'soil_moisture': 350,
+                   'temperature': 28, 'humidity': 65}
+        
+        original_path = app.config['MODEL_PATH']
+        tmp = tempfile.mkdtemp()
+        model_path = os.path.join(tmp, 'irrigation_model.pkl')
+        shutil.copy(original_path, model_path)
+        app.config['MODEL_PATH'] = model_path
+        try:
+            response = self.client.post('/api/admin/model/reload',
+                data=json.dumps({'wait': True}), content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+            first_version = json.loads(response.data)['version']
+            response = self.client.post('/api/predict', data=json.dumps(reading),
+                                        content_type='application/json')
+            first = json.loads(response.data)
+            self.assertEqual(first['model_version'], first_version)
+            
+            # A retrained (here: scaler-folded) model is deployed over the file
+            retrained = IrrigationPredictor()
+            retrained.load_model(model_path)
+            retrained.fold_scaler()
+            retrained.save_model(model_path)
+            response = self.client.post('/api/admin/model/reload',
+                data=json.dumps({'wait': True}), content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+            second_version = json.loads(response.data)['version']
+            self.assertNotEqual(second_version, first_version)
+            response = self.client.post('/api/predict', data=json.dumps(reading),
+                                        content_type='application/json')
+            second = json.loads(response.data)
+            self.assertEqual(second['model_version'], second_version)
+            self.assertEqual(second['probabilities'], first['probabilities'])
+            
+            # A broken file is rejected and the current model keeps serving
+            with open(model_path, 'wb') as f:
+                f.write(b'not a model')
+            response = self.client.post('/api/admin/model/reload',
+                data=json.dumps({'wait': True}), content_type='application/json')
+            self.assertEqual(response.status_code, 500)
+            response = self.client.get('/api/admin/model')
+            status = json.loads(response.data)['model']
+            self.assertEqual(status['version'], second_version)
+            self.assertFalse(status['last_reload']['success'])
+            response = self.client.post('/api/predict', data=json.dumps(reading),
+                                        content_type='application/json')
+            self.assertEqual(json.loads(response.data)['model_version'], second_version)
+        finally:
+            app.config['MODEL_PATH'] = original_path
+            app_module.reload_model()
+            shutil.rmtree(tmp)
+
+    def test_schedule_queue_follows_api(self):
+        """INT-6: Creating and cancelling schedules updates the schedule queue"""
+        from app import schedule_queue
+        self.client.get('/logout')
+        self.client.post('/register',
+            data=json.dumps({
+                'username': 'queueuser',
+                'email': 'queue@test.com',
+                'password': 'test',
+                'language': 'en',
+                'farm_name': 'Farm',
+                'location': 'City',
+                'farm_size': 5.0
+            }),
+            content_type='application/json'
+        )
+        self.client.post('/login',
+            data=json.dumps({'username': 'queueuser', 'password': 'test'}),
+            content_type='application/json'
+        )
+        
+        scheduled_time = datetime.utcnow() + timedelta(days=2)
+        response = self.client.post('/api/schedule/create',
+            data=json.dumps({
+                'water_amount': 25.0,
+                'duration': 30,
+                'scheduled_time': scheduled_time.isoformat()
+            }),
+            content_type='application/json'
+        )
+        schedule_id = json.loads(response.data)['schedule_id']
+        self.assertIn(schedule_id, schedule_queue)
+        self.assertLessEqual(schedule_queue.next_due(), scheduled_time)
+        
+        response = self.client.post(f'/api/schedule/{schedule_id}/cancel')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(schedule_id, schedule_queue)
+
+    def test_prediction_log_write_behind(self):
+        """INT-7: Every prediction is stored, irrigation ones right away with an id"""
+        from app import prediction_writer
+        self.client.get('/logout')
+        self.client.post('/register',
+            data=json.dumps({
+                'username': 'loguser',
+                'email': 'log@test.com',
+                'password': 'test',
+                'language': 'en',
+                'farm_name': 'Farm',
+                'location': 'City',
+                'farm_size': 5.0
+            }),
+            content_type='application/json'
+        )
+        self.client.post('/login',
+            data=json.dumps({'username': 'loguser', 'password': 'test'}),
+            content_type='application/json'
+        )
+        
+        results = []
+        for soil_moisture in (10, 20, 40, 60, 80, 90):
+            response = self.client.post('/api/predict',
+                data=json.dumps({
+                    'crop_type': 'Wheat',
+                    'crop_days': 40,
+                    'soil_moisture': soil_moisture,
+                    'temperature': 28,
+                    'humidity': 60
+                }),
+                content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 200)
+            results.append(json.loads(response.data))
+        
+        for result in results:
+            if result['prediction'] == 1:
+                self.assertIsNotNone(result['prediction_id'])
+        
+        prediction_writer.flush()
+        with app.app_context():
+            user = User.query.filter_by(username='loguser').first()
+            self.assertEqual(Prediction.query.filter_by(user_id=user.id).count(), len(results))
+
+    def test_analytics_chart_cache(self):
+        """INT-8: Analytics charts are served from the cache until a new prediction arrives"""
+        from app import chart_cache, prediction_writer
+        self.client.get('/logout')
+        self.client.post('/register',
+            data=json.dumps({
+                'username': 'chartuser',
+                'email': 'chart@test.com',
+                'password': 'test',
+                'language': 'en',
+                'farm_name': 'Farm',
+                'location': 'City',
+                'farm_size': 5.0
+            }),
+            content_type='application/json'
+        )
+        self.client.post('/login',
+            data=json.dumps({'username': 'chartuser', 'password': 'test'}),
+            content_type='application/json'
+        )
+        
+        def predict():
+            self.client.post('/api/predict',
+                data=json.dumps({
+                    'crop_type': 'Wheat',
+                    'crop_days': 50,
+                    'soil_moisture': 300,
+                    'temperature': 30,
+                    'humidity': 70
+                }),
+                content_type='application/json'
+            )
+            prediction_writer.flush()
+        
+        predict()
+        first = self.client.get('/analytics')
+        hits = chart_cache.stats()['hits']
+        second = self.client.get('/analytics')
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.data, second.data)
+        self.assertGreater(chart_cache.stats()['hits'], hits)
+        
+        predict()
+        misses = chart_cache.stats()['misses']
+        third = self.client.get('/analytics')
+        self.assertEqual(third.status_code, 200)
+        self.assertGreater(chart_cache.stats()['misses'], misses)
+    
+    def test_analytics_chart_api(self):
+        """INT-9: Chart series come from /api/analytics/<chart> with ETags and admin-only system charts"""
+        from app import prediction_writer
+        self.client.get('/logout')
+        self.client.post('/register',
+            data=json.dumps({
+                'username': 'seriesuser',
+                'email': 'series@test.com',
+                'password': 'test',
+                'language': 'en',
+                'farm_name': 'Farm',
+                'location': 'City',
+                'farm_size': 5.0
+            }),
+            content_type='application/json'
+        )
+        self.client.post('/login',
+            data=json.dumps({'username': 'seriesuser', 'password': 'test'}),
+            content_type='application/json'
+        )
+        self.client.post('/api/predict',
+            data=json.dumps({'crop_type': 'Wheat', 'crop_days': 50, 'soil_moisture': 300,
+                             'temperature': 30, 'humidity': 70}),
+            content_type='application/json'
+        )
+        prediction_writer.flush()
+        
+        response = self.client.get('/api/analytics/timeline')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertTrue(data['success'])
+        self.assertIn('days', data['data'])
+        self.assertGreater(sum(data['data']['no_irrigation']) + sum(data['data']['irrigation_needed']), 0)
+        
+        etag = response.headers['ETag']
+        response = self.client.get('/api/analytics/timeline', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        
+        page = self.client.get('/analytics')
+        self.assertEqual(page.status_code, 200)
+        self.assertIn(b'data-chart="timeline"', page.data)
+        self.assertNotIn(b'Plotly.newPlot', page.data)
+        
+        self.assertEqual(self.client.get('/api/analytics/distribution').status_code, 403)
+        self.assertEqual(self.client.get('/api/analytics/unknown').status_code, 404)
+    
+    def test_irrigation_plan(self):
+        """INT-10: A water balance plan returns a calendar per field and can create the schedules"""
+        from app import schedule_queue
+        self.client.get('/logout')
+        self.client.post('/register',
+            data=json.dumps({
+                'username': 'planuser',
+                'email': 'plan@test.com',
+                'password': 'test',
+                'language': 'en',
+                'farm_name': 'Farm',
+                'location': 'City',
+                'farm_size': 5.0
+            }),
+            content_type='application/json'
+        )
+        self.client.post('/login',
+            data=json.dumps({'username': 'planuser', 'password': 'test'}),
+            content_type='application/json'
+        )
+        fields = {'crop_type': ['Wheat', 'Rice'], 'crop_days': [50, 10], 'soil_moisture': [300, 950]}
+        
+        response = self.client.post('/api/schedule/plan',
+            data=json.dumps(dict(fields, days=14, latitude=28.6)),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(len(data['fields']), 2)
+        self.assertGreater(len(data['fields'][0]['irrigation']), 0)
+        self.assertEqual(data['fields'][0]['irrigation'][0]['date'], data['start'])
+        self.assertEqual(data['schedule_ids'], [])
+        
+        requested = datetime.utcnow().replace(microsecond=0)
+        response = self.client.post('/api/schedule/plan',
+            data=json.dumps(dict(fields, days=14, create=True)),
+            content_type='application/json'
+        )
+        data = json.loads(response.data)
+        planned = sum(len(field['irrigation']) for field in data['fields'])
+        self.assertEqual(len(data['schedule_ids']), planned)
+        with app.app_context():
+            schedules = [db.session.get(IrrigationSchedule, schedule_id) for schedule_id in data['schedule_ids']]
+        self.assertEqual([schedule.water_amount for schedule in schedules],
+                         [entry['amount'] for field in data['fields'] for entry in field['irrigation']])
+        # Nothing is scheduled in the past, even when today's 6 AM has gone by
+        self.assertTrue(all(schedule.scheduled_time >= requested for schedule in schedules))
+        for schedule_id in data['schedule_ids']:
+            schedule_queue.remove(schedule_id)
+        
+        for body in [dict(fields, days=0), dict(fields, days='soon'), dict(fields, latitude='north')]:
+            response = self.client.post('/api/schedule/plan', data=json.dumps(body), content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post('/api/schedule/plan', data=json.dumps([fields]),
+                                          content_type='application/json').status_code, 400)
+        self.assertEqual(self.client.post('/api/schedule/plan', data='days=7').status_code, 400)
+        
+        # A wet last forecast day isn't repeated over the rest of the horizon
+        wet = {'forecast': [{'temp_max': 34, 'temp_min': 24, 'rain_mm': 50.0}]}
+        with mock.patch('app.get_weather_data', return_value=wet):
+            response = self.client.post('/api/schedule/plan',
+                data=json.dumps({'crop_type': ['Wheat'], 'crop_days': [60], 'soil_moisture': [500], 'days': 60}),
+                content_type='application/json'
+            )
+        data = json.loads(response.data)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(data['fields'][0]['irrigation']), 0)
+        self.assertGreater(data['fields'][0]['irrigation'][0]['date'], data['start'])
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,92 @@
+"""
+Unit Tests for the decision lookup table (lookup_table.py)
+Tests table building, memory-mapped loading and forest fallback
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from lookup_table import DecisionTable, table_paths
+from model import IrrigationPredictor
+import numpy as np
+
+SMALL_GRID = {
+    'crop_days': (0, 100, 50),
+    'soil_moisture': (0, 1000, 250),
+    'temperature': (20, 30, 5),
+    'humidity': (20, 60, 20),
+}
+
+class TestLookupTable(unittest.TestCase):
+    """Test cases for the lookup table"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Build a small table next to a copy of the model"""
+        cls.tmp = tempfile.mkdtemp()
+        cls.model_path = os.path.join(cls.tmp, 'irrigation_model.pkl')
+        shutil.copy('irrigation_model.pkl', cls.model_path)
+
+        cls.forest = IrrigationPredictor(backend='flat')
+        cls.forest.load_model(cls.model_path)
+        DecisionTable.build(cls.forest, SMALL_GRID).save(cls.model_path)
+
+        cls.predictor = IrrigationPredictor(backend='flat')
+        cls.predictor.load_model(cls.model_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def test_table_loaded_memory_mapped(self):
+        """Test 8.1: load_model picks up the table as a memory map"""
+        table = self.predictor.lookup_table
+        self.assertIsNotNone(table)
+        self.assertIsInstance(table.table, np.memmap)
+        self.assertEqual(table.table.shape, (len(self.forest.label_encoder.classes_), 3, 5, 3, 3))
+
+    def test_on_grid_matches_forest(self):
+        """Test 8.2: On-grid readings give the forest's exact probabilities"""
+        table = self.predictor.lookup_table
+        for reading in [('Wheat', 50, 250, 25, 40), ('Maize', 0, 1000, 20, 60), ('Potato', 100, 500, 30, 20)]:
+            code = self.predictor.crop_codes[reading[0]]
+            self.assertIsNotNone(table.lookup(code, *reading[1:]), f"{reading} should be on the grid")
+            prediction, probability = self.predictor.predict(*reading)
+            expected_prediction, expected_probability = self.forest.predict(*reading)
+            self.assertEqual(prediction, expected_prediction)
+            np.testing.assert_array_equal(probability, expected_probability)
+
+    def test_off_grid_falls_back(self):
+        """Test 8.3: Off-grid readings are answered by the forest"""
+        code = self.predictor.crop_codes['Wheat']
+        self.assertIsNone(self.predictor.lookup_table.lookup(code, 50, 260, 25, 40))
+        self.assertIsNone(self.predictor.lookup_table.lookup(code, 50, 250, 45, 40))
+        prediction, probability = self.predictor.predict('Wheat', 50, 260, 25, 40)
+        expected_prediction, expected_probability = self.forest.predict('Wheat', 50, 260, 25, 40)
+        self.assertEqual(prediction, expected_prediction)
+        np.testing.assert_array_equal(probability, expected_probability)
+
+    def test_batch_mixes_table_and_forest(self):
+        """Test 8.4: Batches combine table hits and forest fallbacks"""
+        columns = (['Wheat', 'Wheat', 'Paddy', 'Coffee'], [50, 51, 100, 0],
+                   [250, 250, 750, 333], [25, 25, 30, 20], [40, 40, 60, 20])
+        predictions, probabilities = self.predictor.predict_batch(*columns)
+        expected_predictions, expected_probabilities = self.forest.predict_batch(*columns)
+        np.testing.assert_array_equal(predictions, expected_predictions)
+        np.testing.assert_array_equal(probabilities, expected_probabilities)
+
+    def test_stale_table_ignored(self):
+        """Test 8.5: A table built for a different model file is not used"""
+        other_path = os.path.join(self.tmp, 'other_model.pkl')
+        shutil.copy(self.model_path, other_path)
+        for src, dst in zip(table_paths(self.model_path), table_paths(other_path)):
+            shutil.copy(src, dst)
+        with open(other_path, 'ab') as f:
+            f.write(b'\0')
+        self.assertIsNone(DecisionTable.load(other_path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Unit Tests for database migrations (migrate_db.py)
+Tests versioning, upgrades of existing databases and rollback
+"""
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+import migrate_db
+from migrate_db import INDEXES, LATEST_VERSION, current_version, migrate_database, upgrade
+
+class TestMigrateDB(unittest.TestCase):
+    """Test cases for migrate_db"""
+
+    def test_model_indexes_match_migration(self):
+        """Test 11.1: The migration creates the same indexes the models declare"""
+        from app import db
+        declared = {
+            index.name: (index.table.name, tuple(column.name for column in index.columns))
+            for table in db.metadata.tables.values() for index in table.indexes
+        }
+        for name, table, columns in INDEXES:
+            self.assertEqual(declared.get(name), (table, columns))
+
+    def test_indexes_added_to_existing_database(self):
+        """Test 11.2: A database created before versioning is upgraded once, keeping its data"""
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'farmers.db')
+            conn = sqlite3.connect(db_path)
+            conn.execute("CREATE TABLE user (id INTEGER PRIMARY KEY, username VARCHAR(80))")
+            conn.execute("CREATE TABLE prediction (id INTEGER PRIMARY KEY, user_id INTEGER, crop_type VARCHAR(50),"
+                         " soil_moisture FLOAT, prediction INTEGER, confidence FLOAT, created_at DATETIME)")
+            conn.execute("CREATE TABLE irrigation_schedule (id INTEGER PRIMARY KEY, user_id INTEGER,"
+                         " status VARCHAR(20), scheduled_time DATETIME)")
+            conn.execute("INSERT INTO user (username) VALUES ('farmer')")
+            conn.commit()
+            conn.close()
+
+            migrate_database(db_path)
+            migrate_database(db_path)
+
+            conn = sqlite3.connect(db_path)
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            plan = conn.execute("EXPLAIN QUERY PLAN SELECT id FROM irrigation_schedule"
+                                " WHERE status = 'pending' AND scheduled_time <= '2025-01-01'").fetchall()
+            users = conn.execute("SELECT username, preferred_language FROM user").fetchall()
+            versions = [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+            conn.close()
+        self.assertEqual(users, [('farmer', 'en')])
+        self.assertEqual(versions, list(range(1, LATEST_VERSION + 1)))
+        self.assertTrue({name for name, _, _ in INDEXES} <= indexes)
+        self.assertIn('ix_irrigation_schedule_status_scheduled_time', plan[0][3])
+
+    def test_failed_migration_rolls_back(self):
+        """Test 11.3: A failing migration leaves neither its DDL nor its version behind"""
+        def broken(conn):
+            conn.execute(text('ALTER TABLE "user" ADD COLUMN half_done INTEGER'))
+            raise RuntimeError("Migration bug")
+        
+        original = list(migrate_db.MIGRATIONS)
+        migrate_db.MIGRATIONS.append(migrate_db.Migration(LATEST_VERSION + 1, 'Broken', broken))
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                engine = create_engine(f"sqlite:///{os.path.join(tmp, 'farmers.db')}")
+                with engine.begin() as conn:
+                    conn.execute(text('CREATE TABLE "user" (id INTEGER PRIMARY KEY, username VARCHAR(80))'))
+                with self.assertRaises(RuntimeError):
+                    upgrade(engine, target=LATEST_VERSION + 1)
+                with engine.connect() as conn:
+                    columns = [row[1] for row in conn.execute(text('PRAGMA table_info("user")'))]
+                self.assertEqual(current_version(engine), LATEST_VERSION)
+                engine.dispose()
+        finally:
+            migrate_db.MIGRATIONS[:] = original
+        self.assertNotIn('half_done', columns)
+    
+    def test_rollups_backfilled_on_upgrade(self):
+        """Test 11.5: Upgrading builds the rollup table from existing predictions"""
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'farmers.db')
+            conn = sqlite3.connect(db_path)
+            conn.execute("CREATE TABLE user (id INTEGER PRIMARY KEY, username VARCHAR(80))")
+            conn.execute("CREATE TABLE prediction (id INTEGER PRIMARY KEY, user_id INTEGER, crop_type VARCHAR(50),"
+                         " soil_moisture FLOAT, prediction INTEGER, confidence FLOAT, created_at DATETIME)")
+            conn.executemany(
+                "INSERT INTO prediction (user_id, crop_type, soil_moisture, prediction, confidence, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(1, 'Wheat', 230.0, 1, 0.75, '2025-06-01 08:00:00.000000'),
+                 (1, 'Wheat', 210.0, 1, 0.25, '2025-06-01 18:30:00.000000'),
+                 (1, None, None, 0, 0.5, '2025-06-02 09:00:00.000000')]
+            )
+            conn.commit()
+            conn.close()
+
+            migrate_database(db_path)
+
+            conn = sqlite3.connect(db_path)
+            daily = conn.execute("SELECT user_id, day, crop_type, prediction, count, confidence_sum"
+                                 " FROM prediction_rollup ORDER BY day").fetchall()
+            moisture = conn.execute("SELECT user_id, prediction, moisture_bucket, count"
+                                    " FROM moisture_rollup ORDER BY moisture_bucket").fetchall()
+            conn.close()
+        self.assertEqual(daily, [(1, '2025-06-01', 'Wheat', 1, 2, 1.0),
+                                 (1, '2025-06-02', 'Unknown', 0, 1, 0.5)])
+        self.assertEqual(moisture, [(1, 0, -1, 1), (1, 1, 4, 2)])
+
+    def test_app_database_is_current(self):
+        """Test 11.4: The app's database is at the latest schema version"""
+        from app import app, db
+        with app.app_context():
+            self.assertEqual(current_version(db.engine), LATEST_VERSION)
+
+    def test_concurrent_startup_on_new_database(self):
+        """Test 11.6: Workers starting together on a new database create and stamp it once"""
+        import threading
+        import types
+        from app import db
+        errors = []
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'farmers.db')}"
+            barrier = threading.Barrier(6)
+
+            def start_worker():
+                engine = create_engine(url)
+                worker_db = types.SimpleNamespace(engine=engine, metadata=db.metadata)
+                barrier.wait()
+                try:
+                    migrate_db.ensure_schema(worker_db)
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    engine.dispose()
+
+            workers = [threading.Thread(target=start_worker) for _ in range(6)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            engine = create_engine(url)
+            with engine.connect() as conn:
+                versions = conn.execute(text("SELECT version FROM schema_version ORDER BY version")).scalars().all()
+            engine.dispose()
+        self.assertEqual(errors, [])
+        self.assertEqual(versions, list(range(1, LATEST_VERSION + 1)))
+
+if __name__ == '__main__':
+    unittest.main()
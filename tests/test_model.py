@@ -85,6 +85,42 @@ class TestMLModule(unittest.TestCase):
         """Test 1.9: Verify feature names are stored"""
         self.assertIsNotNone(self.predictor.feature_names, "Feature names should exist")
         self.assertGreater(len(self.predictor.feature_names), 0, "Should have features")
+    
+    def test_predict_batch_matches_predict(self):
+        """Test 1.10: Batch prediction matches row-by-row prediction"""
+        crop_types = ['Wheat', 'Maize', 'Potato', 'Sugarcane']
+        crop_days = [30, 45, 10, 120]
+        soil_moisture = [200, 500, 350, 800]
+        temperature = [35, 25, 20, 28]
+        humidity = [40, 60, 30, 70]
+        
+        predictions, probabilities = self.predictor.predict_batch(
+            crop_types, crop_days, soil_moisture, temperature, humidity
+        )
+        
+        self.assertEqual(predictions.shape, (4,), "Should have one prediction per row")
+        self.assertEqual(probabilities.shape, (4, 2), "Should have 2 probabilities per row")
+        for i in range(4):
+            prediction, probability = self.predictor.predict(
+                crop_types[i], crop_days[i], soil_moisture[i], temperature[i], humidity[i]
+            )
+            self.assertEqual(predictions[i], prediction, "Batch label should match single prediction")
+            np.testing.assert_array_equal(probabilities[i], probability)
+    
+    def test_predict_batch_length_mismatch(self):
+        """Test 1.11: Batch prediction rejects columns of different lengths"""
+        with self.assertRaises(ValueError):
+            self.predictor.predict_batch(['Wheat', 'Maize'], [30], [200, 300], [25, 25], [40, 40])
+    
+    def test_single_pass_label_matches_model_predict(self):
+        """Test 1.12: Label from predict_proba argmax matches model.predict"""
+        readings = [('Wheat', 30, 200, 35, 40), ('Maize', 60, 700, 22, 65),
+                    ('Paddy', 90, 450, 30, 80), ('Coffee', 5, 150, 18, 20)]
+        for reading in readings:
+            prediction, _ = self.predictor.predict(*reading)
+            features = self.predictor._build_features(*[[value] for value in reading])
+            expected = self.predictor.model.predict(self.predictor.scaler.transform(features))[0]
+            self.assertEqual(prediction, expected, f"Label mismatch for {reading}")
 
 if __name__ == '__main__':
     unittest.main()
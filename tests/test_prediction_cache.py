@@ -0,0 +1,124 @@
+"""
+Unit Tests for the prediction cache (prediction_cache.py)
+Tests quantized keys, LRU eviction, expiry and predictor integration
+"""
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from prediction_cache import PredictionCache, quantize_value
+from model import IrrigationPredictor
+import numpy as np
+
+class FakeClock:
+    """Manually advanced clock for TTL tests"""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestPredictionCache(unittest.TestCase):
+    """Test cases for the prediction cache"""
+
+    def test_quantize_value(self):
+        """Test 7.1: Values round to the nearest step"""
+        self.assertEqual(quantize_value(25.4, 1.0), 25.0)
+        self.assertEqual(quantize_value(25.5, 1.0), 26.0)
+        self.assertEqual(quantize_value(412, 10), 410)
+        self.assertEqual(quantize_value(25.4, None), 25.4)
+
+    def test_key_quantization(self):
+        """Test 7.2: Nearby readings share a key"""
+        cache = PredictionCache(quantization={'crop_days': 1, 'soil_moisture': 10, 'temperature': 1, 'humidity': 1})
+        key_a = cache.make_key('Wheat', 30, 401, 25.2, 60.4)
+        key_b = cache.make_key('Wheat', 30.3, 404, 24.8, 59.6)
+        self.assertEqual(key_a, key_b)
+        self.assertEqual(key_a, ('Wheat', 30.0, 400, 25.0, 60.0))
+        self.assertNotEqual(key_a, cache.make_key('Maize', 30, 401, 25.2, 60.4))
+
+    def test_hit_miss_counters(self):
+        """Test 7.3: Lookups are counted as hits and misses"""
+        cache = PredictionCache()
+        key = cache.make_key('Wheat', 30, 400, 25, 60)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, 'value')
+        self.assertEqual(cache.get(key), 'value')
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_lru_eviction(self):
+        """Test 7.4: The least recently used entry is evicted first"""
+        cache = PredictionCache(max_size=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl_expiry(self):
+        """Test 7.5: Entries expire after the TTL"""
+        clock = FakeClock()
+        cache = PredictionCache(ttl=60, clock=clock)
+        cache.put('a', 1)
+        clock.now = 59
+        self.assertEqual(cache.get('a'), 1)
+        clock.now = 60
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['expirations'], 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_predictor_uses_cache(self):
+        """Test 7.6: Repeated readings are answered from the cache"""
+        predictor = IrrigationPredictor(backend='flat')
+        cache = PredictionCache()
+        predictor.enable_cache(cache)
+        predictor.load_model('irrigation_model.pkl')
+
+        first = predictor.predict('Wheat', 30, 350, 28, 65)
+        second = predictor.predict('Wheat', 30, 350, 28, 65)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(first[0], second[0])
+        np.testing.assert_array_equal(first[1], second[1])
+
+        uncached = IrrigationPredictor(backend='flat')
+        uncached.load_model('irrigation_model.pkl')
+        expected = uncached.predict('Wheat', 30, 350, 28, 65)
+        self.assertEqual(first[0], expected[0])
+        np.testing.assert_array_equal(first[1], expected[1])
+
+    def test_cache_keeps_exact_predictions(self):
+        """Test 7.8: Off-grid readings get the model's own answer, cached or not"""
+        self.assertEqual(PredictionCache().make_key('Wheat', 30, 350, 25.4, 65.6), ('Wheat', 30.0, 350.0, 25.4, 65.6))
+        uncached = IrrigationPredictor(backend='flat')
+        uncached.load_model('irrigation_model.pkl')
+        for quantization in (None, {'temperature': 1, 'humidity': 1}):
+            predictor = IrrigationPredictor(backend='flat')
+            predictor.enable_cache(PredictionCache(quantization=quantization))
+            predictor.load_model('irrigation_model.pkl')
+            for reading in (('Wheat', 30, 350, 25.4, 65.6), ('Wheat', 31.5, 612.3, 18.7, 40.2)):
+                prediction, probability = predictor.predict(*reading)
+                expected = uncached.predict(*reading)
+                self.assertEqual(prediction, expected[0])
+                np.testing.assert_array_equal(probability, expected[1])
+
+    def test_load_model_invalidates_cache(self):
+        """Test 7.7: Loading a model file clears cached predictions"""
+        predictor = IrrigationPredictor(backend='flat')
+        cache = PredictionCache()
+        predictor.enable_cache(cache)
+        predictor.load_model('irrigation_model.pkl')
+        predictor.predict('Wheat', 30, 350, 28, 65)
+        self.assertEqual(len(cache), 1)
+
+        predictor.load_model('irrigation_model.pkl')
+        self.assertEqual(len(cache), 0)
+
+if __name__ == '__main__':
+    unittest.main()
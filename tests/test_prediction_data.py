@@ -0,0 +1,141 @@
+"""
+Unit Tests for the prediction data access layer (prediction_data.py)
+Tests columnar prediction frames, user totals and the queries behind the
+analytics chart API and the admin page
+"""
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+from unittest import mock
+from sqlalchemy import delete, event
+from analytics import READING_COLUMNS, SYSTEM_CHARTS, USER_CHARTS, top_users_series
+import app as app_module
+from app import app, db, User, Prediction, ROLLUP_TABLES, _insert_predictions
+from prediction_data import PREDICTION_COLUMNS, prediction_frame, user_totals
+from datetime import datetime, timedelta
+
+NOW = datetime(2025, 6, 1, 12, 0, 0)
+
+class QueryCounter:
+    """Counts the SQL statements run on the app's engine inside a with block"""
+    def __enter__(self):
+        self.count = 0
+        with app.app_context():
+            self.engine = db.engine
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+class TestPredictionData(unittest.TestCase):
+    """Test cases for prediction frames"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        app.config['TESTING'] = True
+        with app.app_context():
+            db.create_all()
+            cls.user_ids = []
+            for n in range(3):
+                user = User(username=f'frameuser{n}', email=f'frame{n}@test.com', preferred_language='en',
+                            is_admin=n == 0)
+                user.set_password('test')
+                db.session.add(user)
+                db.session.commit()
+                cls.user_ids.append(user.id)
+        # Through the app's insert path, so the rollups are maintained
+        _insert_predictions([dict(
+            user_id=cls.user_ids[i % 3],
+            crop_type=['Wheat', 'Rice', None][i % 3 if i % 7 else 2],
+            crop_days=30.0 + i % 40,
+            soil_moisture=None if i % 50 == 0 else 100.0 + (i * 37) % 800,
+            temperature=20.0 + (i % 21) * 0.7,
+            humidity=40.0 + (i % 31) * 1.3,
+            prediction=i % 2,
+            confidence=0.5 + (i % 10) * 0.05,
+            created_at=NOW - timedelta(days=i % 30, hours=i % 7)
+        ) for i in range(600)])
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after tests"""
+        with app.app_context():
+            Prediction.query.filter(Prediction.user_id.in_(cls.user_ids)).delete()
+            for table in ROLLUP_TABLES:
+                db.session.execute(delete(table).where(table.c.user_id.in_(cls.user_ids)))
+            User.query.filter(User.id.in_(cls.user_ids)).delete()
+            db.session.commit()
+
+    def test_prediction_frame_columns(self):
+        """Test 17.1: A prediction frame has one typed column per field and the joined username"""
+        with app.app_context():
+            frame = prediction_frame(user_id=self.user_ids[0])
+            self.assertEqual(list(frame.columns), list(PREDICTION_COLUMNS))
+            self.assertEqual(len(frame), 200)
+            self.assertEqual(set(frame['username']), {'frameuser0'})
+            self.assertEqual(str(frame['created_at'].dtype)[:10], 'datetime64')
+            self.assertEqual(frame['temperature'].dtype.kind, 'f')
+
+    def test_prediction_frame_limit(self):
+        """Test 17.2: limit returns the latest predictions with only the requested columns"""
+        with app.app_context():
+            frame = prediction_frame(user_id=self.user_ids[1], limit=100, columns=READING_COLUMNS)
+            latest = (Prediction.query.filter_by(user_id=self.user_ids[1])
+                      .order_by(Prediction.created_at.desc()).limit(100).all())
+            self.assertEqual(list(frame.columns), list(READING_COLUMNS))
+            self.assertEqual(sorted(frame['confidence']), sorted(p.confidence for p in latest))
+
+    def login(self):
+        client = app.test_client()
+        client.post('/login', data=json.dumps({'username': 'frameuser0', 'password': 'test'}),
+                    content_type='application/json')
+        return client
+
+    def test_chart_api_one_query_per_chart(self):
+        """Test 17.3: /api/analytics/<chart> builds every chart from a single query"""
+        client = self.login()
+        with mock.patch.object(app_module, 'chart_cache', None):
+            # Loading the logged-in user and the data fingerprint, without any chart
+            with QueryCounter() as baseline:
+                self.assertEqual(client.get('/api/analytics/unknown').status_code, 404)
+            for chart in USER_CHARTS + SYSTEM_CHARTS:
+                with QueryCounter() as queries:
+                    response = client.get(f'/api/analytics/{chart}')
+                self.assertEqual(response.status_code, 200)
+                self.assertIsNotNone(json.loads(response.data)['data'], chart)
+                # The fingerprint takes one query per user chart and two system-wide
+                fingerprint = 2 if chart in SYSTEM_CHARTS else 1
+                self.assertEqual(queries.count, baseline.count + fingerprint + 1, chart)
+
+    def test_top_users_joined(self):
+        """Test 17.4: Top users come with their usernames from one grouped query on the rollup"""
+        with app.app_context():
+            with QueryCounter() as queries:
+                totals = user_totals(limit=10)
+            self.assertEqual(queries.count, 1)
+            counts = dict(zip(totals['username'], totals['count']))
+            self.assertEqual([counts.get(f'frameuser{n}') for n in range(3)], [200, 200, 200])
+            self.assertEqual(list(totals['count']), sorted(totals['count'], reverse=True))
+        data = json.loads(self.login().get('/api/analytics/top_users').data)['data']
+        self.assertEqual(data, top_users_series(totals))
+
+    def test_admin_page_queries(self):
+        """Test 17.5: The admin page reads its prediction table with usernames in one joined query"""
+        client = self.login()
+        with QueryCounter() as queries:
+            response = client.get('/admin')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'frameuser1', response.data)
+        # The logged-in user, user_rows, admin_stats and the joined prediction rows
+        self.assertEqual(queries.count, 4)
+
+if __name__ == '__main__':
+    unittest.main()
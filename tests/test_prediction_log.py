@@ -0,0 +1,128 @@
+"""
+Unit Tests for the write-behind prediction log (prediction_log.py)
+Tests batching, backpressure, retries and draining
+"""
+import unittest
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from prediction_log import PredictionWriter
+
+class InsertRecorder:
+    """insert_rows() stand-in that records batches"""
+    def __init__(self, fail_times=0, block=None):
+        self.batches = []
+        self.fail_times = fail_times
+        self.block = block
+
+    def __call__(self, rows):
+        if self.block is not None:
+            self.block.wait()
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("database is locked")
+        self.batches.append(list(rows))
+
+    @property
+    def rows(self):
+        return [row for batch in self.batches for row in batch]
+
+class TestPredictionLog(unittest.TestCase):
+    """Test cases for PredictionWriter"""
+
+    def setUp(self):
+        self.writers = []
+
+    def tearDown(self):
+        for writer in self.writers:
+            writer.drain(timeout=1)
+
+    def make_writer(self, insert_rows, **kwargs):
+        writer = PredictionWriter(insert_rows, **kwargs)
+        self.writers.append(writer)
+        return writer
+
+    def test_batches_by_row_count(self):
+        """Test 13.1: Rows are written in batches of flush_rows"""
+        recorder = InsertRecorder()
+        writer = self.make_writer(recorder, flush_rows=10, flush_interval=60)
+        for i in range(30):
+            self.assertTrue(writer.submit({'id': i}))
+        writer.flush()
+        self.assertEqual([len(batch) for batch in recorder.batches], [10, 10, 10])
+        self.assertEqual([row['id'] for row in recorder.rows], list(range(30)))
+
+    def test_flushes_after_interval(self):
+        """Test 13.2: A partial batch is written after flush_interval"""
+        recorder = InsertRecorder()
+        writer = self.make_writer(recorder, flush_rows=100, flush_interval=0.05)
+        writer.submit({'id': 1})
+        writer.submit({'id': 2})
+        deadline = time.monotonic() + 2
+        while not recorder.batches and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(recorder.batches, [[{'id': 1}, {'id': 2}]])
+        self.assertEqual(writer.stats()['written'], 2)
+
+    def test_full_queue_rejects(self):
+        """Test 13.3: submit() returns False when the queue stays full"""
+        block = threading.Event()
+        recorder = InsertRecorder(block=block)
+        writer = self.make_writer(recorder, flush_rows=1, flush_interval=60, max_queue=2, put_timeout=0.01)
+        results = [writer.submit({'id': i}) for i in range(6)]
+        self.assertIn(False, results)
+        self.assertGreater(writer.stats()['rejected'], 0)
+        block.set()
+        writer.flush()
+        self.assertEqual(len(recorder.rows), results.count(True))
+
+    def test_failed_batch_is_retried(self):
+        """Test 13.4: A batch that fails to write is retried"""
+        recorder = InsertRecorder(fail_times=2)
+        writer = self.make_writer(recorder, flush_rows=3, flush_interval=60)
+        for i in range(3):
+            writer.submit({'id': i})
+        writer.flush()
+        self.assertEqual(len(recorder.rows), 3)
+        self.assertEqual(writer.stats()['dropped'], 0)
+
+    def test_drain_writes_queued_rows(self):
+        """Test 13.5: drain() writes everything queued and stops accepting rows"""
+        recorder = InsertRecorder()
+        writer = self.make_writer(recorder, flush_rows=1000, flush_interval=60)
+        for i in range(25):
+            writer.submit({'id': i})
+        writer.drain(timeout=2)
+        self.assertEqual(len(recorder.rows), 25)
+        self.assertFalse(writer.submit({'id': 25}))
+
+    def test_drain_with_full_queue(self):
+        """Test 13.6: drain() returns and writes the queued rows itself when the queue stays full"""
+        release = threading.Event()
+        written = []
+        def insert_rows(rows):
+            # The first batch hangs in the writer thread until released
+            if not written:
+                written.append(None)
+                release.wait(5)
+            written.extend(row['id'] for row in rows)
+        writer = self.make_writer(insert_rows, flush_rows=1, flush_interval=60, max_queue=2)
+        writer.submit({'id': 0})
+        while writer.stats()['queued']:
+            time.sleep(0.001)
+        writer.submit({'id': 1})
+        writer.submit({'id': 2})
+        started = time.monotonic()
+        writer.drain(timeout=0.2)
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(written[1:], [1, 2])
+        release.set()
+        writer._thread.join(2)
+        self.assertEqual(sorted(written[1:]), [0, 1, 2])
+        self.assertFalse(writer._thread.is_alive())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Unit Tests for the prediction rollups (rollups.py)
+Tests aggregation, incremental upserts, the SQL backfill and analytics on rollups
+"""
+import unittest
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from analytics import CHART_SOURCES, EMPTY_STATS, USER_CHARTS, chart_series, stats_from_rollup
+from app import app, db, User, Prediction, ROLLUP_TABLES, _insert_predictions
+import rollups
+from datetime import datetime, timedelta
+
+NOW = datetime(2025, 6, 1, 12, 0, 0)
+
+def make_rows(user_id, n):
+    return [{
+        'user_id': user_id,
+        'crop_type': ['Wheat', 'Rice', None][i % 3],
+        'crop_days': 30.0,
+        'soil_moisture': None if i == 7 else 120.0 + i * 37,
+        'temperature': 28.0,
+        'humidity': 60.0,
+        'prediction': i % 2,
+        'confidence': 0.5 + (i % 10) * 0.05,
+        'created_at': NOW - timedelta(days=i % 9, hours=i % 5)
+    } for i in range(n)]
+
+def sorted_rows(rollup):
+    # Confidence sums may be added up in a different order
+    daily = rollup.daily.assign(confidence_sum=rollup.daily['confidence_sum'].round(9))
+    return (sorted(tuple(row) for row in daily.itertuples(index=False)),
+            sorted(tuple(row) for row in rollup.moisture.itertuples(index=False)))
+
+class TestRollups(unittest.TestCase):
+    """Test cases for prediction rollups"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        app.config['TESTING'] = True
+        with app.app_context():
+            db.create_all()
+            user = User(username='rollupuser', email='rollup@test.com', preferred_language='en')
+            user.set_password('test')
+            stats_user = User(username='rollupstats', email='rollupstats@test.com', preferred_language='en')
+            stats_user.set_password('test')
+            db.session.add_all([user, stats_user])
+            db.session.commit()
+            cls.user_id = user.id
+            cls.stats_user_id = stats_user.id
+        _insert_predictions(make_rows(cls.stats_user_id, 40))
+
+    def test_aggregate_groups_by_key(self):
+        """Test 15.1: Rows are grouped by day, crop and prediction, and by moisture bucket"""
+        rows = [
+            {'user_id': 1, 'crop_type': 'Wheat', 'soil_moisture': 210.0, 'prediction': 1,
+             'confidence': 0.75, 'created_at': NOW},
+            {'user_id': 1, 'crop_type': 'Wheat', 'soil_moisture': 240.0, 'prediction': 1,
+             'confidence': 0.25, 'created_at': NOW + timedelta(hours=1)},
+            {'user_id': 1, 'crop_type': None, 'soil_moisture': None, 'prediction': 0,
+             'confidence': 0.5, 'created_at': NOW},
+        ]
+        daily, moisture = rollups.aggregate(rows)
+        self.assertEqual(sorted(tuple(row.values()) for row in daily), [
+            (1, NOW.date(), 'Unknown', 0, 1, 0.5),
+            (1, NOW.date(), 'Wheat', 1, 2, 1.0),
+        ])
+        self.assertEqual(sorted(tuple(row.values()) for row in moisture), [
+            (1, 0, rollups.NO_MOISTURE_BUCKET, 1),
+            (1, 1, 4, 2),
+        ])
+
+    def test_saved_predictions_update_rollups(self):
+        """Test 15.2: Saving predictions adds to the rollups in the same transaction"""
+        rows = make_rows(self.user_id, 40)
+        _insert_predictions(rows[:25])
+        _insert_predictions(rows[25:])
+        with app.app_context():
+            rollup = rollups.read(db.session, ROLLUP_TABLES, user_id=self.user_id)
+        self.assertEqual(sorted_rows(rollup), sorted_rows(rollups.from_predictions(rows)))
+        self.assertEqual(int(rollup.daily['count'].sum()), 40)
+        self.assertEqual(int(rollup.moisture['count'].sum()), 40)
+
+    def test_backfill_matches_incremental(self):
+        """Test 15.3: The SQL backfill builds the same rollups as incremental updates"""
+        rows = make_rows(1, 200)
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'rollups.db')}")
+            db.metadata.create_all(engine, tables=[User.__table__, Prediction.__table__, *ROLLUP_TABLES])
+            with engine.begin() as conn:
+                conn.execute(insert(User.__table__).values(username='u', email='u@test.com', password_hash='x'))
+                conn.execute(insert(Prediction.__table__), rows)
+                rollups.rebuild(conn, engine.dialect.name)
+            with Session(engine) as session:
+                backfilled = rollups.read(session, ROLLUP_TABLES)
+                rollups.add_predictions(session, ROLLUP_TABLES, rows[:10])
+                session.commit()
+                updated = rollups.read(session, ROLLUP_TABLES)
+            engine.dispose()
+        self.assertEqual(sorted_rows(backfilled), sorted_rows(rollups.from_predictions(rows)))
+        self.assertEqual(int(updated.daily['count'].sum()), 210)
+        self.assertEqual(int(updated.moisture['count'].sum()), 210)
+
+    def test_stats_from_rollup(self):
+        """Test 15.4: Summary numbers from rollups match counting the predictions"""
+        with app.app_context():
+            predictions = Prediction.query.filter_by(user_id=self.stats_user_id).all()
+            rollup = rollups.read(db.session, ROLLUP_TABLES, user_id=self.stats_user_id)
+        stats = stats_from_rollup(rollup)
+        crops = [p.crop_type or rollups.UNKNOWN_CROP for p in predictions]
+        self.assertEqual(stats['total'], len(predictions))
+        self.assertEqual(stats['irrigation_needed'], sum(p.prediction for p in predictions))
+        self.assertEqual(stats['avg_confidence'], round(sum(p.confidence for p in predictions) / len(predictions) * 100, 1))
+        self.assertEqual(crops.count(stats['most_common_crop']), max(crops.count(crop) for crop in set(crops)))
+        self.assertEqual(stats_from_rollup(rollups.from_predictions([])), EMPTY_STATS)
+
+    def test_charts_from_rollup(self):
+        """Test 15.5: Chart series come from rollups plus a few recent readings"""
+        rows = make_rows(1, 60)
+        rollup = rollups.from_predictions(rows)
+        recent = [Prediction(**row) for row in rows[:5]]
+        sources = {'daily': rollup.daily, 'moisture': rollup.moisture, 'readings': recent}
+        series = {chart: chart_series(chart, sources[CHART_SOURCES[chart]]) for chart in USER_CHARTS}
+        self.assertEqual(sum(series['timeline']['no_irrigation']) + sum(series['timeline']['irrigation_needed']), 60)
+        self.assertEqual(sum(series['scatter']['count']), 5)
+        empty = rollups.from_predictions([])
+        self.assertIsNone(chart_series('timeline', empty.daily))
+        self.assertIsNone(chart_series('moisture', empty.moisture))
+        self.assertIsNone(chart_series('scatter', []))
+
+    def test_import_does_not_load_pandas(self):
+        """Test 15.6: Importing rollups (as app.py does) leaves pandas unloaded until a rollup is read"""
+        import subprocess
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        result = subprocess.run([sys.executable, '-c', "import sys, rollups; print('pandas' in sys.modules)"],
+                                cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), 'False')
+
+if __name__ == '__main__':
+    unittest.main()
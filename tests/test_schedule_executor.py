@@ -0,0 +1,100 @@
+"""
+Unit Tests for the concurrent schedule executor (schedule_executor.py)
+Tests the concurrency limit, per-farm exclusion, failures and timeouts
+"""
+import unittest
+import sys
+import os
+import threading
+import time
+from types import SimpleNamespace
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from schedule_executor import ScheduleExecutor, farm_lock, percentile
+
+def make_schedules(n_farms, per_farm, first_user_id=1000):
+    """Fake schedule rows, farm by farm"""
+    return [SimpleNamespace(id=farm * 100 + i, user_id=first_user_id + farm)
+            for farm in range(n_farms) for i in range(per_farm)]
+
+class ConcurrencyProbe:
+    """execute() stand-in that records how many calls overlap, overall and per farm"""
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = 0
+        self.running_by_farm = {}
+        self.max_running = 0
+        self.max_running_per_farm = 0
+
+    def __call__(self, schedule):
+        with self.lock:
+            self.running += 1
+            farm = self.running_by_farm.get(schedule.user_id, 0) + 1
+            self.running_by_farm[schedule.user_id] = farm
+            self.max_running = max(self.max_running, self.running)
+            self.max_running_per_farm = max(self.max_running_per_farm, farm)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+            self.running_by_farm[schedule.user_id] -= 1
+
+class TestScheduleExecutor(unittest.TestCase):
+    """Test cases for the schedule executor"""
+
+    def test_all_schedules_complete(self):
+        """Test 9.1: Every schedule runs once and stats are reported"""
+        schedules = make_schedules(5, 3)
+        executed = []
+        outcomes, stats = ScheduleExecutor(lambda s: executed.append(s.id), max_workers=4).run(schedules)
+        self.assertEqual(sorted(executed), sorted(s.id for s in schedules))
+        self.assertTrue(all(error is None for error in outcomes.values()))
+        self.assertEqual(stats['completed'], 15)
+        self.assertEqual(stats['failed'], 0)
+        self.assertEqual(stats['farms'], 5)
+        self.assertGreater(stats['throughput_per_s'], 0)
+
+    def test_concurrency_limit_and_farm_exclusion(self):
+        """Test 9.2: Farms run in parallel up to the limit, one schedule per farm at a time"""
+        probe = ConcurrencyProbe()
+        ScheduleExecutor(probe, max_workers=4).run(make_schedules(8, 3))
+        self.assertGreater(probe.max_running, 1, "Different farms should run concurrently")
+        self.assertLessEqual(probe.max_running, 4)
+        self.assertEqual(probe.max_running_per_farm, 1)
+
+    def test_errors_mark_only_that_schedule_failed(self):
+        """Test 9.3: An exception fails its schedule and the rest still run"""
+        def execute(schedule):
+            if schedule.id == 101:
+                raise RuntimeError("Valve not responding")
+        outcomes, stats = ScheduleExecutor(execute, max_workers=2).run(make_schedules(2, 3))
+        self.assertEqual(outcomes[101], "Valve not responding")
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['completed'], 5)
+
+    def test_timeout_fails_schedule_and_skips_farm(self):
+        """Test 9.4: A hung call times out and the farm's later schedules are skipped"""
+        release = threading.Event()
+        def execute(schedule):
+            if schedule.id == 0:
+                release.wait(5)
+        schedules = make_schedules(2, 2, first_user_id=2000)
+        try:
+            outcomes, stats = ScheduleExecutor(execute, max_workers=2, timeout=0.2, poll_interval=0.01).run(schedules)
+            self.assertIn("Timed out", outcomes[0])
+            self.assertIn("Skipped", outcomes[1])
+            self.assertIsNone(outcomes[100])
+            self.assertIsNone(outcomes[101])
+            # The hung call still owns its farm
+            self.assertTrue(farm_lock(2000).locked())
+        finally:
+            release.set()
+
+    def test_percentile(self):
+        """Test 9.5: Nearest-rank percentiles"""
+        self.assertEqual(percentile([], 0.5), 0.0)
+        self.assertEqual(percentile([3, 1, 2], 0.5), 2)
+        self.assertEqual(percentile(list(range(100)), 0.95), 95)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -89,5 +89,86 @@ class TestSchedulerModule(unittest.TestCase):
             result = check_soil_moisture_threshold(400, crop)
             self.assertIsInstance(result, bool, f"Should return bool for {crop}")
 
+    def test_bulk_matches_per_schedule(self):
+        """Test 3.9: Bulk processing makes the same decisions as process_schedule"""
+        from unittest import mock
+        from datetime import datetime, timedelta
+        from app import app, db, User, Prediction, IrrigationSchedule
+        from scheduler import process_schedule, process_due_schedules
+        
+        def rain_in_rainy_town(location, hours=24):
+            return (True, 80.0) if location == 'Rainy Town' else (False, 0.0)
+        
+        with app.app_context():
+            db.create_all()
+            users = []
+            for location in ['Rainy Town', 'Dry Town']:
+                username = f'bulk_{location.replace(" ", "_").lower()}'
+                user = User.query.filter_by(username=username).first()
+                if user is None:
+                    user = User(username=username, email=f'{username}@test.com', location=location)
+                    user.set_password('test')
+                    db.session.add(user)
+                users.append(user)
+            db.session.commit()
+            
+            due_time = datetime.utcnow() - timedelta(minutes=5)
+            pairs = []
+            for user in users:
+                for moisture in [None, 200, 800]:
+                    ids = []
+                    for _ in range(2):
+                        prediction = None
+                        if moisture is not None:
+                            prediction = Prediction(user_id=user.id, crop_type='Wheat', crop_days=30,
+                                                    soil_moisture=moisture, temperature=28, humidity=60,
+                                                    prediction=1, confidence=0.9)
+                            db.session.add(prediction)
+                            db.session.flush()
+                        schedule = IrrigationSchedule(user_id=user.id, scheduled_time=due_time,
+                                                      prediction_id=prediction.id if prediction else None,
+                                                      water_amount=20.0, duration=30)
+                        db.session.add(schedule)
+                        db.session.flush()
+                        ids.append(schedule.id)
+                    pairs.append(ids)
+            db.session.commit()
+        
+        with mock.patch('scheduler.check_rain_forecast', side_effect=rain_in_rainy_town):
+            for per_row_id, _ in pairs:
+                process_schedule(per_row_id)
+            counts = process_due_schedules()
+        
+        self.assertGreaterEqual(counts['cancelled'], 3)
+        self.assertGreaterEqual(counts['postponed'], 1)
+        self.assertGreaterEqual(counts['completed'], 2)
+        with app.app_context():
+            for per_row_id, bulk_id in pairs:
+                per_row = db.session.get(IrrigationSchedule, per_row_id)
+                bulk = db.session.get(IrrigationSchedule, bulk_id)
+                self.assertEqual(bulk.status, per_row.status)
+                self.assertEqual(bulk.cancellation_reason, per_row.cancellation_reason)
+                self.assertEqual(bulk.notification_sent, per_row.notification_sent)
+                self.assertEqual(bulk.executed_at is None, per_row.executed_at is None)
+                if bulk.status == 'postponed':
+                    self.assertGreater(bulk.scheduled_time, datetime.utcnow() + timedelta(hours=11))
+    
+    def test_plan_thresholds_match_check(self):
+        """Test 3.10: plan_schedules postpones exactly when the threshold check finds moisture adequate"""
+        from collections import namedtuple
+        from scheduler import plan_schedules
+        
+        Row = namedtuple('Row', ['id', 'location', 'soil_moisture', 'crop_type'])
+        crops = ['Wheat', 'Rice', 'Cotton', 'Sugarcane', 'Maize', 'Soybean', 'UnknownCrop', None]
+        due = [Row(i, None, moisture, crop)
+               for i, (crop, moisture) in enumerate((crop, moisture) for crop in crops
+                                                    for moisture in (None, 0, 349.9, 370, 400, 600, 1000))]
+        plan = plan_schedules(due, {'New Delhi': (False, 0.0)})
+        
+        expected = [row.id for row in due
+                    if row.soil_moisture is not None and not check_soil_moisture_threshold(row.soil_moisture, row.crop_type)]
+        self.assertEqual(plan['postpone'], expected)
+        self.assertEqual(len(plan['execute']), len(due) - len(expected))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,79 @@
+"""
+Unit Tests for the SQL stats service (stats_service.py)
+Tests that the grouped queries match one COUNT query per number
+"""
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app, db, User, Prediction
+from stats_service import admin_stats, recent_prediction_rows, user_rows
+from datetime import datetime, timedelta
+
+class TestStatsService(unittest.TestCase):
+    """Test cases for the stats service"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            db.create_all()
+
+            test_user = User(username='statstest', email='stats@test.com', preferred_language='en')
+            test_user.set_password('test')
+            empty_user = User(username='statsempty', email='statsempty@test.com', preferred_language='en')
+            empty_user.set_password('test')
+            db.session.add_all([test_user, empty_user])
+            db.session.commit()
+
+            now = datetime.utcnow()
+            for i in range(30):
+                db.session.add(Prediction(
+                    user_id=test_user.id,
+                    crop_type=['Wheat', 'Rice', 'Wheat', 'Maize'][i % 4],
+                    crop_days=30 + i,
+                    soil_moisture=400 - i * 10,
+                    temperature=28,
+                    humidity=65,
+                    prediction=1 if i % 3 == 0 else 0,
+                    confidence=0.6 + i * 0.01,
+                    created_at=now - timedelta(days=i)
+                ))
+            db.session.commit()
+
+            cls.test_user_id = test_user.id
+            cls.empty_user_id = empty_user.id
+
+    def test_admin_stats_match_counts(self):
+        """Test 14.1: admin_stats matches one COUNT query per number"""
+        with app.app_context():
+            stats = admin_stats()
+            self.assertEqual(stats, {
+                'total_users': User.query.count(),
+                'total_predictions': Prediction.query.count(),
+                'predictions_today': Prediction.query.filter(
+                    Prediction.created_at >= datetime.utcnow().date()
+                ).count(),
+                'irrigation_needed': Prediction.query.filter_by(prediction=1).count(),
+                'no_irrigation': Prediction.query.filter_by(prediction=0).count()
+            })
+
+    def test_admin_rows(self):
+        """Test 14.2: Admin tables get plain rows with the columns they show"""
+        with app.app_context():
+            users = user_rows()
+            self.assertEqual(len(users), User.query.count())
+            self.assertIn('statstest', [user.username for user in users])
+            self.assertFalse(isinstance(users[0], User))
+
+            predictions = recent_prediction_rows(limit=5)
+            self.assertLessEqual(len(predictions), 5)
+            self.assertTrue(all(pred.username for pred in predictions))
+            times = [pred.created_at for pred in predictions]
+            self.assertEqual(times, sorted(times, reverse=True))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+"""
+Unit Tests for the flat-array inference engine (tree_engine.py)
+Checks parity with scikit-learn's RandomForestClassifier
+"""
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from model import IrrigationPredictor
+from tree_engine import FlatForest
+import numpy as np
+
+def random_features(predictor, n_rows, seed=0):
+    """Random readings over the sensor ranges, as an unscaled feature matrix"""
+    rng = np.random.default_rng(seed)
+    crops = predictor.label_encoder.classes_
+    return predictor._build_features(
+        rng.choice(crops, n_rows),
+        rng.integers(0, 220, n_rows),
+        rng.integers(0, 1001, n_rows),
+        rng.integers(0, 50, n_rows),
+        rng.integers(0, 101, n_rows)
+    )
+
+class TestTreeEngine(unittest.TestCase):
+    """Test cases for the flat tree engine"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load the trained model and export it"""
+        cls.predictor = IrrigationPredictor()
+        cls.predictor.load_model('irrigation_model.pkl')
+        cls.engine = FlatForest.from_sklearn(cls.predictor.model, cls.predictor.scaler)
+
+    def sklearn_proba(self, features):
+        return self.predictor.model.predict_proba(self.predictor.scaler.transform(features))
+
+    def test_export_shapes(self):
+        """Test 6.1: Exported arrays cover every node of every tree"""
+        n_nodes = sum(e.tree_.node_count for e in self.predictor.model.estimators_)
+        self.assertEqual(len(self.engine.feature), n_nodes)
+        self.assertEqual(len(self.engine.threshold), n_nodes)
+        self.assertEqual(len(self.engine.children), 2 * n_nodes)
+        self.assertEqual(self.engine.value.shape, (n_nodes, 2))
+        self.assertEqual(self.engine.n_trees, len(self.predictor.model.estimators_))
+
+    def test_single_row_parity(self):
+        """Test 6.2: Single-row probabilities are identical to sklearn"""
+        features = random_features(self.predictor, 200, seed=1)
+        for row in features:
+            row = row[None, :]
+            np.testing.assert_array_equal(self.engine.predict_proba(row), self.sklearn_proba(row))
+
+    def test_batch_parity(self):
+        """Test 6.3: Batch probabilities are identical to sklearn"""
+        features = random_features(self.predictor, 5000, seed=2)
+        np.testing.assert_array_equal(self.engine.predict_proba(features), self.sklearn_proba(features))
+        np.testing.assert_array_equal(self.engine.predict_proba(features[:3]), self.sklearn_proba(features[:3]))
+
+    def test_leaves_match_sklearn_apply(self):
+        """Test 6.4: Leaf indices match sklearn's apply() per tree"""
+        features = random_features(self.predictor, 50, seed=3)
+        expected = self.predictor.model.apply(self.predictor.scaler.transform(features))
+        leaves = self.engine.apply(features) - self.engine.roots
+        np.testing.assert_array_equal(leaves, expected)
+
+    def test_flat_backend_predictions(self):
+        """Test 6.5: The 'flat' predictor backend gives the same results"""
+        flat = IrrigationPredictor(backend='flat')
+        flat.load_model('irrigation_model.pkl')
+        for reading in [('Wheat', 30, 200, 35, 40), ('Maize', 60, 700, 22, 65), ('Coffee', 5, 150, 18, 20)]:
+            prediction, probability = flat.predict(*reading)
+            expected_prediction, expected_probability = self.predictor.predict(*reading)
+            self.assertEqual(prediction, expected_prediction)
+            np.testing.assert_array_equal(probability, expected_probability)
+
+    def test_raw_thresholds_match_scaled_test(self):
+        """Test 6.6: Raw-space thresholds take the same branch as the scaled test"""
+        from tree_engine import raw_thresholds
+        offset, scale, threshold = 16.43179128, 11.2345, -0.47868362069129944
+        bound = raw_thresholds(np.array([threshold]), np.array([offset]), np.array([scale]))[0]
+        candidates = np.concatenate([
+            np.nextafter(bound, -np.inf) - np.arange(5) * 1e-12, [bound],
+            np.nextafter(bound, np.inf) + np.arange(5) * 1e-12
+        ])
+        expected = ((candidates - offset) / scale).astype(np.float32) <= threshold
+        np.testing.assert_array_equal(candidates <= bound, expected)
+
+    def test_folded_scaler_parity(self):
+        """Test 6.7: Folding the scaler into the thresholds keeps predictions identical"""
+        folded = IrrigationPredictor()
+        folded.load_model('irrigation_model.pkl')
+        folded.fold_scaler()
+        self.assertTrue(folded.scaler_folded)
+
+        features = random_features(self.predictor, 20000, seed=4)
+        np.testing.assert_array_equal(folded._predict_proba(features), self.sklearn_proba(features))
+        for row in features[:100]:
+            np.testing.assert_array_equal(folded._predict_proba(row[None, :]), self.sklearn_proba(row[None, :]))
+
+    def test_folded_model_round_trip(self):
+        """Test 6.8: A folded model saved to disk loads with load_model"""
+        import tempfile
+        folded = IrrigationPredictor()
+        folded.load_model('irrigation_model.pkl')
+        folded.fold_scaler()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'folded.pkl')
+            folded.save_model(path)
+            loaded = IrrigationPredictor()
+            loaded.load_model(path)
+        self.assertTrue(loaded.scaler_folded)
+        prediction, probability = loaded.predict('Wheat', 30, 350, 28, 65)
+        expected_prediction, expected_probability = self.predictor.predict('Wheat', 30, 350, 28, 65)
+        self.assertEqual(prediction, expected_prediction)
+        np.testing.assert_array_equal(probability, expected_probability)
+
+    def test_invalid_backend(self):
+        """Test 6.9: Unknown backend names are rejected"""
+        with self.assertRaises(ValueError):
+            IrrigationPredictor(backend='gpu')
+
+    def test_saved_engine_memory_mapped(self):
+        """Test 6.10: Engine arrays saved with the model load memory-mapped and match"""
+        import tempfile
+        flat = IrrigationPredictor(backend='flat')
+        flat.load_model('irrigation_model.pkl')
+        features = random_features(self.predictor, 2000, seed=3)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'flat.pkl')
+            flat.save_model(path)
+            loaded = IrrigationPredictor(backend='flat')
+            loaded.load_model(path, mmap_mode='r')
+            for name in FlatForest.ARRAYS:
+                self.assertIsInstance(getattr(loaded.engine, name), np.memmap, name)
+            np.testing.assert_array_equal(loaded._predict_proba(features), self.sklearn_proba(features))
+            np.testing.assert_array_equal(loaded._predict_proba(features[:1]), self.sklearn_proba(features[:1]))
+            # The sklearn backend ignores the stored engine
+            plain = IrrigationPredictor()
+            plain.load_model(path, mmap_mode='r')
+            self.assertIsNone(plain.engine)
+            del loaded, plain
+
+    def test_folded_model_rejects_scaling(self):
+        """Test 6.11: A folded model file has no scaler, so the scale-then-predict path fails"""
+        import tempfile
+        import joblib
+        folded = IrrigationPredictor()
+        folded.load_model('irrigation_model.pkl')
+        folded.fold_scaler()
+        self.assertIsNone(folded.scaler)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'folded.pkl')
+            folded.save_model(path)
+            model_data = joblib.load(path)
+        self.assertIsNone(model_data['scaler'])
+        features = random_features(self.predictor, 10, seed=5)
+        # How the original loader (and the notebook) predicts from a model file
+        with self.assertRaises(AttributeError):
+            model_data['model'].predict(model_data['scaler'].transform(features))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Unit Tests for the soil water balance simulator (water_balance.py)
+Tests daily depletion, automatic irrigation, rain, crop ageing and calendars
+"""
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import date
+import numpy as np
+import water_balance
+from water_requirement import AVAILABLE_WATER, MAD, REFILL_FRACTION
+
+ALLOWED = MAD * AVAILABLE_WATER
+REFILLED = (1 - REFILL_FRACTION) * AVAILABLE_WATER
+
+class TestWaterBalance(unittest.TestCase):
+    """Test cases for the soil water balance"""
+
+    def test_depletion_follows_etc_and_rain(self):
+        """Test 19.1: Depletion grows with ETc, falls with effective rain and stops at field capacity"""
+        balance = water_balance.simulate([20.0], [5, 5, 5, 5], rain=[0, 10, 100, 0], auto_irrigate=False)
+        rain_in = water_balance.EFFECTIVE_RAIN_FRACTION * 10
+        np.testing.assert_allclose(balance.depletion[0], [25, 30 - rain_in, 0, 5])
+        self.assertAlmostEqual(balance.deep_percolation[0, 2], 80 - (30 - rain_in) - 5)
+        self.assertFalse(balance.irrigation.any())
+
+    def test_automatic_irrigation(self):
+        """Test 19.2: Fields are irrigated on the day they would pass MAD, back to the refill point"""
+        balance = water_balance.simulate([60.0], np.full(10, 6.0))
+        first = int(np.argmax(balance.irrigation[0] > 0))
+        self.assertEqual(first, 2)  # 66, 72, then 78 > 75
+        self.assertAlmostEqual(balance.depletion[0, first], REFILLED)
+        self.assertAlmostEqual(balance.irrigation[0, first], 78 - REFILLED)
+        self.assertLessEqual(balance.depletion.max(), ALLOWED)
+        self.assertFalse(balance.stress.any())
+
+        dry = water_balance.simulate([60.0], np.full(10, 6.0), auto_irrigate=False)
+        self.assertTrue(dry.stress[0, 2:].all())
+
+    def test_vectorized_matches_single_fields(self):
+        """Test 19.3: Many fields at once give the same results as one field at a time"""
+        rng = np.random.default_rng(0)
+        depletion = rng.uniform(0, 100, 50)
+        etc = rng.uniform(2, 9, (50, 30))
+        rain = rng.gamma(0.3, 10, (50, 30))
+        taw = rng.uniform(100, 200, 50)
+        together = water_balance.simulate(depletion, etc, rain=rain, taw=taw)
+        for field in range(50):
+            alone = water_balance.simulate(depletion[field], etc[field], rain=rain[field], taw=taw[field])
+            np.testing.assert_allclose(together.depletion[field], alone.depletion[0])
+            np.testing.assert_allclose(together.irrigation[field], alone.irrigation[0])
+
+    def test_crop_etc_ages_crops(self):
+        """Test 19.4: Kc follows each field's growth stage as the days pass"""
+        etc = water_balance.crop_etc(['Wheat', 'UnknownCrop'], [28, 88], np.ones(4))
+        np.testing.assert_allclose(etc[0], [0.3, 0.3, 1.15, 1.15])
+        np.testing.assert_allclose(etc[1], [1.0, 1.0, 0.6, 0.6])
+
+    def test_irrigation_calendar(self):
+        """Test 19.5: The calendar lists the irrigation days and amounts of each field"""
+        balance = water_balance.plan_fields(['Wheat', 'Rice'], [60, 60], [100, 1000], np.full(5, 6.0),
+                                            rain=[0, 0, 0, 40, 0])
+        calendar = water_balance.irrigation_calendar(balance, date(2025, 6, 1))
+        self.assertEqual(len(calendar), 2)
+        self.assertEqual(calendar[0][0][0], date(2025, 6, 1))
+        self.assertAlmostEqual(sum(amount for _, amount in calendar[0]), balance.irrigation[0].sum(), places=1)
+        self.assertEqual(calendar[1], [])
+
+if __name__ == '__main__':
+    unittest.main()
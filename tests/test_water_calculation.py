@@ -8,6 +8,8 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app import calculate_water_requirement
+import numpy as np
+import water_requirement
 
 class TestWaterCalculation(unittest.TestCase):
     """Test cases for Water Calculation"""
@@ -77,6 +79,53 @@ class TestWaterCalculation(unittest.TestCase):
         for crop in crops:
             result = calculate_water_requirement(crop, 28, 30, 400)
             self.assertGreater(result['irrigation_amount'], 0, f"{crop} should have positive irrigation amount")
+    
+    def test_vectorized_matches_scalar(self):
+        """Test 4.9: Vectorized requirements match the scalar calculation for every crop and stage"""
+        crops = ['Wheat', 'Rice', 'Cotton', 'Sugarcane', 'Maize', 'Soybean', 'UnknownCrop']
+        readings = [(crop, temperature, days, moisture)
+                    for crop in crops for temperature in (15, 28.5, 41)
+                    for days in (0, 29.9, 30, 89.9, 90, 160) for moisture in (0, 333, 850, 1000)]
+        requirements = water_requirement.water_requirements(*zip(*readings))
+        
+        self.assertEqual(requirements.dtype, water_requirement.REQUIREMENT_DTYPE)
+        self.assertEqual(water_requirement.to_dicts(requirements),
+                         [calculate_water_requirement(*reading) for reading in readings])
+    
+    def test_vectorized_lookup_arrays(self):
+        """Test 4.10: Kc comes from the lookup array by crop and growth stage, with a default crop"""
+        requirements = water_requirement.water_requirements(
+            np.array(['Rice', 'Rice', 'Rice', None], dtype=object), 30.0, np.array([10, 45, 120, 45]), 400.0
+        )
+        self.assertEqual(requirements['growth_stage'].tolist(), [0, 1, 2, 1])
+        self.assertEqual(requirements['Kc'].tolist(), [1.05, 1.2, 0.9, 1.0])
+        self.assertEqual(len(water_requirement.water_requirements([], [], [], [])), 0)
+    
+    def test_fao56_weather(self):
+        """Test 4.11: With a latitude, ETo follows FAO-56 and Penman-Monteith needs wind"""
+        default = calculate_water_requirement('Wheat', 28, 60, 400)
+        hargreaves = calculate_water_requirement('Wheat', 28, 60, 400, latitude=28.6, day_of_year=172,
+                                                 tmin=22, tmax=34, humidity=65)
+        penman = calculate_water_requirement('Wheat', 28, 60, 400, latitude=28.6, day_of_year=172,
+                                             tmin=22, tmax=34, humidity=65, wind_speed=2)
+        
+        self.assertNotEqual(hargreaves['ETo'], default['ETo'])
+        self.assertNotEqual(penman['ETo'], hargreaves['ETo'])
+        self.assertAlmostEqual(penman['ETc'], round(penman['ETo'] * penman['Kc'], 2), places=1)
+        self.assertEqual(penman['irrigation_amount'], default['irrigation_amount'])
+    
+    def test_crop_index_without_pandas(self):
+        """Test 4.12: Crop rows come from a dict lookup, so importing the app leaves pandas unloaded"""
+        crops = np.array([['Rice', 'UnknownCrop'], [None, 'Soybean']], dtype=object)
+        self.assertEqual(water_requirement.crop_index(crops).tolist(),
+                         [[1, water_requirement.DEFAULT_CROP_INDEX], [water_requirement.DEFAULT_CROP_INDEX, 5]])
+        self.assertEqual(water_requirement.crop_index([]).shape, (0,))
+        
+        import subprocess
+        result = subprocess.run([sys.executable, '-c', "import sys, app; print('pandas' in sys.modules)"],
+                                cwd=os.path.abspath(os.path.join(os.path.dirname(__file__), '..')),
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], 'False')
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,204 @@
+"""
+Unit Tests for the weather provider (weather.py)
+Tests the TTL cache, single-flight fetching, stale fallback, the file and
+OpenWeatherMap backends and the scheduler's rain check
+"""
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+import weather
+from weather import FileBackend, OpenWeatherBackend, WeatherProvider
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class CountingBackend:
+    """Mock weather, counting fetches; fetches wait for release when given an event"""
+
+    name = 'counting'
+
+    def __init__(self, release=None):
+        self.calls = 0
+        self.release = release
+        self.fail = False
+
+    def fetch(self, location):
+        self.calls += 1
+        if self.release is not None:
+            self.release.wait(5)
+        if self.fail:
+            raise ConnectionError("service down")
+        return dict(weather.MockBackend().fetch(location), location=location)
+
+class FakeOpenWeather(BaseHTTPRequestHandler):
+    """OpenWeatherMap lookalike answering over keep-alive connections"""
+
+    protocol_version = 'HTTP/1.1'
+    connections = set()
+    requests = 0
+
+    def do_GET(self):
+        type(self).connections.add(self.client_address)
+        type(self).requests += 1
+        if self.path.startswith('/weather'):
+            body = {'main': {'temp': 30.0, 'humidity': 50, 'pressure': 1008},
+                    'weather': [{'description': 'clear sky', 'icon': '01d'}], 'wind': {'speed': 5}}
+        else:
+            day = 86400 * 20000  # a midnight UTC
+            body = {'city': {'timezone': 0}, 'list': [
+                {'dt': day + 9 * 3600, 'main': {'temp_min': 20, 'temp_max': 25, 'humidity': 60},
+                 'weather': [{'description': 'light rain'}], 'pop': 0.8, 'rain': {'3h': 2.5}},
+                {'dt': day + 12 * 3600, 'main': {'temp_min': 24, 'temp_max': 31, 'humidity': 40},
+                 'weather': [{'description': 'scattered clouds'}], 'pop': 0.2},
+                {'dt': day + 86400 + 12 * 3600, 'main': {'temp_min': 22, 'temp_max': 33, 'humidity': 30},
+                 'weather': [{'description': 'clear sky'}]},
+            ]}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+class TestWeatherProvider(unittest.TestCase):
+    """Test cases for the weather provider"""
+
+    def test_ttl_cache_per_location(self):
+        """Test 20.1: A location is fetched once per TTL; case and spaces share the entry"""
+        clock = FakeClock()
+        backend = CountingBackend()
+        provider = WeatherProvider(backend, ttl=600, clock=clock)
+        first = provider.get('Pune')
+        self.assertIs(provider.get(' pune '), first)
+        provider.get('Nagpur')
+        self.assertEqual(backend.calls, 2)
+        clock.now = 601
+        provider.get('Pune')
+        self.assertEqual(backend.calls, 3)
+        stats = provider.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['fetches'], stats['locations']), (1, 3, 3, 2))
+
+    def test_single_flight(self):
+        """Test 20.2: Concurrent misses for one location make a single backend call"""
+        release = threading.Event()
+        backend = CountingBackend(release)
+        provider = WeatherProvider(backend)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(provider.get('Pune'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        while provider.stats()['coalesced'] < 7:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_stale_fallback_and_errors(self):
+        """Test 20.3: A failing backend serves the last weather until stale_ttl, then raises"""
+        clock = FakeClock()
+        backend = CountingBackend()
+        provider = WeatherProvider(backend, ttl=10, stale_ttl=100, clock=clock)
+        cached = provider.get('Pune')
+        backend.fail = True
+        clock.now = 50
+        self.assertIs(provider.get('Pune'), cached)
+        clock.now = 150
+        with self.assertRaises(ConnectionError):
+            provider.get('Pune')
+        with self.assertRaises(ConnectionError):
+            provider.get('Nagpur')
+        self.assertEqual(provider.stats()['stale'], 1)
+
+    def test_file_backend(self):
+        """Test 20.4: The file backend reads locations from JSON, falling back to "default" """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'weather.json')
+            rainy = dict(weather.MOCK_WEATHER, forecast=[dict(weather.MOCK_WEATHER['forecast'][0], rain_probability=90)])
+            with open(path, 'w') as f:
+                json.dump({'Rainy Town': rainy, 'default': weather.MOCK_WEATHER}, f)
+            backend = FileBackend(path)
+            self.assertEqual(backend.fetch('rainy town')['forecast'][0]['rain_probability'], 90)
+            self.assertEqual(backend.fetch('Elsewhere'), weather.MOCK_WEATHER)
+            provider = WeatherProvider(backend)
+            self.assertEqual(provider.rain_forecast('Rainy Town'), (True, 90.0))
+            self.assertEqual(provider.rain_forecast('Elsewhere'), (False, 10.0))
+            self.assertEqual(provider.rain_forecast('Elsewhere', hours=96), (True, 70.0))
+
+    def test_openweather_backend_pools_connections(self):
+        """Test 20.5: OpenWeatherMap responses fold into daily forecasts over one pooled connection"""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), FakeOpenWeather)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            backend = OpenWeatherBackend('key', base_url=f'http://127.0.0.1:{server.server_port}', pool_size=2)
+            for _ in range(3):
+                result = backend.fetch('Pune')
+            backend.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(FakeOpenWeather.requests, 6)
+        self.assertEqual(len(FakeOpenWeather.connections), 1)
+        self.assertEqual(result['current']['wind_speed'], 18.0)
+        self.assertEqual(result['current']['description'], 'Clear sky')
+        today, tomorrow = result['forecast']
+        self.assertEqual((today['day'], today['temp_min'], today['temp_max']), ('Today', 20, 31))
+        self.assertEqual((today['rain_probability'], today['rain_mm'], today['humidity']), (80, 2.5, 50))
+        self.assertEqual(today['description'], 'Scattered clouds')
+        self.assertEqual((tomorrow['day'], tomorrow['rain_probability'], tomorrow['rain_mm']), ('Tomorrow', 0, 0))
+
+    def test_scheduler_uses_shared_forecast(self):
+        """Test 20.6: The scheduler's rain check and the pages read the same cached forecast"""
+        import app
+        import scheduler
+        backend = CountingBackend()
+        provider = WeatherProvider(backend)
+        with mock.patch.object(app, 'weather_provider', provider), \
+                mock.patch.object(scheduler, 'weather_provider', provider):
+            self.assertEqual(app.get_weather_data('Pune')['location'], 'Pune')
+            self.assertEqual(scheduler.check_rain_forecast('Pune'), (False, 10.0))
+            backend.fail = True
+            self.assertIsNone(app.get_weather_data('Nagpur'))
+            self.assertEqual(scheduler.check_rain_forecast('Nagpur'), (False, 0.0))
+        self.assertEqual(backend.calls, 3)
+
+    def test_cache_bounded(self):
+        """Test 20.7: The cache keeps at most max_locations, dropping expired then least recently used entries"""
+        clock = FakeClock()
+        backend = CountingBackend()
+        provider = WeatherProvider(backend, ttl=10, stale_ttl=100, max_locations=2, clock=clock)
+        provider.get('Pune')
+        provider.get('Nagpur')
+        provider.get('Pune')
+        provider.get('Mumbai')
+        self.assertEqual(set(provider._entries), {'pune', 'mumbai'})
+        clock.now = 100
+        provider.get('Delhi')
+        self.assertEqual(set(provider._entries), {'delhi'})
+        self.assertEqual(provider.stats()['evictions'], 3)
+        for i in range(50):
+            provider.get(f'Town {i}')
+        self.assertEqual(provider.stats()['locations'], 2)
+        with self.assertRaises(ValueError):
+            WeatherProvider(backend, max_locations=0)
+
+if __name__ == '__main__':
+    unittest.main()
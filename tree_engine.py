@@ -0,0 +1,229 @@
+"""
+Flat-array tree ensemble engine - low-latency inference for the RandomForest
+Exports a fitted forest into contiguous numpy arrays and evaluates all trees
+at once by walking the nodes level by level with vectorized numpy ops
+"""
+import numpy as np
+
+# Up to this many rows, computing every node's split decision up front is
+# cheaper than gathering per level (the /api/predict case is a single row)
+DENSE_MAX_ROWS = 4
+
+class FlatForest:
+    """
+    A RandomForestClassifier flattened into node arrays.
+    All trees share one node index space; ``roots`` holds the first node of
+    each tree. Leaves point to themselves so that walking past the leaf
+    level is a no-op, which lets every tree advance in lockstep.
+    """
+
+    # Array attributes persisted by to_dict(); saved with joblib they can be
+    # memory-mapped and shared read-only between processes
+    ARRAYS = ('feature', 'threshold', 'children', 'left', 'right', 'value', 'roots')
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, classes,
+                 offset=None, scale=None, float32_inputs=True, left=None, right=None):
+        self.feature = feature          # (n_nodes,) int64, split feature
+        self.threshold = threshold      # (n_nodes,) float64, go left if x <= threshold
+        self.children = children        # (2 * n_nodes,) int64, [left, right] per node
+        self.value = value              # (n_nodes, n_classes) float64, leaf probabilities
+        self.roots = roots              # (n_trees,) int64
+        self.max_depth = int(max_depth)
+        self.classes = classes
+        # Contiguous copies of the children for the dense path
+        self.left = np.ascontiguousarray(children[0::2]) if left is None else left
+        self.right = np.ascontiguousarray(children[1::2]) if right is None else right
+        # Optional affine input transform, (X - offset) / scale, i.e. a StandardScaler
+        self.offset = offset
+        self.scale = scale
+        # sklearn casts inputs to float32 before comparing; thresholds moved
+        # to raw space by raw_thresholds are exact for float64 comparisons
+        self.float32_inputs = float32_inputs
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, forest, scaler=None, float32_inputs=True):
+        """Export a fitted RandomForestClassifier (and optionally its StandardScaler)"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        n_classes = len(forest.classes_)
+        start = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+
+            feature = tree.feature.astype(np.int64)
+            feature[is_leaf] = 0
+            threshold = tree.threshold.astype(np.float64)
+            threshold[is_leaf] = 0.0
+            left = np.where(is_leaf, node_ids, tree.children_left) + start
+            right = np.where(is_leaf, node_ids, tree.children_right) + start
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left)
+            rights.append(right)
+            # Same numbers DecisionTreeClassifier.predict_proba returns for a leaf
+            values.append(tree.value[:, 0, :n_classes].astype(np.float64))
+            roots.append(start)
+
+            start += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        children = np.empty(2 * start, dtype=np.int64)
+        children[0::2] = np.concatenate(lefts)
+        children[1::2] = np.concatenate(rights)
+
+        offset = scale = None
+        if scaler is not None:
+            offset, scale = scaler_affine(scaler)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            children=children,
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.int64),
+            max_depth=max_depth,
+            classes=forest.classes_,
+            offset=offset,
+            scale=scale,
+            float32_inputs=float32_inputs,
+        )
+
+    def to_dict(self):
+        """Plain dict of arrays and settings, for saving inside the model file"""
+        state = {name: getattr(self, name) for name in self.ARRAYS}
+        state.update(
+            max_depth=self.max_depth,
+            classes=self.classes,
+            offset=self.offset,
+            scale=self.scale,
+            float32_inputs=self.float32_inputs,
+        )
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild from to_dict() output without copying the arrays"""
+        return cls(**state)
+
+    def apply(self, X):
+        """Return the leaf reached in every tree, shape (n_samples, n_trees)"""
+        X = np.asarray(X, dtype=np.float64)
+        if self.offset is not None:
+            X = (X - self.offset) / self.scale
+        if self.float32_inputs:
+            # sklearn trees compare float32 inputs against float64 thresholds
+            X = np.ascontiguousarray(X, dtype=np.float32)
+        else:
+            X = np.ascontiguousarray(X)
+
+        if X.shape[0] <= DENSE_MAX_ROWS:
+            return self._apply_dense(X)
+        return self._apply_walk(X)
+
+    def _apply_dense(self, X):
+        """
+        Small batches: evaluate the split of every node once, then follow
+        the resulting next-node pointers, which is one gather per level
+        """
+        n_samples = X.shape[0]
+        n_nodes = len(self.feature)
+        go_right = np.take(X, self.feature, axis=1) > self.threshold
+        next_node = np.where(go_right, self.right, self.left)
+
+        row_offsets = (np.arange(n_samples, dtype=np.int64) * n_nodes)[:, None]
+        if n_samples > 1:
+            next_node += row_offsets
+        next_node = next_node.ravel()
+
+        nodes = (row_offsets + self.roots).ravel()
+        for _ in range(self.max_depth):
+            nodes = next_node[nodes]
+
+        return nodes.reshape(n_samples, -1) - row_offsets
+
+    def _apply_walk(self, X):
+        """Large batches: advance all (row, tree) pairs one level at a time"""
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_samples, dtype=np.int64) * n_features)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_samples, self.n_trees))
+
+        for _ in range(self.max_depth):
+            go_right = flat_X[row_offsets + self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_right]
+
+        return nodes
+
+    def predict_proba(self, X):
+        """Mean of the per-tree leaf probabilities, matching RandomForestClassifier"""
+        leaves = self.apply(X)
+        # Summing over the tree axis accumulates tree by tree, like sklearn does
+        proba = self.value[leaves].sum(axis=1)
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        """Class labels from the argmax of predict_proba"""
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def scaler_affine(scaler):
+    """(offset, scale) such that scaler.transform(X) == (X - offset) / scale"""
+    n_features = scaler.n_features_in_
+    offset = scaler.mean_ if scaler.with_mean else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.with_std else np.ones(n_features)
+    return np.ascontiguousarray(offset, dtype=np.float64), np.ascontiguousarray(scale, dtype=np.float64)
+
+def raw_thresholds(threshold, offset, scale):
+    """
+    Move split thresholds from scaled to raw feature space.
+
+    A tree fed scaled inputs goes left when
+    float32((x - offset) / scale) <= threshold. That test is monotone in x,
+    so for each split there is a largest float64 value T that passes it, and
+    ``x <= T`` takes the same branch as the original test for every float64
+    x. T is found by bisection, evaluating the original comparison exactly
+    as StandardScaler.transform and the tree would.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    offset = np.asarray(offset, dtype=np.float64)
+    scale = np.asarray(scale, dtype=np.float64)
+
+    def goes_left(x):
+        return ((x - offset) / scale).astype(np.float32) <= threshold
+
+    # Bracket the boundary around the algebraic inverse: goes_left(lo) and not goes_left(hi)
+    estimate = threshold * scale + offset
+    width = 1e-6 * np.maximum.reduce([np.abs(estimate), np.abs(offset), np.abs(threshold) * scale, scale])
+    lo = estimate - width
+    hi = estimate + width
+    for _ in range(64):
+        lo_fails = ~goes_left(lo)
+        hi_fails = goes_left(hi)
+        if not (lo_fails.any() or hi_fails.any()):
+            break
+        width = np.where(lo_fails | hi_fails, width * 2, width)
+        lo = np.where(lo_fails, estimate - width, lo)
+        hi = np.where(hi_fails, estimate + width, hi)
+    else:
+        raise ValueError("Could not bracket the raw-space thresholds")
+
+    # Bisect until lo and hi are adjacent doubles; lo is then the answer
+    while True:
+        above_lo = np.nextafter(lo, np.inf)
+        open_gap = above_lo < hi
+        if not open_gap.any():
+            return lo
+        mid = np.clip(lo + (hi - lo) / 2, above_lo, np.nextafter(hi, -np.inf))
+        left = goes_left(mid)
+        lo = np.where(open_gap & left, mid, lo)
+        hi = np.where(open_gap & ~left, mid, hi)
@@ -0,0 +1,109 @@
+"""
+Soil water balance - day-by-day root zone depletion and irrigation calendars
+calculate_water_requirement() decides once, from today's reading. This
+module projects the root zone depletion (FAO-56 chapter 8) forward over a
+horizon of days:
+
+    Dr[d] = Dr[d-1] - effective rain[d] - irrigation[d] + ETc[d]
+
+clipped to [0, TAW]; water beyond field capacity is lost to deep
+percolation. With automatic irrigation a field is watered on the day its
+depletion would otherwise pass the allowed depletion (MAD * TAW), as late
+as possible so forecast rain is used first, and the application refills it
+to REFILL_FRACTION of TAW as water_requirement does. Arrays are
+(fields, days): every day is one numpy step over all fields at once.
+"""
+from collections import namedtuple
+from datetime import timedelta
+import numpy as np
+from water_requirement import (AVAILABLE_WATER, FIELD_CAPACITY, KC, MAD, REFILL_FRACTION,
+                               crop_index, growth_stage)
+
+# Share of rainfall that reaches the root zone (the rest runs off)
+EFFECTIVE_RAIN_FRACTION = 0.8
+
+# Daily arrays of a simulation, each (fields, days); depletion is at the end of the day (mm)
+Balance = namedtuple('Balance', ['depletion', 'irrigation', 'deep_percolation', 'stress'])
+
+def initial_depletion(soil_moisture, taw=AVAILABLE_WATER):
+    """Root zone depletion (mm) of soil moisture readings (0-1000 units, 1000 at field capacity)"""
+    soil_moisture = np.clip(np.asarray(soil_moisture, dtype=float), 0, FIELD_CAPACITY)
+    return (FIELD_CAPACITY - soil_moisture) / FIELD_CAPACITY * taw
+
+def crop_etc(crop_types, crop_days, eto):
+    """
+    Crop evapotranspiration (fields, days) from reference ETo (fields, days)
+    as the crops age: Kc follows each field's growth stage day by day.
+    """
+    eto = np.atleast_2d(np.asarray(eto, dtype=float))
+    crop_days = np.asarray(crop_days, dtype=float).reshape(-1, 1)
+    crops = crop_index(np.asarray(crop_types, dtype=object).reshape(-1))[:, None]
+    days = crop_days + np.arange(eto.shape[1])[None, :]
+    return KC[crops, growth_stage(days)] * eto
+
+def simulate(depletion, etc, rain=None, irrigation=None, taw=AVAILABLE_WATER, mad=MAD,
+             refill_fraction=REFILL_FRACTION, auto_irrigate=True,
+             effective_rain_fraction=EFFECTIVE_RAIN_FRACTION):
+    """
+    Run the water balance of many fields. depletion: initial depletion per
+    field (mm); etc, rain and planned irrigation: (fields, days) or (days,)
+    in mm, broadcast to every field; taw, mad and refill_fraction: scalars
+    or one value per field. With auto_irrigate, irrigation is added on the
+    days the depletion would pass mad * taw. stress marks days that end
+    above that (only possible without automatic irrigation).
+    """
+    depletion = np.array(depletion, dtype=float, ndmin=1)
+    etc = np.asarray(etc, dtype=float)
+    n_fields, n_days = depletion.shape[0], etc.shape[-1]
+    shape = (n_fields, n_days)
+
+    def by_day(values):
+        # Day-major copy, so each daily step reads contiguous memory
+        return np.ascontiguousarray(np.broadcast_to(np.asarray(values, dtype=float), shape).T)
+
+    etc = by_day(etc)
+    # Water reaching the root zone each day before automatic irrigation
+    water_in = by_day(0.0 if irrigation is None else irrigation)
+    if rain is not None:
+        water_in += effective_rain_fraction * by_day(rain)
+    taw = np.broadcast_to(np.asarray(taw, dtype=float), (n_fields,))
+    allowed = np.broadcast_to(np.asarray(mad, dtype=float), (n_fields,)) * taw
+    refill_to = (1 - np.broadcast_to(np.asarray(refill_fraction, dtype=float), (n_fields,))) * taw
+
+    depletions = np.empty((n_days, n_fields))
+    applied = by_day(0.0 if irrigation is None else irrigation)
+    deep_percolation = np.empty((n_days, n_fields))
+    for day in range(n_days):
+        # Depletion at the end of the day without any more water
+        projected = depletion - water_in[day] + etc[day]
+        if auto_irrigate:
+            extra = np.where(projected > allowed, projected - refill_to, 0.0)
+            applied[day] += extra
+            projected -= extra
+        np.maximum(-projected, 0.0, out=deep_percolation[day])
+        depletion = np.clip(projected, 0.0, taw, out=depletions[day])
+    return Balance(depletion=depletions.T, irrigation=applied.T, deep_percolation=deep_percolation.T,
+                   stress=(depletions > allowed).T)
+
+def irrigation_calendar(balance, start, min_amount=0.0):
+    """
+    Irrigation calendar of every field: a list per field of
+    (date, mm) pairs for the days with irrigation, day 0 being start.
+    """
+    fields, days = np.nonzero(balance.irrigation > max(min_amount, 0.0))
+    amounts = balance.irrigation[fields, days]
+    calendar = [[] for _ in range(balance.irrigation.shape[0])]
+    for field, day, amount in zip(fields.tolist(), days.tolist(), amounts.tolist()):
+        calendar[field].append((start + timedelta(days=day), round(amount, 2)))
+    return calendar
+
+def plan_fields(crop_types, crop_days, soil_moisture, eto, rain=None, **options):
+    """
+    Water balance of fields from today's readings: depletion from soil
+    moisture, ETc from ETo ((days,) or (fields, days)) as the crops age,
+    then simulate() with the given options.
+    """
+    n_fields = len(crop_types)
+    eto = np.broadcast_to(np.asarray(eto, dtype=float), (n_fields, np.shape(eto)[-1]))
+    etc = crop_etc(crop_types, crop_days, eto)
+    return simulate(initial_depletion(soil_moisture, options.get('taw', AVAILABLE_WATER)), etc, rain=rain, **options)
@@ -0,0 +1,147 @@
+"""
+Water requirement engine - irrigation need of many fields at once
+calculate_water_requirement() in app.py answers one reading at a time:
+it rebuilt its crop coefficient dict on every call and picked the growth
+stage with if/elif. Here the crop coefficients are a lookup array built
+once, the growth stage comes from np.searchsorted and every step is a
+numpy expression over whole arrays of readings, so a district of 100k
+fields takes a few milliseconds. Results are numpy structured arrays
+(one record per reading, fields as in REQUIREMENT_DTYPE).
+"""
+from datetime import datetime
+import numpy as np
+import evapotranspiration
+
+# Crop coefficients (Kc) per crop and growth stage (initial, mid, late);
+# crops not listed use DEFAULT_KC
+CROP_KC = {
+    'Wheat': (0.3, 1.15, 0.4),
+    'Rice': (1.05, 1.2, 0.9),
+    'Cotton': (0.35, 1.15, 0.7),
+    'Sugarcane': (0.4, 1.25, 0.75),
+    'Maize': (0.3, 1.2, 0.6),
+    'Soybean': (0.4, 1.15, 0.5),
+}
+DEFAULT_KC = (0.35, 1.0, 0.6)
+
+CROPS = tuple(CROP_KC)
+# Row i of a crop lookup array belongs to CROPS[i]; the last row is the default
+DEFAULT_CROP_INDEX = len(CROPS)
+KC = np.array([CROP_KC[crop] for crop in CROPS] + [DEFAULT_KC])
+_CROP_ROWS = {crop: i for i, crop in enumerate(CROPS)}
+
+# Growth stages start at these crop days: initial < 30 <= mid < 90 <= late
+STAGE_STARTS = (30, 90)
+STAGE_NAMES = np.array(['Initial', 'Mid-Season', 'Late Season'])
+
+# Without a location ETo keeps the original fixed estimate: temperature
+# range (°C) and extraterrestrial radiation (MJ/m²/day). With a latitude,
+# evapotranspiration.py computes FAO-56 ETo, and DELTA_T around the mean
+# temperature stands in for missing daily minima and maxima.
+DELTA_T = 10
+RA = 25
+
+AVAILABLE_WATER = 150  # mm, medium soil (150 mm/m depth)
+MAD = 0.5  # Management Allowed Depletion
+REFILL_FRACTION = 0.9  # fraction of the available water to refill
+FIELD_CAPACITY = 1000  # soil moisture units at field capacity
+M2_PER_ACRE = 4046.86
+
+REQUIREMENT_DTYPE = np.dtype([
+    ('ETo', 'f8'),  # mm/day
+    ('Kc', 'f8'),
+    ('ETc', 'f8'),  # mm/day
+    ('growth_stage', 'i1'),  # index into STAGE_NAMES
+    ('current_depletion', 'f8'),  # mm
+    ('threshold', 'f8'),  # mm
+    ('irrigation_amount', 'f8'),  # mm, equal to L/m²
+    ('irrigation_liters_per_acre', 'f8'),
+])
+
+def crop_lookup(values_by_crop, default):
+    """Lookup array of a per-crop value, indexed by crop_index()"""
+    return np.array([values_by_crop.get(crop, default) for crop in CROPS] + [default])
+
+def crop_index(crop_types):
+    """Row of every crop type in the crop lookup arrays (DEFAULT_CROP_INDEX for unknown crops)"""
+    crop_types = np.asarray(crop_types, dtype=object)
+    rows = np.fromiter((_CROP_ROWS.get(crop, DEFAULT_CROP_INDEX) for crop in crop_types.ravel()),
+                       dtype=np.intp, count=crop_types.size)
+    return rows.reshape(crop_types.shape)
+
+def growth_stage(crop_days):
+    """Growth stage index (0 initial, 1 mid, 2 late) of every crop age in days"""
+    return np.searchsorted(np.array(STAGE_STARTS), np.asarray(crop_days, dtype=float), side='right')
+
+def reference_et(temperature, latitude=None, day_of_year=None, tmin=None, tmax=None,
+                 humidity=None, wind_speed=None, elevation=0.0):
+    """
+    ETo (mm/day) for water_requirements(): the fixed estimate without a
+    latitude, FAO-56 Hargreaves or Penman-Monteith (see evapotranspiration.py)
+    with one. day_of_year defaults to today.
+    """
+    temperature = np.asarray(temperature, dtype=float)
+    if latitude is None:
+        # ETo = 0.0023 * (Tmean + 17.8) * ΔT^0.5 * Ra
+        return 0.0023 * (temperature + 17.8) * (DELTA_T ** 0.5) * RA
+    if day_of_year is None:
+        day_of_year = evapotranspiration.day_of_year(datetime.utcnow())
+    tmin = temperature - DELTA_T / 2 if tmin is None else np.where(
+        np.isnan(np.asarray(tmin, dtype=float)), temperature - DELTA_T / 2, tmin)
+    tmax = temperature + DELTA_T / 2 if tmax is None else np.where(
+        np.isnan(np.asarray(tmax, dtype=float)), temperature + DELTA_T / 2, tmax)
+    return evapotranspiration.reference_et(tmin, tmax, latitude, day_of_year, humidity=humidity,
+                                           wind_speed=wind_speed, elevation=elevation, tmean=temperature)
+
+def water_requirements(crop_types, temperature, crop_days, soil_moisture, **weather):
+    """
+    Water requirement of every reading, from equal-length arrays (or
+    scalars, broadcast). ETo comes from reference_et(), which takes the
+    optional weather keywords (latitude, day_of_year, tmin, tmax, humidity,
+    wind_speed, elevation); ETc = Kc * ETo; the irrigation amount
+    refills REFILL_FRACTION of the available water from the depletion
+    implied by soil moisture (0-1000 units, 1000 at field capacity).
+    """
+    temperature = np.asarray(temperature, dtype=float)
+    soil_moisture = np.asarray(soil_moisture, dtype=float)
+    stage = growth_stage(crop_days)
+    crops = crop_index(crop_types)
+    eto = reference_et(temperature, **weather)
+    temperature, soil_moisture, stage, crops, eto = np.broadcast_arrays(temperature, soil_moisture, stage, crops, eto)
+
+    result = np.empty(temperature.shape, dtype=REQUIREMENT_DTYPE)
+    result['growth_stage'] = stage
+    result['Kc'] = KC[crops, stage]
+    result['ETo'] = eto
+    result['ETc'] = result['Kc'] * result['ETo']
+    result['current_depletion'] = (FIELD_CAPACITY - soil_moisture) / FIELD_CAPACITY * AVAILABLE_WATER
+    result['threshold'] = MAD * AVAILABLE_WATER
+    result['irrigation_amount'] = np.maximum(
+        0, REFILL_FRACTION * AVAILABLE_WATER - (AVAILABLE_WATER - result['current_depletion'])
+    )
+    result['irrigation_liters_per_acre'] = result['irrigation_amount'] * M2_PER_ACRE
+    return result
+
+def water_requirement(crop_type, temperature, crop_days, soil_moisture, **weather):
+    """API dict of one reading: water_requirements() over a single row"""
+    return to_dicts(water_requirements([crop_type], [temperature], [crop_days], [soil_moisture], **weather))[0]
+
+def to_dicts(requirements):
+    """API dicts (as returned by calculate_water_requirement) of a requirements array"""
+    rounded = {name: [round(value, 2) for value in requirements[name].tolist()]
+               for name in ('ETo', 'Kc', 'ETc', 'current_depletion', 'threshold',
+                            'irrigation_amount', 'irrigation_liters_per_acre')}
+    stages = STAGE_NAMES[requirements['growth_stage']].tolist()
+    return [{
+        'ETo': rounded['ETo'][i],  # mm/day
+        'Kc': rounded['Kc'][i],
+        'ETc': rounded['ETc'][i],  # mm/day
+        'growth_stage': stages[i],
+        'current_depletion': rounded['current_depletion'][i],  # mm
+        'threshold': rounded['threshold'][i],  # mm
+        'irrigation_amount': rounded['irrigation_amount'][i],  # mm
+        'irrigation_liters_per_m2': rounded['irrigation_amount'][i],  # L/m²
+        'irrigation_liters_per_acre': rounded['irrigation_liters_per_acre'][i],  # L/acre
+        'available_water': AVAILABLE_WATER,
+        'MAD': MAD
+    } for i in range(len(requirements))]
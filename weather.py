@@ -0,0 +1,302 @@
+"""
+Weather provider - shared, cached weather for the app and the scheduler
+The dashboard, the weather pages, irrigation planning and the scheduler's
+rain check each asked for the weather on their own. WeatherProvider sits
+in front of a pluggable backend:
+- one cache entry per location, reused for ttl seconds
+- concurrent misses for the same location wait for a single backend call
+  (single flight) instead of each calling the service
+- if the backend fails, the last weather for the location is served for
+  up to stale_ttl seconds
+- at most max_locations are kept: entries past stale_ttl are dropped when
+  a new one is stored, then the least recently used ones
+Backends: MockBackend (the built-in demo data), FileBackend (a JSON file,
+for tests and offline use) and OpenWeatherBackend (OpenWeatherMap through
+a pooled requests.Session). Weather dicts have 'current' and a daily
+'forecast' list (see MOCK_WEATHER) and are shared between callers, so
+treat them as read-only.
+"""
+import copy
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_LOCATION = "New Delhi"
+
+# Forecast rain probability (%) from which rain is considered expected
+RAIN_PROBABILITY_THRESHOLD = 60
+
+# Demo data served when no weather service is configured
+MOCK_WEATHER = {
+    'current': {
+        'temp': 28.5,
+        'humidity': 65,
+        'description': 'Partly cloudy',
+        'wind_speed': 12,
+        'pressure': 1013,
+        'icon': '02d'
+    },
+    'forecast': [
+        {'day': 'Today', 'temp_max': 32, 'temp_min': 24, 'humidity': 65, 'description': 'Partly cloudy',
+         'rain_probability': 10, 'rain_mm': 0.0},
+        {'day': 'Tomorrow', 'temp_max': 33, 'temp_min': 25, 'humidity': 60, 'description': 'Sunny',
+         'rain_probability': 0, 'rain_mm': 0.0},
+        {'day': 'Day 3', 'temp_max': 31, 'temp_min': 23, 'humidity': 70, 'description': 'Cloudy',
+         'rain_probability': 30, 'rain_mm': 0.0},
+        {'day': 'Day 4', 'temp_max': 29, 'temp_min': 22, 'humidity': 75, 'description': 'Light rain',
+         'rain_probability': 70, 'rain_mm': 4.0},
+        {'day': 'Day 5', 'temp_max': 30, 'temp_min': 24, 'humidity': 68, 'description': 'Partly cloudy',
+         'rain_probability': 20, 'rain_mm': 0.0},
+    ]
+}
+
+def location_key(location):
+    """Cache key of a location: case and surrounding spaces don't matter"""
+    return (location or DEFAULT_LOCATION).strip().casefold()
+
+def day_label(index):
+    """Forecast day name as the templates show it"""
+    return 'Today' if index == 0 else 'Tomorrow' if index == 1 else f'Day {index + 1}'
+
+class MockBackend:
+    """The demo weather, the same for every location"""
+
+    name = 'mock'
+
+    def fetch(self, location):
+        return copy.deepcopy(MOCK_WEATHER)
+
+class FileBackend:
+    """
+    Weather from a JSON file mapping locations to weather dicts; a
+    "default" entry answers locations that aren't listed. The file is read
+    on every fetch, so it can be changed while the app runs.
+    """
+
+    name = 'file'
+
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self, location):
+        with open(self.path, encoding='utf-8') as f:
+            weather_by_location = {location_key(name): weather for name, weather in json.load(f).items()}
+        weather = weather_by_location.get(location_key(location), weather_by_location.get('default'))
+        if weather is None:
+            raise LookupError(f"No weather for {location} in {self.path}")
+        return weather
+
+def make_session(pool_size=10, retries=2):
+    """requests.Session keeping up to pool_size connections per host alive, retrying failed GETs"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=Retry(total=retries, backoff_factor=0.2,
+                                            status_forcelist=(500, 502, 503, 504),
+                                            allowed_methods=frozenset(['GET'])))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+class OpenWeatherBackend:
+    """
+    OpenWeatherMap current weather and 5-day / 3-hour forecast, folded
+    into daily entries. All calls share one pooled session, so repeated
+    fetches reuse open connections instead of a TCP and TLS handshake each.
+    """
+
+    name = 'openweather'
+
+    def __init__(self, api_key, base_url='https://api.openweathermap.org/data/2.5', session=None,
+                 timeout=5.0, pool_size=10):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.session = session or make_session(pool_size)
+        self.timeout = timeout
+
+    def _get(self, endpoint, location):
+        response = self.session.get(f'{self.base_url}/{endpoint}', timeout=self.timeout,
+                                    params={'q': location, 'appid': self.api_key, 'units': 'metric'})
+        response.raise_for_status()
+        return response.json()
+
+    def fetch(self, location):
+        current = self._get('weather', location)
+        forecast = self._get('forecast', location)
+        return {
+            'current': {
+                'temp': current['main']['temp'],
+                'humidity': current['main']['humidity'],
+                'description': current['weather'][0]['description'].capitalize(),
+                'wind_speed': round(current.get('wind', {}).get('speed', 0) * 3.6, 1),  # m/s to km/h
+                'pressure': current['main']['pressure'],
+                'icon': current['weather'][0]['icon']
+            },
+            'forecast': daily_forecast(forecast['list'], forecast.get('city', {}).get('timezone', 0))
+        }
+
+    def close(self):
+        self.session.close()
+
+def daily_forecast(entries, timezone=0):
+    """Daily forecast entries from 3-hour OpenWeatherMap entries (timezone: offset in seconds)"""
+    days = {}
+    for entry in entries:
+        days.setdefault(datetime.utcfromtimestamp(entry['dt'] + timezone).date(), []).append(entry)
+    forecast = []
+    for index, day in enumerate(sorted(days)):
+        slots = days[day]
+        midday = min(slots, key=lambda entry: abs(datetime.utcfromtimestamp(entry['dt'] + timezone).hour - 12))
+        forecast.append({
+            'day': day_label(index),
+            'temp_max': round(max(entry['main']['temp_max'] for entry in slots), 1),
+            'temp_min': round(min(entry['main']['temp_min'] for entry in slots), 1),
+            'humidity': round(sum(entry['main']['humidity'] for entry in slots) / len(slots)),
+            'description': midday['weather'][0]['description'].capitalize(),
+            'rain_probability': round(100 * max(entry.get('pop', 0) for entry in slots)),
+            'rain_mm': round(sum(entry.get('rain', {}).get('3h', 0) for entry in slots), 1),
+        })
+    return forecast
+
+BACKENDS = {'mock': MockBackend, 'file': FileBackend, 'openweather': OpenWeatherBackend}
+
+def make_backend(name, **options):
+    """Backend by name ('mock', 'file' or 'openweather') with its constructor options"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown weather backend: {name}")
+    return BACKENDS[name](**options)
+
+class _Flight:
+    """One backend call in progress; callers asking for the same location wait on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.weather = None
+        self.error = None
+
+class WeatherProvider:
+    """
+    Per-location TTL cache with single-flight fetching and stale fallback
+    in front of a backend (anything with fetch(location) -> weather dict).
+    Locations are free text, so the cache is bounded by max_locations (LRU).
+    """
+
+    def __init__(self, backend, ttl=600, stale_ttl=3600, max_locations=1000, clock=time.monotonic):
+        if max_locations <= 0:
+            raise ValueError("max_locations must be positive")
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_locations = max_locations
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (fetched_at, weather), least recently used first
+        self._flights = {}  # key -> _Flight
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.fetches = 0
+        self.errors = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def get(self, location):
+        """Weather of a location, fetched at most once per ttl; raises if the backend fails with nothing to fall back on"""
+        key = location_key(location)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[0] < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            self.misses += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+        if leader:
+            self._fetch(key, location, flight)
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.weather
+
+    def _fetch(self, key, location, flight):
+        try:
+            weather = self.backend.fetch((location or DEFAULT_LOCATION).strip())
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+                entry = self._entries.get(key)
+                if entry is not None and self._clock() - entry[0] < self.stale_ttl:
+                    self.stale += 1
+                    flight.weather = entry[1]
+                else:
+                    flight.error = e
+            print(f"Error fetching weather for {location}: {e}")
+        else:
+            with self._lock:
+                self.fetches += 1
+                self._store(key, weather)
+            flight.weather = weather
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _store(self, key, weather):
+        """Cache a location's weather, dropping expired then least recently used entries; caller holds the lock"""
+        now = self._clock()
+        self._entries[key] = (now, weather)
+        self._entries.move_to_end(key)
+        for expired in [k for k, (fetched_at, _) in self._entries.items() if now - fetched_at >= self.stale_ttl]:
+            del self._entries[expired]
+            self.evictions += 1
+        while len(self._entries) > self.max_locations:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def forecast(self, location):
+        """Daily forecast list of a location"""
+        return self.get(location).get('forecast') or []
+
+    def rain_forecast(self, location, hours=24, threshold=RAIN_PROBABILITY_THRESHOLD):
+        """
+        (rain expected, probability %) over the forecast days covering the
+        next hours: the highest daily rain probability, expected from threshold.
+        """
+        days = self.forecast(location)[:max(1, math.ceil(hours / 24))]
+        probability = float(max((day.get('rain_probability') or 0 for day in days), default=0))
+        return probability >= threshold, probability
+
+    def invalidate(self, location=None):
+        """Drop one location, or every location, from the cache"""
+        with self._lock:
+            if location is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(location_key(location), None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': getattr(self.backend, 'name', type(self.backend).__name__),
+                'locations': len(self._entries),
+                'max_locations': self.max_locations,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'fetches': self.fetches,
+                'errors': self.errors,
+                'stale': self.stale,
+                'evictions': self.evictions,
+            }